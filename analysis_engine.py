@@ -6,13 +6,238 @@
 """
 
 import os
-from openai import OpenAI
+import time
+import threading
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 
+# openai SDK는 시작 시간을 줄이기 위해 첫 LLM 호출 시점에 불러옴
+
+
+def estimate_tokens(text):
+    """
+    텍스트의 토큰 수 추정 (토크나이저 없이 사용하는 근사치)
+    
+    영문 등 ASCII 문자는 약 4자당 1토큰, 한글 등 그 외 문자는 약 1.5자당 1토큰으로 계산
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    other_chars = len(text) - ascii_chars
+    return int(ascii_chars / 4 + other_chars / 1.5) + 1
+
+
+class JobCancelled(Exception):
+    """작업 취소 요청으로 처리를 중단할 때 발생"""
+
+
+def check_cancelled(cancel_event):
+    """취소 요청이 있으면 JobCancelled 발생 (cancel_event가 None이면 무시)"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled("작업이 취소되었습니다.")
+
+
+class CallAborted(Exception):
+    """진 헤지 요청이나 취소/마감으로 버린 요청을 중단할 때 발생"""
+
+
+class _InFlightCall:
+    """
+    논리 호출 1건(원 요청과 헤지 요청)의 진행 중 요청 묶음
+    
+    close()는 abort 이벤트로 남은 요청의 스트림을 닫아 생성을 실제로 멈추고,
+    호출 슬롯(call_gate)은 마지막 요청이 끝난 뒤 반환하므로 버린 요청도 끝날 때까지 동시 호출 수에 포함된다.
+    """
+    
+    def __init__(self, gate):
+        self.abort = threading.Event()
+        self._gate = gate
+        self._running = 0
+        self._closed = False
+        self._lock = threading.Lock()
+    
+    def submit(self, executor, fn, *args):
+        """executor에서 fn(*args, abort) 실행"""
+        with self._lock:
+            self._running += 1
+        future = executor.submit(fn, *args, self.abort)
+        future.add_done_callback(self._finished)
+        return future
+    
+    def _finished(self, future):
+        with self._lock:
+            self._running -= 1
+            release = self._closed and self._running == 0
+        if release:
+            self._gate.__exit__(None, None, None)
+    
+    def close(self, pending=()):
+        """남은 요청 중단 (시작 전 요청은 취소, 전송된 요청은 다음 응답 조각에서 스트림을 닫음)"""
+        self.abort.set()
+        for future in pending:
+            future.cancel()
+        with self._lock:
+            self._closed = True
+            release = self._running == 0
+        if release:
+            self._gate.__exit__(None, None, None)
+
+
+class HedgePolicy:
+    """
+    헤지 요청(중복 LLM 요청) 정책
+    
+    최근 LLM 응답 지연의 백분위수를 넘도록 응답이 없으면 같은 요청을 한 번 더 보내
+    먼저 도착한 응답을 사용한다. 추가 요청 비율은 budget으로 제한한다.
+    """
+    
+    def __init__(self, percentile=95, budget=0.1, window=200, min_samples=20):
+        """
+        Args:
+            percentile: 헤지 요청 발송 기준이 되는 지연 백분위수 (0-100)
+            budget: 전체 호출 대비 허용되는 추가 요청 비율 (예: 0.1 = 10%)
+            window: 백분위수 계산에 사용할 최근 지연 기록 수
+            min_samples: 헤지를 시작하기 위한 최소 지연 기록 수
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+    
+    def record_call(self):
+        """LLM 호출 1회 기록"""
+        with self._lock:
+            self.calls += 1
+    
+    def record_latency(self, seconds):
+        """성공한 요청의 응답 지연 기록"""
+        with self._lock:
+            self._latencies.append(seconds)
+    
+    def record_win(self):
+        """헤지 요청이 원 요청보다 먼저 응답한 경우 기록"""
+        with self._lock:
+            self.hedge_wins += 1
+    
+    def hedge_delay(self):
+        """헤지 요청을 보내기까지 기다릴 시간(초), 기록이 부족하면 None"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+    
+    def try_acquire(self):
+        """추가 요청 예산이 남아 있으면 헤지 1회를 예약하고 True 반환"""
+        with self._lock:
+            if self.hedged + 1 > self.budget * self.calls:
+                return False
+            self.hedged += 1
+            return True
+    
+    def get_stats(self):
+        """헤지 비율 및 승률 통계 반환"""
+        with self._lock:
+            calls, hedged, wins = self.calls, self.hedged, self.hedge_wins
+            samples = len(self._latencies)
+        return {
+            'enabled': True,
+            'percentile': self.percentile,
+            'budget': self.budget,
+            'calls': calls,
+            'hedged_requests': hedged,
+            'hedge_wins': wins,
+            'hedge_rate': hedged / calls if calls else 0.0,
+            'win_rate': wins / hedged if hedged else 0.0,
+            'latency_samples': samples,
+            'current_hedge_delay': self.hedge_delay()
+        }
+
+
+class LatencyModel:
+    """
+    LLM 호출 지연 예측 모델
+    
+    최근 호출의 (전체 토큰 수, 지연) 기록에 지연 = 고정 지연 + 토큰당 지연 × 토큰 수 직선을
+    최소제곱으로 맞추고, 응답 토큰 수는 최근 평균을 사용해 호출 1회의 지연을 예측한다.
+    기록이 부족하면 기본값을 사용한다.
+    """
+    
+    def __init__(self, window=200, min_samples=10, default_overhead=1.0,
+                 default_seconds_per_token=0.005, default_completion_tokens=1200):
+        """
+        Args:
+            window: 예측에 사용할 최근 호출 기록 수
+            min_samples: 기록으로 예측을 시작하기 위한 최소 기록 수
+            default_overhead: 기록이 부족할 때 사용할 호출당 고정 지연(초)
+            default_seconds_per_token: 기록이 부족할 때 사용할 토큰당 지연(초)
+            default_completion_tokens: 기록이 부족할 때 사용할 응답 토큰 수
+        """
+        self.min_samples = min_samples
+        self.default_overhead = default_overhead
+        self.default_seconds_per_token = default_seconds_per_token
+        self.default_completion_tokens = default_completion_tokens
+        self._samples = deque(maxlen=window)  # (프롬프트 토큰, 응답 토큰, 지연)
+        self._lock = threading.Lock()
+    
+    def record(self, prompt_tokens, completion_tokens, seconds):
+        """성공한 호출 1회의 토큰 수와 지연 기록"""
+        with self._lock:
+            self._samples.append((prompt_tokens, completion_tokens, seconds))
+    
+    def _fit(self):
+        """(고정 지연, 토큰당 지연, 평균 응답 토큰 수) 계산"""
+        with self._lock:
+            samples = list(self._samples)
+        if len(samples) < self.min_samples:
+            return self.default_overhead, self.default_seconds_per_token, self.default_completion_tokens
+        
+        xs = [prompt + completion for prompt, completion, _ in samples]
+        ys = [seconds for _, _, seconds in samples]
+        completion = sum(c for _, c, _ in samples) / len(samples)
+        mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+        var_x = sum((x - mean_x) ** 2 for x in xs)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x if var_x else 0.0
+        if slope <= 0:
+            # 토큰 수와 무관해 보이면 평균 지연 사용
+            return mean_y, 0.0, completion
+        return max(0.0, mean_y - slope * mean_x), slope, completion
+    
+    def predict(self, prompt_tokens):
+        """프롬프트 토큰 수가 주어진 호출 1회의 예상 지연(초)"""
+        overhead, per_token, completion = self._fit()
+        return overhead + per_token * (prompt_tokens + completion)
+    
+    def get_stats(self):
+        """현재 모델 계수 반환"""
+        overhead, per_token, completion = self._fit()
+        with self._lock:
+            samples = len(self._samples)
+        return {
+            'samples': samples,
+            'learned': samples >= self.min_samples,
+            'overhead_seconds': round(overhead, 3),
+            'seconds_per_1k_tokens': round(per_token * 1000, 3),
+            'mean_completion_tokens': round(completion)
+        }
+
 
 class ThinkingPromptsEngine:
     """10가지 사고 프롬프트 기반 분석 엔진"""
     
+    SYSTEM_PROMPT = "You are a critical thinking assistant that helps analyze ideas, plans, and strategies from multiple perspectives. Provide thoughtful, insightful analysis in Korean."
+    
+    # 응답 최대 토큰 수 및 작업량 추정에 사용할 평균 응답 토큰 수
+    MAX_COMPLETION_TOKENS = 2000
+    EXPECTED_COMPLETION_TOKENS = 1200
+    
     # 10가지 사고 프롬프트 정의
     PROMPTS = {
         "challenge_thinking": {
@@ -137,17 +362,59 @@ Please provide your analysis in Korean."""
         }
     }
     
-    def __init__(self, model="gpt-4.1-mini"):
+    # 종합 요약 입력 방식
+    #   full: 관점별 결과 전체 결합
+    #   compressed: 관점별 핵심 항목만 토큰 예산 안에서 결합
+    #   hierarchical: 관점 묶음별로 중간 요약을 병렬 생성한 뒤 최종 종합
+    SYNTHESIS_MODES = ('full', 'compressed', 'hierarchical')
+    
+    # hierarchical 모드에서 중간 요약 1회가 맡는 관점 수
+    SYNTHESIS_GROUP_SIZE = 4
+    
+    # 응답 대기 중 취소 요청을 확인하는 간격(초)
+    CANCEL_POLL_INTERVAL = 0.2
+    
+    def __init__(self, model="gpt-4.1-mini", max_workers=16, hedge_policy=None,
+                 synthesis_mode="full", synthesis_budget=3000):
         """
         분석 엔진 초기화
         
         Args:
             model: 사용할 OpenAI 모델
+            max_workers: LLM 호출을 수행할 스레드 수
+            hedge_policy: 헤지 요청 정책 (HedgePolicy, None이면 사용 안 함)
+            synthesis_mode: 종합 요약 입력 방식 (SYNTHESIS_MODES 중 하나)
+            synthesis_budget: compressed/hierarchical 모드의 요약 입력 토큰 예산
         """
-        self.client = OpenAI()
+        if synthesis_mode not in self.SYNTHESIS_MODES:
+            raise ValueError(f"synthesis_mode는 {', '.join(self.SYNTHESIS_MODES)} 중 하나여야 합니다.")
+        
+        self._client = None
+        self._client_lock = threading.Lock()
         self.model = model
+        self.hedge_policy = hedge_policy
+        self.synthesis_mode = synthesis_mode
+        self.synthesis_budget = synthesis_budget
+        # 호출별 토큰 수와 지연 기록으로 작업 소요 시간 예측
+        self.latency_model = LatencyModel(default_completion_tokens=self.EXPECTED_COMPLETION_TOKENS)
+        # 응답의 토큰 사용량 (요청을 수행한 스레드에서 읽음)
+        self._usage = threading.local()
+        # LLM 호출은 별도 스레드에서 수행하여 호출 단위 시간 제한을 적용
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+    
+    @property
+    def client(self):
+        """OpenAI 클라이언트 (첫 사용 시 생성)"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI()
+        return self._client
     
-    def analyze(self, content, prompts_to_use=None, progress_callback=None):
+    def analyze(self, content, prompts_to_use=None, progress_callback=None,
+                deadline=None, call_timeout=None, call_gate=None, cancel_event=None,
+                completed=None, on_result=None):
         """
         10가지 프롬프트를 사용하여 콘텐츠 분석
         
@@ -155,9 +422,19 @@ Please provide your analysis in Korean."""
             content: 분석할 내용
             prompts_to_use: 사용할 프롬프트 키 리스트 (None이면 전체 사용)
             progress_callback: 진행 상황 콜백 함수
+            deadline: 작업 마감 시각 (time.monotonic() 기준, None이면 제한 없음)
+            call_timeout: LLM 호출 1회당 최대 대기 시간(초)
+            call_gate: LLM 호출마다 진입할 컨텍스트 매니저 팩토리 (동시 호출 제한용)
+            cancel_event: 설정되면 남은 관점을 호출하지 않고 진행 중인 호출을 중단하는 threading.Event
+            completed: 이전 실행에서 완료된 관점별 결과 {key: result} (해당 관점은 다시 호출하지 않음)
+            on_result: 관점 분석이 성공할 때마다 on_result(key, result) 호출 (체크포인트 저장용)
         
         Returns:
             dict: 각 프롬프트별 분석 결과
+                  (마감 시간까지 완료되지 않은 관점은 'cut': True로 표시)
+        
+        Raises:
+            JobCancelled: cancel_event로 취소된 경우
         """
         if prompts_to_use is None:
             prompts_to_use = list(self.PROMPTS.keys())
@@ -170,6 +447,17 @@ Please provide your analysis in Korean."""
                 continue
             
             prompt_info = self.PROMPTS[prompt_key]
+            check_cancelled(cancel_event)
+            
+            if completed and prompt_key in completed:
+                results[prompt_key] = completed[prompt_key]
+                continue
+            
+            # 마감 시간이 지났으면 남은 관점은 호출하지 않고 누락으로 표시
+            remaining = self._remaining_time(deadline)
+            if remaining is not None and remaining <= 0:
+                results[prompt_key] = self._cut_result(prompt_info)
+                continue
             
             if progress_callback:
                 progress_callback(idx, total, prompt_info['title'])
@@ -177,17 +465,42 @@ Please provide your analysis in Korean."""
             # 프롬프트 생성
             full_prompt = prompt_info['template'].format(content=content)
             
+            # 호출 제한 시간은 호출 단위 제한과 남은 작업 시간 중 짧은 쪽
+            timeout = call_timeout
+            if remaining is not None:
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            
             # LLM 분석 수행
             try:
-                analysis_result = self._call_llm(full_prompt)
+                analysis_result, usage = self._call_llm(
+                    full_prompt, timeout=timeout, cancel_event=cancel_event, return_usage=True,
+                    call_gate=call_gate
+                )
                 
                 results[prompt_key] = {
                     'title': prompt_info['title'],
                     'title_en': prompt_info['title_en'],
                     'description': prompt_info['description'],
                     'result': analysis_result,
+                    'usage': usage,
                     'timestamp': datetime.now().isoformat()
                 }
+            except JobCancelled:
+                raise
+            except TimeoutError:
+                remaining = self._remaining_time(deadline)
+                if remaining is not None and remaining <= 0:
+                    # 작업 마감으로 중단된 호출
+                    results[prompt_key] = self._cut_result(prompt_info)
+                else:
+                    results[prompt_key] = {
+                        'title': prompt_info['title'],
+                        'title_en': prompt_info['title_en'],
+                        'description': prompt_info['description'],
+                        'result': f"분석 중 오류 발생: LLM 응답 시간 초과 ({timeout:.0f}초)",
+                        'error': True,
+                        'timestamp': datetime.now().isoformat()
+                    }
             except Exception as e:
                 results[prompt_key] = {
                     'title': prompt_info['title'],
@@ -197,25 +510,201 @@ Please provide your analysis in Korean."""
                     'error': True,
                     'timestamp': datetime.now().isoformat()
                 }
+            
+            result = results[prompt_key]
+            if on_result and not result.get('error') and not result.get('cut'):
+                on_result(prompt_key, result)
         
         return results
     
-    def _call_llm(self, prompt):
+    def _remaining_time(self, deadline):
+        """마감 시각까지 남은 시간(초) 반환 (마감이 없으면 None)"""
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
+    
+    def _cut_result(self, prompt_info):
+        """마감 시간 내에 완료되지 않은 관점의 결과 항목 생성"""
+        return {
+            'title': prompt_info['title'],
+            'title_en': prompt_info['title_en'],
+            'description': prompt_info['description'],
+            'result': "작업 마감 시간 내에 완료되지 않아 분석에서 제외되었습니다.",
+            'cut': True,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def get_cut_perspectives(self, analysis_results):
+        """마감 시간으로 누락된 관점 목록 반환"""
+        return [
+            {'key': key, 'title': result['title']}
+            for key, result in analysis_results.items()
+            if result.get('cut')
+        ]
+    
+    def _call_llm(self, prompt, timeout=None, cancel_event=None, return_usage=False, call_gate=None):
         """
         LLM API 호출
         
         Args:
             prompt: 전송할 프롬프트
+            timeout: 최대 대기 시간(초), None이면 제한 없음
+            cancel_event: 설정되면 응답을 기다리지 않고 진행 중인 요청을 중단하는 threading.Event
+            return_usage: True면 (응답, 사용량) 반환
+            call_gate: 호출 시 진입할 컨텍스트 매니저 팩토리 (동시 호출 제한용,
+                       헤지/중단한 요청이 실제로 끝날 때까지 유지)
+        
+        Returns:
+            str: LLM 응답
+                 (return_usage면 {'prompt_tokens', 'completion_tokens', 'latency_seconds',
+                  'estimated'} 사용량과 함께 튜플로 반환)
+        
+        Raises:
+            TimeoutError: 제한 시간 내에 응답이 오지 않은 경우
+            JobCancelled: 응답 대기 중 취소된 경우
+        """
+        check_cancelled(cancel_event)
+        started = time.monotonic()
+        
+        def finish(text, usage):
+            # 헤지 요청이 이긴 경우에도 호출자가 기다린 전체 시간을 기록
+            latency = time.monotonic() - started
+            self.latency_model.record(usage['prompt_tokens'], usage['completion_tokens'], latency)
+            if not return_usage:
+                return text
+            return text, {**usage, 'latency_seconds': round(latency, 3)}
+        
+        policy = self.hedge_policy
+        if policy is None and timeout is None and cancel_event is None:
+            with call_gate() if call_gate else nullcontext():
+                text, _, usage = self._timed_completion(prompt)
+            return finish(text, usage)
+        
+        if timeout is not None and timeout <= 0:
+            raise TimeoutError("LLM 호출 제한 시간 초과")
+        
+        if policy is not None:
+            policy.record_call()
+        
+        # 멈춘 호출이 작업 전체를 붙잡지 않도록 별도 스레드에서 대기
+        end = started + timeout if timeout is not None else None
+        gate = call_gate() if call_gate else nullcontext()
+        gate.__enter__()
+        calls = _InFlightCall(gate)
+        pending = set()
+        hedge = None
+        error = None
+        try:
+            pending.add(calls.submit(self._executor, self._timed_completion, prompt, timeout))
+            
+            # 최근 지연의 백분위수까지 응답이 없으면 헤지 요청 발송
+            delay = policy.hedge_delay() if policy is not None else None
+            if delay is not None and (timeout is None or delay < timeout):
+                done, _ = wait(pending, timeout=delay)
+                cancelled = cancel_event is not None and cancel_event.is_set()
+                if not done and not cancelled and policy.try_acquire():
+                    remaining = end - time.monotonic() if end is not None else None
+                    hedge = calls.submit(self._executor, self._timed_completion, prompt, remaining)
+                    pending.add(hedge)
+            
+            while pending:
+                remaining = end - time.monotonic() if end is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
+                if cancel_event is not None:
+                    # 취소 요청을 확인할 수 있도록 짧게 나눠 대기
+                    remaining = min(remaining, self.CANCEL_POLL_INTERVAL) if remaining is not None \
+                        else self.CANCEL_POLL_INTERVAL
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done:
+                    check_cancelled(cancel_event)
+                for future in done:
+                    try:
+                        text, latency, usage = future.result()
+                    except Exception as e:
+                        # 다른 요청이 아직 진행 중이면 그 결과를 기다림
+                        error = e
+                        continue
+                    if policy is not None:
+                        policy.record_latency(latency)
+                        if future is hedge:
+                            policy.record_win()
+                    return finish(text, usage)
+        finally:
+            # 진 쪽 요청과 취소/마감된 요청은 스트림을 닫아 중단 (슬롯은 요청이 끝난 뒤 반환)
+            calls.close(pending)
+        
+        if error is not None:
+            from openai import APITimeoutError
+            if isinstance(error, APITimeoutError):
+                raise TimeoutError(str(error)) from error
+            raise error
+        raise TimeoutError("LLM 호출 제한 시간 초과")
+    
+    def _timed_completion(self, prompt, timeout=None, abort=None):
+        """요청 1회를 수행하고 (응답, 소요 시간, 토큰 사용량) 반환"""
+        self._usage.last = None
+        started = time.monotonic()
+        text = self._request_completion(prompt, timeout, abort=abort)
+        latency = time.monotonic() - started
+        
+        usage = self._usage.last
+        if usage is not None:
+            # 스트림의 usage 조각은 SDK 버전에 따라 dict로 올 수 있음
+            if isinstance(usage, dict):
+                prompt_tokens, completion_tokens = usage['prompt_tokens'], usage['completion_tokens']
+            else:
+                prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+            return text, latency, {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'estimated': False
+            }
+        # 응답에 사용량이 없으면 (호환 서버 등) 추정치 사용
+        return text, latency, {
+            'prompt_tokens': estimate_tokens(self.SYSTEM_PROMPT) + estimate_tokens(prompt),
+            'completion_tokens': estimate_tokens(text),
+            'estimated': True
+        }
+    
+    def get_hedge_stats(self):
+        """헤지 요청 통계 반환"""
+        if self.hedge_policy is None:
+            return {'enabled': False}
+        return self.hedge_policy.get_stats()
+    
+    def _request_completion(self, prompt, timeout=None, abort=None):
+        """
+        Chat Completions API 요청 1회 수행
+        
+        응답을 스트리밍으로 받아 abort가 설정되면 다음 조각에서 연결을 닫는다
+        (응답을 버리기만 하면 서버는 생성을 계속하고 토큰이 과금됨).
+        
+        Args:
+            prompt: 전송할 프롬프트
+            timeout: HTTP 요청 제한 시간(초, 스트림은 조각 사이 대기 시간에도 적용)
+            abort: 설정되면 요청을 중단하는 threading.Event
         
         Returns:
             str: LLM 응답
+        
+        Raises:
+            CallAborted: abort로 중단된 경우
         """
-        response = self.client.chat.completions.create(
+        if abort is not None and abort.is_set():
+            raise CallAborted("LLM 요청이 중단되었습니다.")
+        
+        client = self.client
+        if timeout is not None:
+            # 재시도로 제한 시간을 넘기지 않도록 SDK 재시도는 끔
+            client = client.with_options(timeout=timeout, max_retries=0)
+        
+        stream = client.chat.completions.create(
             model=self.model,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are a critical thinking assistant that helps analyze ideas, plans, and strategies from multiple perspectives. Provide thoughtful, insightful analysis in Korean."
+                    "content": self.SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -223,10 +712,105 @@ Please provide your analysis in Korean."""
                 }
             ],
             temperature=0.7,
-            max_tokens=2000
+            max_tokens=self.MAX_COMPLETION_TOKENS,
+            stream=True,
+            # 마지막 조각으로 토큰 사용량 수신 (SDK 1.3은 stream_options 인자가 없어 본문에 직접 지정)
+            extra_body={"stream_options": {"include_usage": True}}
         )
         
-        return response.choices[0].message.content.strip()
+        parts = []
+        try:
+            for chunk in stream:
+                if abort is not None and abort.is_set():
+                    raise CallAborted("LLM 요청이 중단되었습니다.")
+                if getattr(chunk, 'usage', None):
+                    self._usage.last = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+        finally:
+            # 연결을 닫아야 서버가 생성을 멈춤 (SDK 1.3의 Stream에는 close()가 없음)
+            stream.response.close()
+        return "".join(parts).strip()
+    
+    def estimate_job_tokens(self, content_tokens, prompts_to_use=None):
+        """
+        작업 1건의 예상 토큰 사용량 추정 (관점별 분석 + 종합 요약)
+        
+        Args:
+            content_tokens: 입력 내용의 토큰 수
+            prompts_to_use: 사용할 프롬프트 키 리스트 (None이면 전체)
+        
+        Returns:
+            dict: {'prompt_tokens', 'completion_tokens', 'total_tokens', 'calls'}
+        """
+        if prompts_to_use is None:
+            prompts_to_use = list(self.PROMPTS.keys())
+        keys = [key for key in prompts_to_use if key in self.PROMPTS]
+        
+        system_tokens = estimate_tokens(self.SYSTEM_PROMPT)
+        prompt_tokens = sum(
+            content_tokens + system_tokens + estimate_tokens(self.PROMPTS[key]['template'])
+            for key in keys
+        )
+        completion_tokens = self.EXPECTED_COMPLETION_TOKENS * len(keys)
+        
+        # 종합 요약: full은 관점별 응답 전체, 그 외는 예산만큼이 입력
+        synthesis_input = completion_tokens
+        calls = len(keys) + 1
+        if self.synthesis_mode != 'full':
+            synthesis_input = min(synthesis_input, self.synthesis_budget)
+        if self.synthesis_mode == 'hierarchical':
+            groups = -(-len(keys) // self.SYNTHESIS_GROUP_SIZE)
+            prompt_tokens += groups * (system_tokens + 200) + self.EXPECTED_COMPLETION_TOKENS * groups
+            completion_tokens += self.EXPECTED_COMPLETION_TOKENS * groups
+            calls += groups
+        prompt_tokens += synthesis_input + system_tokens + 200
+        completion_tokens += self.EXPECTED_COMPLETION_TOKENS
+        
+        return {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'calls': calls
+        }
+    
+    def estimate_job_duration(self, content_tokens, prompts_to_use=None):
+        """
+        최근 호출 지연 기록으로 작업 1건의 소요 시간 추정 (관점별 분석은 순차 호출)
+        
+        Args:
+            content_tokens: 입력 내용의 토큰 수
+            prompts_to_use: 사용할 프롬프트 키 리스트 (None이면 전체)
+        
+        Returns:
+            dict: {'perspectives': {관점 키: 예상 초}, 'synthesis': 예상 초, 'total_seconds'}
+        """
+        if prompts_to_use is None:
+            prompts_to_use = list(self.PROMPTS.keys())
+        keys = [key for key in prompts_to_use if key in self.PROMPTS]
+        
+        system_tokens = estimate_tokens(self.SYSTEM_PROMPT)
+        perspectives = {
+            key: self.latency_model.predict(
+                content_tokens + system_tokens + estimate_tokens(self.PROMPTS[key]['template'])
+            )
+            for key in keys
+        }
+        
+        synthesis_input = self.EXPECTED_COMPLETION_TOKENS * len(keys)
+        if self.synthesis_mode != 'full':
+            synthesis_input = min(synthesis_input, self.synthesis_budget)
+        synthesis = self.latency_model.predict(synthesis_input + system_tokens + 200)
+        if self.synthesis_mode == 'hierarchical' and len(keys) > self.SYNTHESIS_GROUP_SIZE:
+            # 중간 요약은 병렬이므로 1회분만 더함
+            groups = -(-len(keys) // self.SYNTHESIS_GROUP_SIZE)
+            synthesis += self.latency_model.predict(synthesis_input // groups + system_tokens + 200)
+        
+        return {
+            'perspectives': perspectives,
+            'synthesis': synthesis,
+            'total_seconds': round(sum(perspectives.values()) + synthesis, 1)
+        }
     
     def get_prompt_info(self, prompt_key):
         """특정 프롬프트 정보 반환"""
@@ -236,28 +820,98 @@ Please provide your analysis in Korean."""
         """모든 프롬프트 정보 반환"""
         return self.PROMPTS
     
-    def generate_summary(self, analysis_results):
+    def generate_summary(self, analysis_results, timeout=None, call_gate=None,
+                         mode=None, budget=None, return_stats=False, cancel_event=None):
         """
         분석 결과를 종합하여 요약 생성
         
         Args:
             analysis_results: analyze() 메서드의 반환값
+            timeout: 요약 LLM 호출 최대 대기 시간(초, hierarchical은 단계별 적용)
+            call_gate: LLM 호출 시 진입할 컨텍스트 매니저 팩토리
+            mode: 종합 요약 입력 방식 (None이면 엔진 설정값)
+            budget: 요약 입력 토큰 예산 (None이면 엔진 설정값)
+            return_stats: True면 (요약, 통계) 반환
+            cancel_event: 설정되면 요약 호출을 중단하는 threading.Event
         
         Returns:
             str: 종합 요약
+                 (return_stats면 {'mode', 'input_tokens', 'full_input_tokens', 'calls',
+                  'prompt_tokens', 'completion_tokens', 'latency_seconds'} 통계와 함께 튜플로 반환,
+                  실패 시 'error': True)
+        
+        Raises:
+            JobCancelled: cancel_event로 취소된 경우
         """
-        # 모든 분석 결과를 하나의 컨텍스트로 결합
-        combined_analysis = ""
-        for key, result in analysis_results.items():
-            if not result.get('error'):
-                combined_analysis += f"\n\n## {result['title']}\n{result['result']}"
+        from synthesis_input import build_synthesis_input
+        
+        mode = mode or self.synthesis_mode
+        budget = budget or self.synthesis_budget
+        started = time.monotonic()
         
-        # 종합 요약 프롬프트
-        summary_prompt = f"""다음은 하나의 아이디어/계획/전략을 10가지 관점에서 분석한 결과입니다:
+        # 완료된 분석 결과만 대상
+        completed = {
+            key: result for key, result in analysis_results.items()
+            if not result.get('error') and not result.get('cut')
+        }
+        full_input = "".join(
+            f"\n\n## {result['title']}\n{result['result']}" for result in completed.values()
+        )
+        stats = {
+            'mode': mode,
+            'input_tokens': 0,
+            # input_tokens와 같은 기준으로 비교하도록 full 방식이 보낼 요약 프롬프트 전체를 측정
+            'full_input_tokens': estimate_tokens(self._summary_prompt(full_input, len(completed))),
+            'calls': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'latency_seconds': 0.0
+        }
+        
+        def finish(summary):
+            stats['latency_seconds'] = round(time.monotonic() - started, 3)
+            return (summary, stats) if return_stats else summary
+        
+        if not completed:
+            return finish("완료된 관점별 분석이 없어 종합 요약을 생성하지 못했습니다.")
+        
+        try:
+            if mode == 'hierarchical' and len(completed) > self.SYNTHESIS_GROUP_SIZE:
+                combined_analysis = self._summarize_groups(
+                    completed, budget, timeout, call_gate, stats, cancel_event
+                )
+            elif mode == 'full':
+                combined_analysis = full_input
+            else:
+                combined_analysis, _ = build_synthesis_input(completed, budget)
+                combined_analysis = "\n\n" + combined_analysis
+            
+            summary_prompt = self._summary_prompt(combined_analysis, len(completed))
+            stats['input_tokens'] += estimate_tokens(summary_prompt)
+            stats['calls'] += 1
+            summary, usage = self._call_llm(
+                summary_prompt, timeout=timeout, cancel_event=cancel_event, return_usage=True,
+                call_gate=call_gate
+            )
+            stats['prompt_tokens'] += usage['prompt_tokens']
+            stats['completion_tokens'] += usage['completion_tokens']
+            return finish(summary)
+        except JobCancelled:
+            raise
+        except TimeoutError:
+            stats['error'] = True
+            return finish("요약 생성 중 오류 발생: LLM 응답 시간 초과")
+        except Exception as e:
+            stats['error'] = True
+            return finish(f"요약 생성 중 오류 발생: {str(e)}")
+    
+    def _summary_prompt(self, combined_analysis, completed):
+        """종합 요약 프롬프트"""
+        return f"""다음은 하나의 아이디어/계획/전략을 {completed}가지 관점에서 분석한 결과입니다:
 
 {combined_analysis}
 
-위의 10가지 분석 결과를 종합하여, 다음 내용을 포함한 통합 요약을 작성해주세요:
+위의 {completed}가지 분석 결과를 종합하여, 다음 내용을 포함한 통합 요약을 작성해주세요:
 
 1. **핵심 인사이트**: 가장 중요한 발견사항 3-5가지
 2. **주요 위험 요소**: 반드시 고려해야 할 리스크
@@ -265,12 +919,50 @@ Please provide your analysis in Korean."""
 4. **실행 우선순위**: 먼저 해결해야 할 과제
 
 한국어로 작성해주세요."""
+    
+    def _summarize_groups(self, completed, budget, timeout, call_gate, stats, cancel_event=None):
+        """
+        hierarchical 1단계: 관점 묶음별 중간 요약을 병렬 생성
         
-        try:
-            summary = self._call_llm(summary_prompt)
-            return summary
-        except Exception as e:
-            return f"요약 생성 중 오류 발생: {str(e)}"
+        묶음마다 전체 예산을 나눠 받으므로 예산이 클 때도 호출 1회의 입력은 작게 유지된다.
+        
+        Returns:
+            str: 최종 종합에 넘길 묶음별 중간 요약 결합
+        """
+        from synthesis_input import build_synthesis_input
+        
+        items = list(completed.items())
+        size = self.SYNTHESIS_GROUP_SIZE
+        groups = [dict(items[i:i + size]) for i in range(0, len(items), size)]
+        
+        prompts = []
+        for group in groups:
+            group_input, count = build_synthesis_input(group, budget // len(groups))
+            prompts.append(f"""다음은 하나의 아이디어/계획/전략을 {count}가지 관점에서 분석한 결과의 일부입니다:
+
+{group_input}
+
+이 분석들의 핵심 발견, 위험 요소, 개선 제안을 항목당 한 문장씩 5-8개의 목록으로 정리해주세요.
+한국어로 작성해주세요.""")
+        
+        def summarize(prompt):
+            return self._call_llm(prompt, timeout=timeout, cancel_event=cancel_event, return_usage=True,
+                                  call_gate=call_gate)
+        
+        # 중간 요약은 전용 스레드에서 동시에 요청 (LLM 호출 스레드 풀은 _call_llm이 사용)
+        with ThreadPoolExecutor(max_workers=len(prompts), thread_name_prefix="synthesis") as pool:
+            responses = list(pool.map(summarize, prompts))
+        partials = [text for text, _ in responses]
+        
+        stats['input_tokens'] += sum(estimate_tokens(prompt) for prompt in prompts)
+        stats['calls'] += len(prompts)
+        stats['prompt_tokens'] += sum(usage['prompt_tokens'] for _, usage in responses)
+        stats['completion_tokens'] += sum(usage['completion_tokens'] for _, usage in responses)
+        
+        return "".join(
+            f"\n\n## {' / '.join(result['title'] for result in group.values())}\n{partial}"
+            for group, partial in zip(groups, partials)
+        )
 
 
 # 테스트 코드
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+부하 테스트 (Load Benchmark)
+모의 LLM 서버를 붙인 실제 web_app 서버에 JSONL 요청 기록을 배속 재생하여
+제출/상태/다운로드 엔드포인트의 처리량, 오류율, 지연 백분위수를 측정하고 SLO 위반 시 실패
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ENDPOINTS = ['submit', 'status', 'download']
+
+MOCK_COMPLETION = """## 핵심 분석
+
+- 이 계획의 가장 중요한 가정은 사용자가 결과를 신뢰한다는 점입니다.
+- 초기 데이터가 부족하면 품질이 낮아질 수 있습니다.
+
+따라서 소규모 파일럿으로 시작해 가정을 검증하는 것을 권장합니다.
+"""
+
+
+class MockLLMServer:
+    """OpenAI Chat Completions 형식으로 지연을 흉내 내어 응답하는 로컬 서버"""
+    
+    def __init__(self, latency=1.0, jitter=0.3, error_rate=0.0, seed=0):
+        """
+        Args:
+            latency: 평균 응답 지연(초)
+            jitter: 지연의 표준편차 비율 (로그정규 분포)
+            error_rate: 500 오류로 응답할 비율
+            seed: 난수 시드
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        
+        mock = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with mock._lock:
+                    mock.calls += 1
+                    delay = mock.latency * mock._rng.lognormvariate(0, mock.jitter) if mock.latency else 0
+                    failed = mock._rng.random() < mock.error_rate
+                time.sleep(delay)
+                
+                if failed:
+                    self._send(500, {'error': {'message': 'mock failure', 'type': 'server_error'}})
+                    return
+                prompt_chars = sum(len(m.get('content', '')) for m in body.get('messages', []))
+                usage = {
+                    'prompt_tokens': prompt_chars // 2,
+                    'completion_tokens': len(MOCK_COMPLETION) // 2,
+                    'total_tokens': prompt_chars // 2 + len(MOCK_COMPLETION) // 2
+                }
+                if body.get('stream'):
+                    self._send_stream(body, usage)
+                    return
+                self._send(200, {
+                    'id': f"mock-{mock.calls}",
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': body.get('model', 'mock'),
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': MOCK_COMPLETION},
+                        'finish_reason': 'stop'
+                    }],
+                    'usage': usage
+                })
+            
+            def _send_stream(self, body, usage):
+                """스트리밍 요청은 응답 본문 조각과 사용량 조각을 SSE로 전송"""
+                base = {
+                    'id': f"mock-{mock.calls}",
+                    'object': 'chat.completion.chunk',
+                    'created': int(time.time()),
+                    'model': body.get('model', 'mock')
+                }
+                chunks = [
+                    {**base, 'choices': [{'index': 0, 'delta': {'content': MOCK_COMPLETION}, 'finish_reason': None}]},
+                    {**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+                ]
+                if body.get('stream_options', {}).get('include_usage'):
+                    chunks.append({**base, 'choices': [], 'usage': usage})
+                data = "".join(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n" for chunk in chunks)
+                data = (data + "data: [DONE]\n\n").encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def _send(self, status, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def shutdown(self):
+        self.server.shutdown()
+
+
+def load_trace(path, interval, speedup, limit=None):
+    """
+    JSONL 요청 기록 로드
+    
+    각 줄은 {"t": 시작 후 초, "type": "text"|"url", "text"/"url": ..., "client_id", "format"} 형식이며,
+    requests.jsonl처럼 t/type이 없는 줄은 body(또는 title)를 텍스트 분석 요청으로 보고
+    interval 간격으로 배치한다. 시각은 speedup으로 나눈다.
+    
+    Returns:
+        list: [{'at', 'type', 'value', 'client_id', 'format'}] (시각순)
+    """
+    events = []
+    with open(path, encoding='utf-8') as file:
+        for index, line in enumerate(file):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            input_type = record.get('type', 'text')
+            if input_type == 'url':
+                value = record['url']
+            else:
+                input_type = 'text'
+                value = record.get('text') or record.get('body') or record.get('title') or ''
+            events.append({
+                'at': float(record.get('t', index * interval)) / speedup,
+                'type': input_type,
+                'value': value,
+                'client_id': record.get('client_id', f"client-{index % 4}"),
+                'format': record.get('format', 'markdown')
+            })
+    events.sort(key=lambda event: event['at'])
+    return events[:limit] if limit else events
+
+
+class LoadRunner:
+    """요청 기록을 재생하며 엔드포인트별 응답 시간을 수집"""
+    
+    def __init__(self, base_url, poll_interval=1.0, job_timeout=300.0, request_timeout=30.0):
+        self.base_url = base_url.rstrip('/')
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.request_timeout = request_timeout
+        self.samples = {endpoint: [] for endpoint in ENDPOINTS}  # (지연, 상태 코드)
+        self.jobs = []  # {'status', 'seconds'}
+        self._lock = threading.Lock()
+    
+    def _request(self, endpoint, method, path, data=None, headers=None):
+        """요청 1회 수행 및 기록, (상태 코드, 본문) 반환"""
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method, headers=headers or {}
+        )
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.request_timeout) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+        except (urllib.error.URLError, OSError):
+            status, body = 0, b''
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.samples[endpoint].append((elapsed, status))
+        return status, body
+    
+    def _run_job(self, event):
+        """제출 -> 완료까지 상태 조회 -> 다운로드"""
+        started = time.perf_counter()
+        field = 'url' if event['type'] == 'url' else 'text'
+        form = urllib.parse.urlencode({field: event['value'], 'format': event['format']}).encode('utf-8')
+        status, body = self._request(
+            'submit', 'POST', f"/api/analyze/{event['type']}", data=form,
+            headers={'Content-Type': 'application/x-www-form-urlencoded', 'X-Client-Id': event['client_id']}
+        )
+        if status != 200:
+            self._finish('rejected' if status == 429 else 'submit_error', started)
+            return
+        job_id = json.loads(body)['job_id']
+        
+        job_status = 'timeout'
+        while time.perf_counter() - started < self.job_timeout:
+            status, body = self._request('status', 'GET', f"/api/status/{job_id}")
+            if status == 200:
+                state = json.loads(body)['status']
+                if state in ('completed', 'failed', 'cancelled'):
+                    job_status = state
+                    break
+            time.sleep(self.poll_interval)
+        
+        if job_status == 'completed':
+            status, _ = self._request('download', 'GET', f"/api/download/{job_id}")
+            if status != 200:
+                job_status = 'download_error'
+        self._finish(job_status, started)
+    
+    def _finish(self, status, started):
+        with self._lock:
+            self.jobs.append({'status': status, 'seconds': time.perf_counter() - started})
+    
+    def run(self, events):
+        """기록된 시각에 맞춰 작업을 시작하고 모두 끝날 때까지 대기"""
+        threads = []
+        started = time.perf_counter()
+        for event in events:
+            delay = event['at'] - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+            thread = threading.Thread(target=self._run_job, args=(event,), daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+
+def _percentile(values, q):
+    """최근접 순위 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def summarize(runner, duration):
+    """엔드포인트별/작업별 결과 집계"""
+    result = {'duration_s': round(duration, 2), 'endpoints': {}}
+    for endpoint, samples in runner.samples.items():
+        latencies = [elapsed * 1000 for elapsed, _ in samples]
+        errors = sum(1 for _, status in samples if status != 200 and status != 429)
+        rejected = sum(1 for _, status in samples if status == 429)
+        result['endpoints'][endpoint] = {
+            'requests': len(samples),
+            'rps': round(len(samples) / duration, 2) if duration else 0,
+            'error_rate': round(errors / len(samples), 4) if samples else 0,
+            'rejected_rate': round(rejected / len(samples), 4) if samples else 0,
+            **{f"p{q}_ms": round(_percentile(latencies, q), 1) if latencies else None for q in (50, 90, 99)},
+            'max_ms': round(max(latencies), 1) if latencies else None
+        }
+    
+    counts = {}
+    for job in runner.jobs:
+        counts[job['status']] = counts.get(job['status'], 0) + 1
+    completed = [job['seconds'] for job in runner.jobs if job['status'] == 'completed']
+    result['jobs'] = {
+        'total': len(runner.jobs),
+        'counts': counts,
+        'completed_per_minute': round(len(completed) / duration * 60, 2) if duration else 0,
+        'e2e_p50_s': round(_percentile(completed, 50), 2) if completed else None,
+        'e2e_p95_s': round(_percentile(completed, 95), 2) if completed else None,
+        'failure_rate': round(1 - len(completed) / len(runner.jobs), 4) if runner.jobs else 0
+    }
+    return result
+
+
+def _lookup(result, path):
+    """'status.p99_ms' 또는 'jobs.failure_rate' 형식의 지표 값"""
+    section, _, metric = path.partition('.')
+    container = result['jobs'] if section == 'jobs' else result['endpoints'].get(section, {})
+    return container.get(metric)
+
+
+def check_slos(result, slos, baseline=None, max_regression=None):
+    """
+    SLO 및 기준 결과 대비 회귀 검사
+    
+    Args:
+        slos: {'status.p99_ms': 500, ...} 지표별 상한
+        baseline: 이전 실행 결과 (summarize() 형식)
+        max_regression: 기준 대비 허용 증가율 (0.2 = 20%), 지연/오류율 지표에 적용
+    
+    Returns:
+        list: 위반 내용
+    """
+    failures = []
+    for path, limit in slos.items():
+        value = _lookup(result, path)
+        if value is not None and value > limit:
+            failures.append(f"{path} = {value} > {limit}")
+    
+    if baseline and max_regression is not None:
+        for endpoint in ENDPOINTS:
+            for metric in ('p50_ms', 'p99_ms', 'error_rate'):
+                path = f"{endpoint}.{metric}"
+                before, after = _lookup(baseline, path), _lookup(result, path)
+                if before and after is not None and after > before * (1 + max_regression):
+                    failures.append(f"{path} 회귀: {before} -> {after} (+{(after / before - 1):.0%})")
+    return failures
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_app(mock_url, workers, env_overrides):
+    """모의 LLM에 연결한 web_app 서버를 임시 디렉토리로 실행"""
+    port = _free_port()
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    env = {
+        **os.environ,
+        'OPENAI_BASE_URL': mock_url,
+        'OPENAI_API_KEY': 'load-test',
+        'UPLOAD_DIR': os.path.join(workdir, 'uploads'),
+        'REPORT_DIR': os.path.join(workdir, 'reports'),
+        'SIMILARITY_MODE': 'off',
+        'SCHEDULER_WORKERS': str(workers),
+        # 모든 부하가 같은 IP에서 오므로 시뮬레이션 클라이언트는 헤더로 구분
+        'CLIENT_ID_HEADER': 'X-Client-Id',
+        **env_overrides
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'web_app:app', '--host', '127.0.0.1', '--port', str(port)],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{base}/api/health", timeout=1).read()
+            return server, base
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError("web_app 서버가 시작되지 않았습니다.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="web_app HTTP 부하 테스트 (모의 LLM)")
+    parser.add_argument('trace', help="요청 기록 JSONL 파일 (예: requests.jsonl)")
+    parser.add_argument('--speedup', type=float, default=1.0, help="재생 배속")
+    parser.add_argument('--interval', type=float, default=1.0, help="t가 없는 기록의 요청 간격(초)")
+    parser.add_argument('--limit', type=int, help="재생할 최대 요청 수")
+    parser.add_argument('--url', help="이미 실행 중인 서버 주소 (지정 시 서버/모의 LLM을 띄우지 않음)")
+    parser.add_argument('--workers', type=int, default=4, help="서버 SCHEDULER_WORKERS")
+    parser.add_argument('--env', action='append', default=[], help="서버 환경 변수 (NAME=VALUE, 반복 가능)")
+    parser.add_argument('--llm-latency', type=float, default=1.0, help="모의 LLM 평균 지연(초)")
+    parser.add_argument('--llm-jitter', type=float, default=0.3, help="모의 LLM 지연 분산 (로그정규 시그마)")
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help="모의 LLM 오류 비율")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="상태 조회 간격(초)")
+    parser.add_argument('--job-timeout', type=float, default=300.0, help="작업 1건 최대 대기(초)")
+    parser.add_argument('--slo', action='append', default=[],
+                        help="지표 상한 (예: status.p99_ms=500, submit.error_rate=0.01, jobs.failure_rate=0.05)")
+    parser.add_argument('--baseline', help="비교할 이전 결과 JSON (--output으로 저장한 파일)")
+    parser.add_argument('--max-regression', type=float, default=0.2, help="기준 대비 허용 증가율")
+    parser.add_argument('--output', help="결과를 JSON 파일로 저장")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+    
+    slos = {}
+    for item in args.slo:
+        path, _, value = item.partition('=')
+        slos[path.strip()] = float(value)
+    env_overrides = dict(item.split('=', 1) for item in args.env if '=' in item)
+    
+    events = load_trace(args.trace, args.interval, args.speedup, args.limit)
+    
+    mock = server = None
+    base_url = args.url
+    if base_url is None:
+        mock = MockLLMServer(args.llm_latency, args.llm_jitter, args.llm_error_rate)
+        server, base_url = start_app(mock.base_url, args.workers, env_overrides)
+    
+    try:
+        runner = LoadRunner(base_url, args.poll_interval, args.job_timeout)
+        duration = runner.run(events)
+        result = summarize(runner, duration)
+        if mock is not None:
+            result['llm_calls'] = mock.calls
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+        if mock is not None:
+            mock.shutdown()
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+    failures = check_slos(result, slos, baseline, args.max_regression)
+    result['failures'] = failures
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+    
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"=== 부하 테스트 (요청 {len(events)}건, {args.speedup}배속, {result['duration_s']}s) ===")
+        for endpoint, stats in result['endpoints'].items():
+            print(f"{endpoint:>9}: {stats['requests']}건, {stats['rps']} req/s, "
+                  f"오류 {stats['error_rate']:.2%}, 거절 {stats['rejected_rate']:.2%}, "
+                  f"p50 {stats['p50_ms']}ms / p90 {stats['p90_ms']}ms / p99 {stats['p99_ms']}ms")
+        jobs = result['jobs']
+        print(f"     작업: {jobs['counts']}, 분당 완료 {jobs['completed_per_minute']}, "
+              f"종단 간 p50 {jobs['e2e_p50_s']}s / p95 {jobs['e2e_p95_s']}s")
+        if 'llm_calls' in result:
+            print(f" LLM 호출: {result['llm_calls']}회")
+        for failure in failures:
+            print(f"\n실패: {failure}")
+    
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+시작 시간 벤치마크 (Startup Benchmark)
+web_app 모듈 임포트 시간, 서버 기동 후 첫 응답까지의 시간, 첫 요청 지연을 측정
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+# 첫 요청 전에 로드되면 안 되는 무거운 의존성
+HEAVY_MODULES = ['openai', 'bs4', 'PyPDF2', 'pdfplumber', 'requests', 'markdown', 'numpy']
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import web_app
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    'import_seconds': elapsed,
+    'loaded_heavy_modules': [m for m in %r if m in sys.modules]
+}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_import(runs):
+    """새 인터프리터에서 web_app 임포트 시간 측정"""
+    samples = []
+    loaded = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_PROBE],
+            cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result['import_seconds'])
+        loaded.update(result['loaded_heavy_modules'])
+    return samples, sorted(loaded)
+
+
+def slowest_imports(limit):
+    """-X importtime 출력에서 누적 임포트 시간이 큰 모듈 목록"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import web_app'],
+        cwd=APP_DIR, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # 형식: "import time: <self us> | <cumulative us> | <module>"
+        _, cumulative_us, name = line.split(':', 1)[1].split('|')
+        rows.append((int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def _free_port():
+    """사용 가능한 로컬 포트 번호"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _get(url, timeout=5):
+    """GET 요청 후 (상태 코드, 소요 시간) 반환"""
+    started = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        response.read()
+        return response.status, time.perf_counter() - started
+
+
+def measure_server(timeout):
+    """uvicorn 서버 기동부터 /api/health 첫 응답까지의 시간과 첫 요청 지연 측정"""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'web_app:app', '--host', '127.0.0.1', '--port', str(port)],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError("서버가 제한 시간 내에 응답하지 않았습니다.")
+            try:
+                _get(f"{base}/api/health", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.02)
+        ready = time.perf_counter() - started
+        
+        first = {}
+        for path in ['/api/health', '/api/prompts']:
+            _, first[path] = _get(f"{base}{path}")
+        return ready, first
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="web_app 시작 시간 벤치마크")
+    parser.add_argument('--runs', type=int, default=5, help="임포트 측정 반복 횟수")
+    parser.add_argument('--top', type=int, default=10, help="출력할 느린 임포트 모듈 수")
+    parser.add_argument('--no-server', action='store_true', help="서버 기동 측정 생략")
+    parser.add_argument('--server-timeout', type=float, default=30.0, help="서버 기동 대기 제한(초)")
+    parser.add_argument('--max-import-ms', type=float, help="임포트 시간 중앙값 상한 (초과 시 실패)")
+    parser.add_argument('--max-ready-ms', type=float, help="첫 헬스 체크 응답 시간 상한 (초과 시 실패)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+    
+    samples, loaded = measure_import(args.runs)
+    result = {
+        'import_ms': {
+            'median': statistics.median(samples) * 1000,
+            'min': min(samples) * 1000,
+            'max': max(samples) * 1000
+        },
+        'loaded_heavy_modules': loaded,
+        'slowest_imports': [
+            {'module': name, 'cumulative_ms': us / 1000} for us, name in slowest_imports(args.top)
+        ]
+    }
+    if not args.no_server:
+        ready, first = measure_server(args.server_timeout)
+        result['ready_ms'] = ready * 1000
+        result['first_request_ms'] = {path: seconds * 1000 for path, seconds in first.items()}
+    
+    failures = []
+    if loaded:
+        failures.append(f"임포트 시 무거운 의존성 로드됨: {', '.join(loaded)}")
+    if args.max_import_ms is not None and result['import_ms']['median'] > args.max_import_ms:
+        failures.append(f"임포트 시간 {result['import_ms']['median']:.0f}ms > {args.max_import_ms:.0f}ms")
+    if args.max_ready_ms is not None and result.get('ready_ms', 0) > args.max_ready_ms:
+        failures.append(f"기동 시간 {result['ready_ms']:.0f}ms > {args.max_ready_ms:.0f}ms")
+    result['failures'] = failures
+    
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print("=== 시작 시간 벤치마크 ===")
+        imp = result['import_ms']
+        print(f"web_app 임포트: 중앙값 {imp['median']:.1f}ms (최소 {imp['min']:.1f}ms, 최대 {imp['max']:.1f}ms)")
+        if 'ready_ms' in result:
+            print(f"서버 기동 → 첫 /api/health 응답: {result['ready_ms']:.1f}ms")
+            for path, ms in result['first_request_ms'].items():
+                print(f"첫 요청 {path}: {ms:.1f}ms")
+        print("\n느린 임포트 (누적):")
+        for row in result['slowest_imports']:
+            print(f"  {row['cumulative_ms']:8.1f}ms  {row['module']}")
+        for failure in failures:
+            print(f"\n실패: {failure}")
+    
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+종합 요약 벤치마크 (Synthesis Benchmark)
+보관된 분석 결과로 종합 요약 입력 방식(full/compressed/hierarchical)별
+입력 토큰, 호출 수, 지연 시간, full 대비 요약 유사도(ROUGE)를 측정
+"""
+
+import sys
+import json
+import argparse
+import statistics
+
+from analysis_engine import ThinkingPromptsEngine
+from job_archive import JobArchive
+from synthesis_input import rouge_n
+
+
+def load_from_archive(path, limit, min_perspectives):
+    """분석 보관소에서 완료된 관점이 충분한 최근 작업의 결과 로드"""
+    archive = JobArchive(path)
+    jobs = []
+    cursor = None
+    while len(jobs) < limit:
+        page = archive.list(limit=50, cursor=cursor)
+        for item in page['items']:
+            job = archive.get(item['job_id'])
+            results = {
+                p['key']: {'title': p['title'], 'result': p['result'], 'cut': p['cut'], 'error': p['error']}
+                for p in job['perspectives']
+            }
+            if sum(1 for r in results.values() if not r['cut'] and not r['error']) >= min_perspectives:
+                jobs.append((item['job_id'], results))
+            if len(jobs) >= limit:
+                break
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    return jobs
+
+
+def load_from_file(path):
+    """analyze() 결과 형식의 JSON 파일 로드 (객체 하나 또는 목록)"""
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    if isinstance(data, dict):
+        data = [data]
+    return [(f"{path}#{i}", results) for i, results in enumerate(data)]
+
+
+def run(jobs, modes, budget, dry_run):
+    """작업별/방식별 요약 생성 및 측정"""
+    engine = ThinkingPromptsEngine(synthesis_budget=budget)
+    if dry_run:
+        # LLM 없이 입력 크기만 측정
+        engine._request_completion = lambda prompt, timeout=None, abort=None: ""
+    
+    rows = []
+    for job_id, results in jobs:
+        summaries = {}
+        for mode in modes:
+            summary, stats = engine.generate_summary(results, mode=mode, return_stats=True)
+            summaries[mode] = summary
+            rows.append({'job_id': job_id, **stats})
+        if not dry_run and 'full' in summaries:
+            for row in rows[-len(modes):]:
+                reference, candidate = summaries['full'], summaries[row['mode']]
+                row['rouge1'] = round(rouge_n(reference, candidate, 1), 3)
+                row['rouge2'] = round(rouge_n(reference, candidate, 2), 3)
+    return rows
+
+
+def aggregate(rows, modes):
+    """방식별 평균/중앙값"""
+    result = {}
+    for mode in modes:
+        selected = [row for row in rows if row['mode'] == mode]
+        if not selected:
+            continue
+        summary = {
+            'jobs': len(selected),
+            'input_tokens_mean': round(statistics.mean(r['input_tokens'] for r in selected)),
+            'full_input_tokens_mean': round(statistics.mean(r['full_input_tokens'] for r in selected)),
+            'calls_mean': round(statistics.mean(r['calls'] for r in selected), 2),
+            'latency_median_s': round(statistics.median(r['latency_seconds'] for r in selected), 3)
+        }
+        if 'rouge1' in selected[0]:
+            summary['rouge1_mean'] = round(statistics.mean(r['rouge1'] for r in selected), 3)
+            summary['rouge2_mean'] = round(statistics.mean(r['rouge2'] for r in selected), 3)
+        result[mode] = summary
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="종합 요약 입력 방식 비교")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--archive', help="분석 보관소 SQLite 경로 (JOB_ARCHIVE_PATH)")
+    source.add_argument('--results', help="analyze() 결과 JSON 파일")
+    parser.add_argument('--limit', type=int, default=10, help="보관소에서 사용할 최근 작업 수")
+    parser.add_argument('--min-perspectives', type=int, default=5, help="사용할 작업의 최소 완료 관점 수")
+    parser.add_argument('--modes', default=','.join(ThinkingPromptsEngine.SYNTHESIS_MODES),
+                        help="비교할 방식 (쉼표 구분, 유사도는 full 대비)")
+    parser.add_argument('--budget', type=int, default=3000, help="요약 입력 토큰 예산")
+    parser.add_argument('--dry-run', action='store_true', help="LLM을 호출하지 않고 입력 크기만 측정")
+    parser.add_argument('--min-rouge1', type=float, help="full 대비 ROUGE-1 평균 하한 (미달 시 실패)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+    
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    if args.archive:
+        jobs = load_from_archive(args.archive, args.limit, args.min_perspectives)
+    else:
+        jobs = load_from_file(args.results)
+    if not jobs:
+        print("측정할 분석 결과가 없습니다.")
+        sys.exit(1)
+    
+    rows = run(jobs, modes, args.budget, args.dry_run)
+    result = {'budget': args.budget, 'modes': aggregate(rows, modes), 'jobs': rows}
+    
+    failures = []
+    if args.min_rouge1 is not None:
+        for mode, summary in result['modes'].items():
+            if mode != 'full' and summary.get('rouge1_mean', 1.0) < args.min_rouge1:
+                failures.append(f"{mode} ROUGE-1 {summary['rouge1_mean']:.3f} < {args.min_rouge1:.3f}")
+    result['failures'] = failures
+    
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"=== 종합 요약 벤치마크 (작업 {len(jobs)}건, 예산 {args.budget} 토큰) ===")
+        for mode, summary in result['modes'].items():
+            line = (f"{mode:>12}: 입력 {summary['input_tokens_mean']} 토큰 "
+                    f"(full {summary['full_input_tokens_mean']}), 호출 {summary['calls_mean']}회, "
+                    f"지연 중앙값 {summary['latency_median_s']}s")
+            if 'rouge1_mean' in summary:
+                line += f", ROUGE-1 {summary['rouge1_mean']:.3f} / ROUGE-2 {summary['rouge2_mean']:.3f}"
+            print(line)
+        for failure in failures:
+            print(f"\n실패: {failure}")
+    
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+코퍼스 군집화 (Corpus Clustering)
+많은 문서를 로컬에서 벡터화/군집화하여 군집별 대표 문서와 통계만 LLM 분석에 전달
+"""
+
+import re
+import math
+import zlib
+
+import numpy as np
+
+
+class CorpusClusterer:
+    """해싱 TF-IDF 벡터와 구면 k-means로 문서 군집과 대표 문서를 고르는 클래스"""
+    
+    _TOKEN_PATTERN = re.compile(r'[0-9a-z가-힣]{2,}')
+    
+    def __init__(self, n_features=2 ** 16, max_clusters=8, representatives_per_cluster=2,
+                 max_iter=30, max_chars=100000, seed=0):
+        """
+        Args:
+            n_features: 해싱 특징 공간 크기
+            max_clusters: 최대 군집 수
+            representatives_per_cluster: 군집마다 고를 대표 문서 수
+            max_iter: k-means 최대 반복 횟수
+            max_chars: 문서당 벡터화에 사용할 최대 문자 수
+            seed: 초기 중심 선택 난수 시드 (같은 입력이면 같은 결과)
+        """
+        self.n_features = n_features
+        self.max_clusters = max_clusters
+        self.representatives_per_cluster = representatives_per_cluster
+        self.max_iter = max_iter
+        self.max_chars = max_chars
+        self.seed = seed
+    
+    def tokenize(self, text):
+        """소문자 단어 토큰 (2자 이상, 숫자만으로 된 토큰 제외)"""
+        tokens = self._TOKEN_PATTERN.findall(text[:self.max_chars].lower())
+        return [token for token in tokens if not token.isdigit()]
+    
+    def vectorize(self, texts):
+        """
+        문서를 L2 정규화된 해싱 TF-IDF 희소 행렬(CSR 배열)로 변환
+        
+        Returns:
+            tuple: (indptr, indices, data, feature_terms)
+                   feature_terms는 특징 번호 -> 대표 단어 (핵심어 표시용)
+        """
+        rows = []
+        feature_terms = {}
+        df = np.zeros(self.n_features, dtype=np.int32)
+        for text in texts:
+            tokens = self.tokenize(text)
+            features = np.fromiter(
+                (zlib.crc32(token.encode('utf-8')) % self.n_features for token in tokens),
+                dtype=np.int64, count=len(tokens)
+            )
+            for token, feature in zip(tokens, features.tolist()):
+                feature_terms.setdefault(feature, token)
+            indices, counts = np.unique(features, return_counts=True)
+            df[indices] += 1
+            rows.append((indices, counts))
+        
+        idf = np.log((1 + len(texts)) / (1 + df)).astype(np.float32) + 1.0
+        
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(indices) for indices, _ in rows])
+        indices = np.concatenate([r[0] for r in rows]) if rows else np.zeros(0, dtype=np.int64)
+        data = np.zeros(len(indices), dtype=np.float32)
+        for i, (row_indices, counts) in enumerate(rows):
+            weights = (1.0 + np.log(counts)).astype(np.float32) * idf[row_indices]
+            norm = np.linalg.norm(weights)
+            data[indptr[i]:indptr[i + 1]] = weights / norm if norm > 0 else weights
+        return indptr, indices, data, feature_terms
+    
+    def _similarities(self, indptr, indices, data, centroids):
+        """문서 x 중심 코사인 유사도 (희소 행렬 곱)"""
+        row_ids = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        sims = np.zeros((len(indptr) - 1, len(centroids)), dtype=np.float32)
+        np.add.at(sims, row_ids, data[:, None] * centroids[:, indices].T)
+        return sims
+    
+    def _row(self, indptr, indices, data, i):
+        """i번째 문서의 조밀 벡터"""
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        vector[indices[indptr[i]:indptr[i + 1]]] = data[indptr[i]:indptr[i + 1]]
+        return vector
+    
+    def choose_k(self, n_docs):
+        """문서 수에 따른 군집 수 (sqrt(n/2) 규칙, 최대 max_clusters)"""
+        return max(1, min(self.max_clusters, n_docs, round(math.sqrt(n_docs / 2))))
+    
+    def cluster(self, texts, k=None):
+        """
+        문서 군집화
+        
+        Args:
+            texts: 문서 텍스트 리스트
+            k: 군집 수 (None이면 문서 수로 결정)
+        
+        Returns:
+            list: 군집 크기 내림차순 [{
+                'members': 문서 번호 리스트,
+                'representatives': 중심에 가까운 대표 문서 번호 리스트,
+                'keywords': 중심 벡터 상위 단어,
+                'cohesion': 구성 문서와 중심의 평균 코사인 유사도
+            }]
+        """
+        if not texts:
+            return []
+        
+        indptr, indices, data, feature_terms = self.vectorize(texts)
+        n_docs = len(texts)
+        k = min(k or self.choose_k(n_docs), n_docs)
+        rng = np.random.default_rng(self.seed)
+        
+        # k-means++ 초기 중심
+        chosen = [int(rng.integers(n_docs))]
+        centroids = self._row(indptr, indices, data, chosen[0])[None, :]
+        while len(chosen) < k:
+            distance = np.clip(1.0 - self._similarities(indptr, indices, data, centroids).max(axis=1), 0, None)
+            distance[chosen] = 0
+            if distance.sum() <= 0:
+                break
+            chosen.append(int(rng.choice(n_docs, p=distance ** 2 / (distance ** 2).sum())))
+            centroids = np.vstack([centroids, self._row(indptr, indices, data, chosen[-1])])
+        k = len(centroids)
+        
+        row_ids = np.repeat(np.arange(n_docs), np.diff(indptr))
+        labels = None
+        for _ in range(self.max_iter):
+            sims = self._similarities(indptr, indices, data, centroids)
+            new_labels = sims.argmax(axis=1)
+            if labels is not None and np.array_equal(labels, new_labels):
+                break
+            labels = new_labels
+            
+            # 중심 갱신 (빈 군집은 가장 멀리 떨어진 문서로 다시 시작)
+            centroids = np.zeros((k, self.n_features), dtype=np.float32)
+            np.add.at(centroids, (labels[row_ids], indices), data)
+            for c in range(k):
+                if not np.any(labels == c):
+                    farthest = int(sims.max(axis=1).argmin())
+                    centroids[c] = self._row(indptr, indices, data, farthest)
+                    labels[farthest] = c
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids /= np.where(norms > 0, norms, 1.0)
+        
+        sims = self._similarities(indptr, indices, data, centroids)
+        clusters = []
+        for c in range(k):
+            members = np.flatnonzero(labels == c)
+            if len(members) == 0:
+                continue
+            member_sims = sims[members, c]
+            order = members[np.argsort(-member_sims, kind='stable')]
+            top_features = np.argsort(-centroids[c])[:8]
+            clusters.append({
+                'members': members.tolist(),
+                'representatives': order[:self.representatives_per_cluster].tolist(),
+                'keywords': [feature_terms[f] for f in top_features.tolist()
+                             if centroids[c, f] > 0 and f in feature_terms],
+                'cohesion': round(float(member_sims.mean()), 3)
+            })
+        clusters.sort(key=lambda cluster: len(cluster['members']), reverse=True)
+        return clusters
+    
+    def build_digest(self, documents, clusters, excerpt_chars=2000):
+        """
+        군집 통계와 대표 문서 발췌로 분석용 요약 텍스트 생성
+        
+        Args:
+            documents: [{'title', 'content'}] (cluster()에 넘긴 순서)
+            clusters: cluster() 결과
+            excerpt_chars: 대표 문서당 최대 발췌 길이
+        
+        Returns:
+            str: 관점 분석에 넘길 텍스트 (문서 수와 무관하게 군집 수 x 대표 문서 수로 제한됨)
+        """
+        total = len(documents)
+        lines = [
+            f"다음은 문서 {total}개를 내용 유사도로 {len(clusters)}개 그룹으로 나눈 결과와 "
+            f"그룹별 대표 문서 발췌입니다.",
+            ""
+        ]
+        for number, cluster in enumerate(clusters, 1):
+            size = len(cluster['members'])
+            lines.append(
+                f"## 그룹 {number}: 문서 {size}개 ({size / total:.0%}), "
+                f"응집도 {cluster['cohesion']:.2f}"
+            )
+            if cluster['keywords']:
+                lines.append(f"핵심어: {', '.join(cluster['keywords'])}")
+            lines.append("")
+            for index in cluster['representatives']:
+                document = documents[index]
+                excerpt = document['content'][:excerpt_chars].strip()
+                if len(document['content']) > excerpt_chars:
+                    excerpt += " ..."
+                lines.extend([f"### 대표 문서: {document['title']}", excerpt, ""])
+        return "\n".join(lines).strip()
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    import time
+    
+    topics = {
+        '교육': "AI 교육 플랫폼 학습자 맞춤형 콘텐츠 추천 피드백 학습 분석 강의",
+        '물류': "물류 자동화 창고 관리 배송 경로 최적화 재고 로봇 운송",
+        '의료': "의료 영상 진단 환자 데이터 병원 처방 임상 치료",
+    }
+    rng = np.random.default_rng(1)
+    documents = []
+    for topic, words in topics.items():
+        vocabulary = words.split()
+        for i in range(60):
+            content = " ".join(rng.choice(vocabulary, size=80)) + f" 문서{i}"
+            documents.append({'title': f"{topic} 사례 {i + 1}", 'content': content})
+    
+    clusterer = CorpusClusterer(max_clusters=3)
+    started = time.perf_counter()
+    clusters = clusterer.cluster([d['content'] for d in documents])
+    elapsed = time.perf_counter() - started
+    
+    print("=== 코퍼스 군집화 테스트 ===")
+    print(f"문서 {len(documents)}개 -> 군집 {len(clusters)}개 ({elapsed * 1000:.0f}ms)")
+    for cluster in clusters:
+        titles = {documents[i]['title'].split()[0] for i in cluster['members']}
+        print(f"  크기 {len(cluster['members'])}, 주제 {titles}, 핵심어 {cluster['keywords'][:4]}, "
+              f"대표 {[documents[i]['title'] for i in cluster['representatives']]}")
+    digest = clusterer.build_digest(documents, clusters, excerpt_chars=80)
+    print(f"\n요약 텍스트 길이: {len(digest)}자 (원문 합계 {sum(len(d['content']) for d in documents)}자)")
@@ -7,33 +7,59 @@
 
 import os
 import re
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
-import PyPDF2
-import pdfplumber
+import tempfile
+from urllib.parse import urlparse, unquote
+
+from text_normalizer import TextNormalizer
+from analysis_engine import estimate_tokens, check_cancelled, JobCancelled
+from memory_tracking import check_limit, ResourceLimitExceeded
+
+# requests, bs4, PyPDF2, pdfplumber는 시작 시간을 줄이기 위해
+# 해당 입력 유형을 처음 처리할 때 불러옴
 
 
 class InputProcessor:
     """입력 데이터를 처리하여 통합된 텍스트로 변환하는 클래스"""
     
-    def __init__(self):
+    # URL 응답 본문 판별: 앞부분 1KB 안에 PDF 헤더가 있으면 PDF (PDF 규격상 헤더 위치 허용 범위)
+    PDF_MAGIC = b'%PDF-'
+    SNIFF_BYTES = 1024
+    HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'application/xml', 'text/xml')
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, max_tokens=None, max_download_bytes=50 * 1024 * 1024, max_html_bytes=5 * 1024 * 1024,
+                 max_input_bytes=None, max_chars=None):
+        """
+        Args:
+            max_tokens: PDF에서 추출할 최대 토큰 수 (None이면 제한 없음, 도달 시 이후 페이지는 읽지 않음)
+            max_download_bytes: URL로 받는 문서(PDF) 최대 크기 (넘으면 다운로드 중단 후 오류)
+            max_html_bytes: URL로 받는 HTML/텍스트 최대 크기 (넘는 부분은 읽지 않음)
+            max_input_bytes: 텍스트/PDF 파일 입력 최대 크기 (None이면 제한 없음, 넘으면 ResourceLimitExceeded)
+            max_chars: 추출한 텍스트 최대 문자 수 (None이면 제한 없음, 넘는 즉시 ResourceLimitExceeded)
+        """
+        self.max_tokens = max_tokens
+        self.max_download_bytes = max_download_bytes
+        self.max_html_bytes = max_html_bytes
+        self.max_input_bytes = max_input_bytes
+        self.max_chars = max_chars
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.normalizer = TextNormalizer()
     
-    def process(self, input_data, input_type='auto'):
+    def process(self, input_data, input_type='auto', cancel_event=None):
         """
         입력 데이터를 처리하여 텍스트 추출
         
         Args:
             input_data: 입력 데이터 (텍스트, URL, 파일 경로)
             input_type: 'auto', 'text', 'url', 'pdf'
+            cancel_event: 설정되면 URL 다운로드/PDF 추출을 다음 청크/페이지에서 중단하는 threading.Event
         
         Returns:
             dict: {
-                'content': 추출된 텍스트,
-                'metadata': 메타데이터 (제목, 출처 등),
+                'content': 추출된 텍스트 (정규화 적용),
+                'metadata': 메타데이터 (제목, 출처, 정규화 절감량 등),
                 'type': 입력 타입
             }
         """
@@ -41,9 +67,9 @@ class InputProcessor:
             input_type = self._detect_input_type(input_data)
         
         if input_type == 'url':
-            return self._process_url(input_data)
+            return self._process_url(input_data, cancel_event)
         elif input_type == 'pdf':
-            return self._process_pdf(input_data)
+            return self._process_pdf(input_data, cancel_event)
         else:  # text
             return self._process_text(input_data)
     
@@ -69,72 +95,247 @@ class InputProcessor:
         # 기본값: 텍스트
         return 'text'
     
+    def _check_input_bytes(self, size):
+        """입력 크기 한도 확인"""
+        check_limit('input_bytes', size, self.max_input_bytes, lambda: (
+            f"입력 크기 {size / (1024 * 1024):.1f}MB가 작업당 한도 "
+            f"{self.max_input_bytes / (1024 * 1024):.1f}MB를 넘습니다."
+        ))
+    
+    def _check_chars(self, chars):
+        """추출 문자 수 한도 확인 (PDF는 페이지마다 누적값으로 호출해 한도를 넘는 즉시 중단)"""
+        check_limit('extracted_chars', chars, self.max_chars,
+                    lambda: f"추출한 텍스트가 작업당 한도 {self.max_chars:,}자를 넘습니다 ({chars:,}자 이상).")
+    
     def _process_text(self, text):
         """텍스트 입력 처리"""
+        self._check_input_bytes(len(text.encode('utf-8')))
+        self._check_chars(len(text))
+        content, normalization = self.normalizer.process(text)
         return {
-            'content': text.strip(),
+            'content': content,
             'metadata': {
                 'title': self._extract_title_from_text(text),
                 'source': 'Direct Input',
-                'length': len(text)
+                'length': len(content),
+                'normalization': normalization
             },
             'type': 'text'
         }
     
-    def _process_url(self, url):
-        """URL 입력 처리 - 웹 페이지 크롤링"""
+    def _process_url(self, url, cancel_event=None):
+        """
+        URL 입력 처리 - 응답을 스트리밍으로 받아 형식별로 처리
+        
+        본문 앞부분의 매직 바이트와 Content-Type으로 판별한다.
+        PDF는 크기 제한 안에서 임시 파일로 받아 PDF 추출 경로로, HTML/텍스트는 크기 제한까지만 읽어 본문을 추출한다.
+        """
+        import requests
+        
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 제목 추출
-            title = self._extract_title_from_html(soup)
-            
-            # 본문 추출
-            content = self._extract_content_from_html(soup)
-            
-            return {
-                'content': content,
-                'metadata': {
-                    'title': title,
-                    'source': url,
-                    'domain': urlparse(url).netloc,
-                    'length': len(content)
-                },
-                'type': 'url'
-            }
+            with requests.get(url, headers=self.headers, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                chunks = response.iter_content(self.DOWNLOAD_CHUNK_SIZE)
+                
+                # 판별에 필요한 앞부분만 먼저 읽음
+                head = b''
+                for chunk in chunks:
+                    head += chunk
+                    if len(head) >= self.SNIFF_BYTES:
+                        break
+                
+                kind = self._detect_url_content(content_type, head)
+                if kind == 'pdf':
+                    declared = int(response.headers.get('Content-Length') or 0)
+                    check_limit('input_bytes', declared, self.max_download_bytes,
+                                lambda: self._size_error(declared))
+                    with tempfile.NamedTemporaryFile(suffix='.pdf') as tmp:
+                        self._download(head, chunks, tmp, cancel_event)
+                        result = self._process_pdf(tmp.name, cancel_event)
+                    return self._url_result(url, result, content_type or 'application/pdf')
+                
+                if kind == 'html' or kind == 'text':
+                    body, truncated = self._read_limited(head, chunks, cancel_event)
+                    charset = response.encoding if 'charset' in response.headers.get('Content-Type', '') else None
+                    result = self._parse_html(body, charset) if kind == 'html' else self._parse_plain(body, charset)
+                    if truncated:
+                        result['metadata']['download_truncated_bytes'] = self.max_html_bytes
+                    return self._url_result(url, result, content_type or 'text/html')
+                
+                raise ValueError(f"지원하지 않는 콘텐츠 유형입니다: {content_type or '알 수 없음'}")
         
+        except (JobCancelled, ResourceLimitExceeded):
+            raise
         except Exception as e:
             raise Exception(f"URL 처리 중 오류 발생: {str(e)}")
     
-    def _process_pdf(self, pdf_path):
-        """PDF 파일 처리 - 텍스트 추출"""
+    def _detect_url_content(self, content_type, head):
+        """
+        URL 응답 형식 판별 (매직 바이트 우선, 없으면 Content-Type)
+        
+        Returns:
+            str: 'pdf', 'html', 'text', 'binary'
+        """
+        if self.PDF_MAGIC in head[:self.SNIFF_BYTES]:
+            return 'pdf'
+        if content_type in self.HTML_CONTENT_TYPES:
+            return 'html'
+        if content_type.startswith('text/'):
+            return 'text'
+        # Content-Type이 없거나 잘못 지정된 경우: 마크업으로 시작하면 HTML로 처리
+        stripped = head.lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+        if stripped.startswith((b'<!doctype', b'<html', b'<?xml', b'<head', b'<body')):
+            return 'html'
+        if content_type in ('', 'application/octet-stream') and b'\x00' not in head:
+            return 'text'
+        return 'binary'
+    
+    def _size_error(self, size=None):
+        """다운로드 크기 제한 초과 오류 메시지"""
+        limit = self.max_download_bytes / (1024 * 1024)
+        actual = f" ({size / (1024 * 1024):.1f}MB)" if size else ""
+        return f"문서 크기가 제한 {limit:.1f}MB를 넘습니다{actual}."
+    
+    def _download(self, head, chunks, file, cancel_event=None):
+        """응답 본문을 파일로 스트리밍 저장 (크기 제한을 넘으면 중단)"""
+        size = len(head)
+        file.write(head)
+        for chunk in chunks:
+            check_cancelled(cancel_event)
+            size += len(chunk)
+            check_limit('input_bytes', size, self.max_download_bytes, self._size_error)
+            file.write(chunk)
+        file.flush()
+    
+    def _read_limited(self, head, chunks, cancel_event=None):
+        """
+        HTML/텍스트 본문을 크기 제한까지만 읽음
+        
+        Returns:
+            tuple: (본문 바이트, 제한으로 잘렸는지 여부)
+        """
+        body = bytearray(head[:self.max_html_bytes])
+        if len(head) > self.max_html_bytes:
+            return bytes(body), True
+        for chunk in chunks:
+            check_cancelled(cancel_event)
+            if len(body) + len(chunk) > self.max_html_bytes:
+                body += chunk[:self.max_html_bytes - len(body)]
+                return bytes(body), True
+            body += chunk
+        return bytes(body), False
+    
+    def _parse_html(self, body, charset=None):
+        """HTML 본문에서 제목과 본문 추출 (인코딩 미지정 시 meta charset/내용으로 판별)"""
+        from bs4 import BeautifulSoup
+        
+        soup = BeautifulSoup(body, 'html.parser', from_encoding=charset)
+        title = self._extract_title_from_html(soup)
+        text = self._extract_content_from_html(soup)
+        self._check_chars(len(text))
+        content, normalization = self.normalizer.process(text)
+        return {'content': content, 'metadata': {'title': title, 'normalization': normalization}}
+    
+    def _parse_plain(self, body, charset=None):
+        """텍스트 본문 처리"""
+        from bs4 import UnicodeDammit
+        
+        text = UnicodeDammit(body, [charset] if charset else []).unicode_markup or ''
+        self._check_chars(len(text))
+        content, normalization = self.normalizer.process(text)
+        return {
+            'content': content,
+            'metadata': {'title': self._extract_title_from_text(text), 'normalization': normalization}
+        }
+    
+    def _url_result(self, url, result, content_type):
+        """형식별 처리 결과에 URL 출처 정보 추가"""
+        metadata = result['metadata']
+        parsed = urlparse(url)
+        if metadata.get('source') and metadata.get('title') == os.path.basename(metadata['source']):
+            # PDF 메타데이터에 제목이 없으면 임시 파일명 대신 URL의 파일명 사용
+            metadata['title'] = unquote(os.path.basename(parsed.path)) or parsed.netloc
+        metadata.update({
+            'source': url,
+            'domain': parsed.netloc,
+            'content_type': content_type,
+            'length': len(result['content'])
+        })
+        return {'content': result['content'], 'metadata': metadata, 'type': 'url'}
+    
+    def iter_pdf_pages(self, pdf_path):
+        """
+        PDF 텍스트를 페이지 단위로 추출하는 생성기
+        
+        pdfplumber를 우선 사용하고, 실패하면 그 페이지부터 PyPDF2로 이어서 추출한다.
+        처리한 페이지의 레이아웃 캐시는 바로 비워 메모리 사용량이 문서 크기에 비례하지 않게 한다.
+        
+        Yields:
+            tuple: (페이지 번호(0부터), 전체 페이지 수, 텍스트)
+        """
+        import PyPDF2
+        import pdfplumber
+        
+        next_page = 0
+        try:
+            with pdfplumber.open(pdf_path) as pdf:
+                total = len(pdf.pages)
+                for page in pdf.pages:
+                    text = page.extract_text() or ""
+                    page.flush_cache()
+                    page.get_textmap.cache_clear()
+                    next_page += 1
+                    yield next_page - 1, total, text
+            return
+        except GeneratorExit:
+            raise
+        except Exception:
+            # pdfplumber 실패 시 남은 페이지는 PyPDF2 사용
+            pass
+        
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            total = len(pdf_reader.pages)
+            for index in range(next_page, total):
+                yield index, total, pdf_reader.pages[index].extract_text() or ""
+    
+    def _process_pdf(self, pdf_path, cancel_event=None):
+        """PDF 파일 처리 - 텍스트 추출 (토큰 예산에 도달하면 중단)"""
+        import PyPDF2
+        
         try:
-            content = ""
+            self._check_input_bytes(os.path.getsize(pdf_path))
+            pages = []
+            tokens = 0
+            chars = 0
             metadata = {
                 'title': os.path.basename(pdf_path),
                 'source': pdf_path,
-                'pages': 0
+                'pages': 0,
+                'extracted_pages': 0,
+                'truncated': False
             }
             
-            # pdfplumber를 우선 사용 (더 정확한 텍스트 추출)
-            try:
-                with pdfplumber.open(pdf_path) as pdf:
-                    metadata['pages'] = len(pdf.pages)
-                    for page in pdf.pages:
-                        text = page.extract_text()
-                        if text:
-                            content += text + "\n\n"
-            except:
-                # pdfplumber 실패 시 PyPDF2 사용
-                with open(pdf_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    metadata['pages'] = len(pdf_reader.pages)
-                    for page in pdf_reader.pages:
-                        content += page.extract_text() + "\n\n"
+            for index, total, text in self.iter_pdf_pages(pdf_path):
+                check_cancelled(cancel_event)
+                metadata['pages'] = total
+                metadata['extracted_pages'] = index + 1
+                if not text:
+                    continue
+                
+                chars += len(text)
+                self._check_chars(chars)
+                page_tokens = estimate_tokens(self.normalizer.normalize(text))
+                if self.max_tokens is not None and tokens + page_tokens > self.max_tokens:
+                    # 남은 예산만큼만 앞부분을 취하고 이후 페이지는 읽지 않음
+                    remaining = self.max_tokens - tokens
+                    if remaining > 0:
+                        pages.append(text[:int(len(text) * remaining / page_tokens)])
+                    metadata['truncated'] = True
+                    break
+                pages.append(text)
+                tokens += page_tokens
             
             # PDF 메타데이터 추출 시도
             try:
@@ -148,14 +349,20 @@ class InputProcessor:
             except:
                 pass
             
+            # 페이지마다 반복되는 머리글/바닥글 제거 및 정규화
+            content, metadata['normalization'] = self.normalizer.process(pages=pages)
             metadata['length'] = len(content)
+            if metadata['truncated']:
+                metadata['max_tokens'] = self.max_tokens
             
             return {
-                'content': content.strip(),
+                'content': content,
                 'metadata': metadata,
                 'type': 'pdf'
             }
         
+        except (JobCancelled, ResourceLimitExceeded):
+            raise
         except Exception as e:
             raise Exception(f"PDF 처리 중 오류 발생: {str(e)}")
     
@@ -178,7 +385,7 @@ class InputProcessor:
         return "Untitled"
     
     def _extract_content_from_html(self, soup):
-        """HTML에서 본문 추출"""
+        """HTML에서 본문 추출 (정리 전 텍스트)"""
         # 불필요한 태그 제거
         for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
             tag.decompose()
@@ -186,32 +393,24 @@ class InputProcessor:
         # article 태그 우선 검색
         article = soup.find('article')
         if article:
-            return self._clean_text(article.get_text())
+            return article.get_text()
         
         # main 태그 검색
         main = soup.find('main')
         if main:
-            return self._clean_text(main.get_text())
+            return main.get_text()
         
         # div.content, div.article 등 검색
         content_div = soup.find('div', class_=re.compile(r'content|article|post|entry', re.I))
         if content_div:
-            return self._clean_text(content_div.get_text())
+            return content_div.get_text()
         
         # 전체 body 사용
         body = soup.find('body')
         if body:
-            return self._clean_text(body.get_text())
+            return body.get_text()
         
-        return self._clean_text(soup.get_text())
-    
-    def _clean_text(self, text):
-        """텍스트 정리"""
-        # 연속된 공백 제거
-        text = re.sub(r'\s+', ' ', text)
-        # 연속된 줄바꿈 제거
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        return text.strip()
+        return soup.get_text()
     
     def _extract_title_from_text(self, text):
         """텍스트에서 제목 추출 (첫 줄 또는 첫 문장)"""
@@ -242,6 +441,7 @@ if __name__ == "__main__":
     print(f"타입: {result['type']}")
     print(f"제목: {result['metadata']['title']}")
     print(f"내용 길이: {result['metadata']['length']}자")
+    print(f"정규화 절감: {result['metadata']['normalization']}")
     print(f"내용 미리보기: {result['content'][:100]}...")
     print()
 
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+분석 보관소 (Job Archive)
+완료된 분석의 입력 정보, 관점별 결과, 종합 요약을 SQLite에 저장하고 FTS5 전문 검색 제공
+"""
+
+import json
+import sqlite3
+import threading
+
+
+class JobArchive:
+    """완료된 분석을 저장하고 목록/검색을 제공하는 SQLite 보관소"""
+    
+    def __init__(self, path):
+        """
+        Args:
+            path: SQLite 파일 경로 (":memory:"면 메모리에만 유지)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "job_id TEXT UNIQUE NOT NULL, "
+            "input_type TEXT, title TEXT, source TEXT, output_format TEXT, "
+            "report_path TEXT, partial INTEGER DEFAULT 0, "
+            "created_at TEXT, completed_at TEXT, "
+            "metadata TEXT, synthesis TEXT);"
+            "CREATE INDEX IF NOT EXISTS jobs_type_seq ON jobs (input_type, seq);"
+            "CREATE TABLE IF NOT EXISTS perspectives ("
+            "job_id TEXT NOT NULL, key TEXT NOT NULL, title TEXT, result TEXT, "
+            "cut INTEGER DEFAULT 0, error INTEGER DEFAULT 0, "
+            "PRIMARY KEY (job_id, key));"
+        )
+        
+        # FTS5가 없는 SQLite 빌드에서는 LIKE 검색으로 대체
+        try:
+            self._db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+                "title, source, body, tokenize='unicode61')"
+            )
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self._db.commit()
+    
+    def add(self, job_id, input_data, analysis_results, synthesis, job_info):
+        """
+        완료된 분석 저장 (같은 job_id는 덮어씀)
+        
+        Args:
+            job_id: 작업 ID
+            input_data: InputProcessor 출력 (content는 저장하지 않음)
+            analysis_results: ThinkingPromptsEngine.analyze() 결과
+            synthesis: 종합 요약
+            job_info: 작업 상태 (output_format, report_path, partial, created_at, completed_at)
+        """
+        metadata = input_data.get('metadata', {})
+        perspectives = [
+            (job_id, key, result.get('title'), result.get('result', ''),
+             int(bool(result.get('cut'))), int(bool(result.get('error'))))
+            for key, result in analysis_results.items()
+        ]
+        body = "\n\n".join([synthesis or ""] + [row[3] for row in perspectives if not row[4]])
+        
+        with self._lock, self._db:
+            existing = self._db.execute("SELECT seq FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if existing is not None:
+                self._delete(job_id, existing['seq'])
+            cursor = self._db.execute(
+                "INSERT INTO jobs (job_id, input_type, title, source, output_format, report_path, "
+                "partial, created_at, completed_at, metadata, synthesis) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, input_data.get('type'), metadata.get('title'), metadata.get('source'),
+                 job_info.get('output_format'), job_info.get('report_path'),
+                 int(bool(job_info.get('partial'))), job_info.get('created_at'),
+                 job_info.get('completed_at'), json.dumps(metadata, ensure_ascii=False, default=str),
+                 synthesis)
+            )
+            self._db.executemany(
+                "INSERT INTO perspectives (job_id, key, title, result, cut, error) "
+                "VALUES (?, ?, ?, ?, ?, ?)", perspectives
+            )
+            if self.fts:
+                self._db.execute(
+                    "INSERT INTO jobs_fts (rowid, title, source, body) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid, metadata.get('title') or '', metadata.get('source') or '', body)
+                )
+    
+    def _delete(self, job_id, seq):
+        """저장된 작업 삭제 (잠금과 트랜잭션은 호출자가 보유)"""
+        self._db.execute("DELETE FROM perspectives WHERE job_id = ?", (job_id,))
+        self._db.execute("DELETE FROM jobs WHERE seq = ?", (seq,))
+        if self.fts:
+            self._db.execute("DELETE FROM jobs_fts WHERE rowid = ?", (seq,))
+    
+    def remove(self, job_id):
+        """작업 삭제"""
+        with self._lock, self._db:
+            row = self._db.execute("SELECT seq FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is not None:
+                self._delete(job_id, row['seq'])
+    
+    def _summary(self, row):
+        """목록/검색 결과 항목"""
+        return {
+            'job_id': row['job_id'],
+            'input_type': row['input_type'],
+            'title': row['title'],
+            'source': row['source'],
+            'output_format': row['output_format'],
+            'partial': bool(row['partial']),
+            'created_at': row['created_at'],
+            'completed_at': row['completed_at']
+        }
+    
+    def get(self, job_id, include_results=True):
+        """
+        저장된 작업 조회
+        
+        Returns:
+            dict: 작업 정보 (include_results면 관점별 결과와 종합 요약 포함), 없으면 None
+        """
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = self._summary(row)
+            job['report_path'] = row['report_path']
+            job['metadata'] = json.loads(row['metadata'] or '{}')
+            if include_results:
+                job['synthesis'] = row['synthesis']
+                job['perspectives'] = [
+                    {'key': p['key'], 'title': p['title'], 'result': p['result'],
+                     'cut': bool(p['cut']), 'error': bool(p['error'])}
+                    for p in self._db.execute(
+                        "SELECT * FROM perspectives WHERE job_id = ? ORDER BY rowid", (job_id,)
+                    )
+                ]
+        return job
+    
+    def list(self, limit=20, cursor=None, input_type=None):
+        """
+        최근 완료 순 목록 (키셋 페이지네이션)
+        
+        Args:
+            limit: 페이지 크기
+            cursor: 이전 페이지 응답의 next_cursor (None이면 첫 페이지)
+            input_type: 입력 유형 필터
+        
+        Returns:
+            dict: {'items': [...], 'next_cursor': 다음 페이지 커서 또는 None}
+        """
+        conditions, params = [], []
+        if cursor is not None:
+            conditions.append("seq < ?")
+            params.append(int(cursor))
+        if input_type:
+            conditions.append("input_type = ?")
+            params.append(input_type)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM jobs {where} ORDER BY seq DESC LIMIT ?", params + [limit + 1]
+            ).fetchall()
+        
+        next_cursor = str(rows[limit - 1]['seq']) if len(rows) > limit else None
+        return {'items': [self._summary(row) for row in rows[:limit]], 'next_cursor': next_cursor}
+    
+    def _match_query(self, query):
+        """사용자 입력을 FTS5 구문으로 변환 (단어마다 접두 검색, 특수 문자는 구문 오류가 나지 않게 인용)"""
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " ".join(f'"{term}"*' for term in terms)
+    
+    def search(self, query, limit=20, offset=0, input_type=None):
+        """
+        제목/출처/분석 결과 전문 검색 (관련도순)
+        
+        Returns:
+            dict: {'items': [... 'snippet' 포함], 'total': 전체 일치 수, 'next_offset': 다음 페이지 또는 None}
+        """
+        if not query.strip():
+            return {'items': [], 'total': 0, 'next_offset': None}
+        
+        type_filter = "AND jobs.input_type = ?" if input_type else ""
+        type_params = [input_type] if input_type else []
+        
+        with self._lock:
+            if self.fts:
+                match = self._match_query(query)
+                total = self._db.execute(
+                    f"SELECT COUNT(*) FROM jobs_fts JOIN jobs ON jobs.seq = jobs_fts.rowid "
+                    f"WHERE jobs_fts MATCH ? {type_filter}", [match] + type_params
+                ).fetchone()[0]
+                rows = self._db.execute(
+                    f"SELECT jobs.*, snippet(jobs_fts, 2, '[', ']', '…', 16) AS snippet "
+                    f"FROM jobs_fts JOIN jobs ON jobs.seq = jobs_fts.rowid "
+                    f"WHERE jobs_fts MATCH ? {type_filter} ORDER BY bm25(jobs_fts, 5.0, 2.0, 1.0) "
+                    f"LIMIT ? OFFSET ?", [match] + type_params + [limit, offset]
+                ).fetchall()
+            else:
+                pattern = f"%{query.strip()}%"
+                condition = f"(title LIKE ? OR source LIKE ? OR synthesis LIKE ?) {type_filter}"
+                params = [pattern, pattern, pattern] + type_params
+                total = self._db.execute(
+                    f"SELECT COUNT(*) FROM jobs WHERE {condition}", params
+                ).fetchone()[0]
+                rows = self._db.execute(
+                    f"SELECT jobs.*, substr(synthesis, 1, 200) AS snippet FROM jobs "
+                    f"WHERE {condition} ORDER BY seq DESC LIMIT ? OFFSET ?", params + [limit, offset]
+                ).fetchall()
+        
+        items = [{**self._summary(row), 'snippet': row['snippet']} for row in rows]
+        next_offset = offset + limit if offset + limit < total else None
+        return {'items': items, 'total': total, 'next_offset': next_offset}
+    
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    import time
+    import random
+    
+    archive = JobArchive(":memory:")
+    topics = ["교육", "물류", "의료", "플랫폼", "자동화", "진단", "추천", "재고", "학습", "배송",
+              "strategy", "pricing", "market", "growth", "risk"]
+    rng = random.Random(0)
+    # 실제 보고서처럼 드문 단어가 대부분인 어휘
+    words = topics + [f"w{n}" for n in range(20000)]
+    
+    count = 100000
+    started = time.perf_counter()
+    for i in range(count):
+        text = " ".join([rng.choice(topics)] + [rng.choice(words) for _ in range(40)])
+        archive.add(
+            f"job-{i}",
+            {'type': rng.choice(['text', 'url', 'pdf']), 'metadata': {'title': f"문서 {i} {rng.choice(topics)}"}},
+            {'hidden_pattern': {'title': '숨겨진 패턴 찾기', 'result': text}},
+            f"종합 요약 {text[:60]}",
+            {'output_format': 'markdown', 'report_path': f"/tmp/job-{i}.md",
+             'completed_at': f"2024-01-01T00:00:{i % 60:02d}"}
+        )
+    print("=== 분석 보관소 테스트 ===")
+    print(f"{count}개 저장: {time.perf_counter() - started:.1f}s (FTS5: {archive.fts})")
+    
+    for label, call in [
+        ("목록 첫 페이지", lambda: archive.list(limit=20)),
+        ("목록 500번째 페이지", lambda: archive.list(limit=20, cursor=str(count - 500 * 20))),
+        ("유형 필터 목록", lambda: archive.list(limit=20, input_type='pdf')),
+        ("검색 'w123 w456'", lambda: archive.search("w123 w456", limit=20)),
+        ("검색 'w1234' 접두", lambda: archive.search("w1234", limit=20)),
+        ("검색 '물류' (흔한 단어)", lambda: archive.search("물류", limit=20, offset=100)),
+        ("단건 조회", lambda: archive.get("job-4242")),
+    ]:
+        started = time.perf_counter()
+        result = call()
+        elapsed = (time.perf_counter() - started) * 1000
+        size = len(result['items']) if isinstance(result, dict) and 'items' in result else 1
+        print(f"  {label}: {elapsed:.1f}ms ({size}건)")
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+작업 체크포인트 (Job Checkpoints)
+실행 중인 분석의 제출 정보, 처리된 입력, 관점별 결과, 종합 요약을 완료되는 즉시 SQLite에 저장하여
+프로세스가 중단되어도 재시작 후 남은 관점만 호출해 이어서 실행
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+
+class JobCheckpointStore:
+    """종료되지 않은 작업의 진행 상황을 저장하는 SQLite 체크포인트 저장소"""
+    
+    def __init__(self, path):
+        """
+        Args:
+            path: SQLite 파일 경로 (":memory:"면 메모리에만 유지)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        # WAL + NORMAL: 커밋된 내용은 프로세스가 죽어도 남음
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "job_id TEXT UNIQUE NOT NULL, "
+            "task TEXT NOT NULL, processed_input TEXT, "
+            "synthesis TEXT, synthesis_stats TEXT, "
+            "created_at TEXT, updated_at TEXT);"
+            "CREATE TABLE IF NOT EXISTS checkpoint_perspectives ("
+            "job_id TEXT NOT NULL, key TEXT NOT NULL, result TEXT NOT NULL, "
+            "PRIMARY KEY (job_id, key));"
+        )
+        self._db.commit()
+    
+    def _now(self):
+        return datetime.now().isoformat()
+    
+    def start(self, job_id, task):
+        """
+        작업 등록 (제출 시점, 재실행에 필요한 정보 저장)
+        
+        Args:
+            job_id: 작업 ID
+            task: JSON으로 저장할 수 있는 제출 정보 (입력, 옵션, 작업 상태 등)
+        """
+        now = self._now()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO checkpoints (job_id, task, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (job_id, json.dumps(task, ensure_ascii=False, default=str), now, now)
+            )
+    
+    def save_input(self, job_id, processed_input):
+        """InputProcessor 출력 저장 (재개 시 URL/PDF를 다시 처리하지 않음)"""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE checkpoints SET processed_input = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(processed_input, ensure_ascii=False, default=str), self._now(), job_id)
+            )
+    
+    def save_perspective(self, job_id, key, result):
+        """관점 하나의 분석 결과 저장"""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO checkpoint_perspectives (job_id, key, result) VALUES (?, ?, ?)",
+                (job_id, key, json.dumps(result, ensure_ascii=False, default=str))
+            )
+            self._db.execute(
+                "UPDATE checkpoints SET updated_at = ? WHERE job_id = ?", (self._now(), job_id)
+            )
+    
+    def save_synthesis(self, job_id, synthesis, stats=None):
+        """종합 요약 저장"""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE checkpoints SET synthesis = ?, synthesis_stats = ?, updated_at = ? WHERE job_id = ?",
+                (synthesis, json.dumps(stats or {}), self._now(), job_id)
+            )
+    
+    def load(self, job_id):
+        """
+        저장된 진행 상황 조회
+        
+        Returns:
+            dict: {'task', 'processed_input', 'perspectives': {key: result}, 'synthesis',
+                   'synthesis_stats', 'created_at', 'updated_at'} (없으면 None)
+        """
+        with self._lock:
+            row = self._db.execute("SELECT * FROM checkpoints WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            perspectives = {
+                p['key']: json.loads(p['result'])
+                for p in self._db.execute(
+                    "SELECT key, result FROM checkpoint_perspectives WHERE job_id = ?", (job_id,)
+                )
+            }
+        return {
+            'task': json.loads(row['task']),
+            'processed_input': json.loads(row['processed_input']) if row['processed_input'] else None,
+            'perspectives': perspectives,
+            'synthesis': row['synthesis'],
+            'synthesis_stats': json.loads(row['synthesis_stats']) if row['synthesis_stats'] else None,
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
+    
+    def finish(self, job_id):
+        """종료된 작업(완료/실패/취소)의 체크포인트 삭제"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM checkpoint_perspectives WHERE job_id = ?", (job_id,))
+            self._db.execute("DELETE FROM checkpoints WHERE job_id = ?", (job_id,))
+    
+    def pending(self):
+        """
+        종료되지 않은 작업 목록 (제출 순)
+        
+        Returns:
+            list: [{'job_id', 'task', 'completed_perspectives', 'has_synthesis'}, ...]
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT c.job_id, c.task, c.synthesis IS NOT NULL AS has_synthesis, "
+                "(SELECT COUNT(*) FROM checkpoint_perspectives p WHERE p.job_id = c.job_id) AS completed "
+                "FROM checkpoints c ORDER BY c.seq"
+            ).fetchall()
+        return [
+            {
+                'job_id': row['job_id'],
+                'task': json.loads(row['task']),
+                'completed_perspectives': row['completed'],
+                'has_synthesis': bool(row['has_synthesis'])
+            }
+            for row in rows
+        ]
+    
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+
+# 테스트 코드: 분석 도중 작업 프로세스를 강제 종료한 뒤 재개하여 완료된 호출이 반복되지 않는지 확인
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+    import signal
+    import hashlib
+    import tempfile
+    import subprocess
+    
+    from analysis_engine import ThinkingPromptsEngine
+    
+    CONTENT = "AI 기반 개인화 학습 플랫폼 개발 계획: 학습자 수준 진단, 콘텐츠 추천, 실시간 피드백"
+    
+    def fake_completion(log_path, delay):
+        """LLM 대신 호출한 프롬프트의 해시를 기록하고 지연 후 응답하는 함수"""
+        def completion(prompt, timeout=None, abort=None):
+            with open(log_path, 'a') as log:
+                log.write(hashlib.sha256(prompt.encode()).hexdigest() + "\n")
+            time.sleep(delay)
+            return f"분석 결과 ({len(prompt)}자)"
+        return completion
+    
+    def fake_engine(log_path, delay):
+        """호출을 기록하는 가짜 LLM 엔진"""
+        engine = ThinkingPromptsEngine()
+        engine._request_completion = fake_completion(log_path, delay)
+        return engine
+    
+    def logged_calls(log_path):
+        """기록된 호출 해시 목록"""
+        return open(log_path).read().split() if os.path.exists(log_path) else []
+    
+    def kill_after_calls(worker, log_path, count):
+        """호출이 count회 기록되면 작업 프로세스를 강제 종료"""
+        while len(logged_calls(log_path)) < count:
+            time.sleep(0.05)
+        os.kill(worker.pid, signal.SIGKILL)
+        worker.wait()
+    
+    def run(store, job_id, engine):
+        checkpoint = store.load(job_id)
+        return engine.analyze(
+            CONTENT,
+            completed=checkpoint['perspectives'],
+            on_result=lambda key, result: store.save_perspective(job_id, key, result)
+        )
+    
+    if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+        # 작업 프로세스: 강제 종료될 때까지 관점별 분석과 체크포인트 저장
+        db_path, log_path = sys.argv[2], sys.argv[3]
+        run(JobCheckpointStore(db_path), "demo-job", fake_engine(log_path, delay=0.3))
+        sys.exit(0)
+    
+    if len(sys.argv) == 3 and sys.argv[1] == "--app-worker":
+        # 웹 앱 프로세스: 분석 요청을 받아 run_analysis 실행 중 강제 종료됨
+        import web_app
+        from fastapi.testclient import TestClient
+        web_app.analysis_engine._request_completion = fake_completion(sys.argv[2], delay=0.3)
+        with TestClient(web_app.app) as client:
+            client.post("/api/analyze/text", data={"text": CONTENT, "format": "markdown"})
+            time.sleep(60)
+        sys.exit(0)
+    
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, "checkpoints.db")
+    log_path = os.path.join(workdir, "calls.log")
+    store = JobCheckpointStore(db_path)
+    store.start("demo-job", {'input_type': 'text', 'input_data': CONTENT})
+    
+    worker = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker", db_path, log_path])
+    kill_after_calls(worker, log_path, 5)
+    
+    before = open(log_path).read().split()
+    saved = store.load("demo-job")['perspectives']
+    prompts = ThinkingPromptsEngine.PROMPTS
+    saved_hashes = {
+        hashlib.sha256(prompts[key]['template'].format(content=CONTENT).encode()).hexdigest()
+        for key in saved
+    }
+    
+    # 재시작: 같은 체크포인트로 이어서 실행
+    results = run(store, "demo-job", fake_engine(log_path, delay=0.0))
+    after = open(log_path).read().split()[len(before):]
+    repeated = saved_hashes & set(after)
+    
+    print("=== 작업 체크포인트 재개 테스트 ===")
+    print(f"강제 종료 전 호출: {len(before)}회, 저장된 관점: {len(saved)}개")
+    print(f"재개 후 호출: {len(after)}회, 최종 관점: {len(results)}개")
+    print(f"완료된 관점의 재호출: {len(repeated)}회")
+    store.finish("demo-job")
+    assert not repeated and len(results) == len(prompts) and len(store) == 0
+    print("통과")
+    
+    # 웹 앱 재시작 경로: run_analysis 도중 종료 → 시작 훅이 같은 체크포인트로 재개 → 종합 요약까지 완료
+    os.environ.update(
+        REPORT_DIR=os.path.join(workdir, "reports"), UPLOAD_DIR=os.path.join(workdir, "uploads"),
+        JOB_CHECKPOINT_PATH=os.path.join(workdir, "app-checkpoints.db"), SIMILARITY_MODE="off"
+    )
+    app_log = os.path.join(workdir, "app-calls.log")
+    worker = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--app-worker", app_log])
+    kill_after_calls(worker, app_log, 4)
+    
+    before = logged_calls(app_log)
+    app_store = JobCheckpointStore(os.environ["JOB_CHECKPOINT_PATH"])
+    pending = app_store.pending()
+    job_id, saved = pending[0]['job_id'], pending[0]['completed_perspectives']
+    
+    import web_app
+    from fastapi.testclient import TestClient
+    web_app.analysis_engine._request_completion = fake_completion(app_log, delay=0.0)
+    with TestClient(web_app.app) as client:
+        for _ in range(200):
+            status = client.get(f"/api/status/{job_id}").json()
+            if status["status"] in ("completed", "failed"):
+                break
+            time.sleep(0.05)
+    after = logged_calls(app_log)[len(before):]
+    # 재호출은 종료 시점에 진행 중이던(저장 전) 관점만 허용
+    repeated = set(before) & set(after)
+    planned = len(prompts) + 1
+    
+    print("=== 웹 앱 재시작 재개 테스트 ===")
+    print(f"강제 종료 전 호출: {len(before)}회, 저장된 관점: {saved}개")
+    print(f"재개 후 호출: {len(after)}회 (종합 요약 포함), 상태: {status['status']}")
+    print(f"재호출: {len(repeated)}회 (종료 시 진행 중이던 호출 {len(before) - saved}개 이하)")
+    assert status["status"] == "completed" and status.get("resumed")
+    assert len(repeated) <= len(before) - saved
+    assert len(set(before) | set(after)) == planned and len(after) == planned - saved
+    assert len(app_store) == 0
+    print("통과")
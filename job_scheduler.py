@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+작업 스케줄러 (Job Scheduler)
+우선순위 레인과 클라이언트별 가중 공정 큐잉으로 분석 작업 실행 순서를 결정
+"""
+
+import math
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+
+class JobScheduler:
+    """우선순위 레인 + 클라이언트별 가중 공정 큐잉(WFQ) 기반 작업 스케줄러"""
+    
+    # 우선순위 레인 (숫자가 작을수록 먼저 실행)
+    PRIORITIES = {
+        'interactive': 0,  # 텍스트 직접 입력
+        'standard': 1,     # URL
+        'bulk': 2          # PDF 등 대용량 입력
+    }
+    
+    def __init__(self, worker_count=4, client_llm_limit=2, client_weights=None,
+                 default_duration=60.0):
+        """
+        스케줄러 초기화
+        
+        Args:
+            worker_count: 동시에 실행할 작업 수
+            client_llm_limit: 클라이언트별 동시 LLM 호출 상한
+            client_weights: 클라이언트별 가중치 {client_id: weight} (기본 1.0)
+            default_duration: 완료 기록이 없을 때 사용할 작업 소요 시간 추정치(초)
+        """
+        self.worker_count = worker_count
+        self.client_llm_limit = client_llm_limit
+        self.client_weights = client_weights or {}
+        
+        self._cond = threading.Condition()
+        self._queue = []  # 대기 중인 항목 목록
+        self._seq = 0
+        self._virtual_time = {lane: 0.0 for lane in self.PRIORITIES.values()}
+        self._last_finish = {}  # (lane, client_id) -> 마지막 가상 종료 태그
+        self._running = {}  # client_id -> 실행 중인 작업 수
+        self._running_total = 0
+        self._client_slots = {}  # client_id -> [LLM 호출 세마포어, 사용 중인 호출 수]
+        self._durations = {lane: default_duration for lane in self.PRIORITIES.values()}
+        self._workers = []
+    
+    def _ensure_workers(self):
+        """작업 스레드를 처음 제출 시점에 시작 (잠금은 호출자가 보유)"""
+        if self._workers:
+            return
+        for idx in range(self.worker_count):
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{idx}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+    
+    def submit(self, job_id, func, client_id='anonymous', priority='standard', cost=1.0, **kwargs):
+        """
+        작업 제출
+        
+        Args:
+            job_id: 작업 ID
+            func: 실행할 함수 (func(job_id, **kwargs)로 호출)
+            client_id: 요청 클라이언트 식별자
+            priority: 우선순위 레인 이름 (PRIORITIES 키)
+            cost: 공정 큐잉에 사용할 작업 비용 (예: 추정 토큰 수)
+        """
+        lane = self.PRIORITIES.get(priority, self.PRIORITIES['standard'])
+        weight = self.client_weights.get(client_id, 1.0)
+        
+        with self._cond:
+            # 가상 시작 태그 = max(레인 가상 시간, 같은 클라이언트의 직전 종료 태그)
+            start = max(self._virtual_time[lane], self._last_finish.get((lane, client_id), 0.0))
+            self._last_finish[(lane, client_id)] = start + cost / weight
+            self._seq += 1
+            self._queue.append({
+                'job_id': job_id,
+                'client_id': client_id,
+                'lane': lane,
+                'tag': start,
+                'seq': self._seq,
+                'func': func,
+                'kwargs': kwargs,
+                'enqueued_at': time.monotonic()
+            })
+            self._ensure_workers()
+            self._cond.notify()
+    
+    def cancel(self, job_id):
+        """
+        대기 중인 작업을 대기열에서 제거
+        
+        Returns:
+            dict: 제거한 항목 (job_id, client_id, kwargs 등, 이미 실행 중이거나 없으면 None)
+        """
+        with self._cond:
+            for entry in self._queue:
+                if entry['job_id'] == job_id:
+                    self._queue.remove(entry)
+                    self._forget_idle_client(entry['client_id'])
+                    return entry
+        return None
+    
+    def _forget_idle_client(self, client_id):
+        """
+        대기/실행 중인 작업이 없는 클라이언트의 상태 삭제 (잠금은 호출자가 보유)
+        
+        클라이언트 식별자마다 항목이 쌓이지 않도록 하며, 쉬던 클라이언트의 다음 작업은
+        레인 가상 시간에서 시작하므로 종료 태그를 지워도 순서는 같다.
+        """
+        if client_id in self._running or any(entry['client_id'] == client_id for entry in self._queue):
+            return
+        for lane in self.PRIORITIES.values():
+            self._last_finish.pop((lane, client_id), None)
+        slot = self._client_slots.get(client_id)
+        if slot is not None and slot[1] == 0:
+            del self._client_slots[client_id]
+    
+    def _order_key(self, entry):
+        """실행 순서 키 (레인 → 가상 시작 태그 → 도착 순서)"""
+        return (entry['lane'], entry['tag'], entry['seq'])
+    
+    def _next_entry(self):
+        """
+        실행 가능한 다음 항목 선택 (잠금은 호출자가 보유)
+        
+        작업 하나는 LLM을 한 번에 하나씩 호출하므로, 동시 LLM 호출 상한에 도달한
+        클라이언트의 작업은 건너뛰어 다른 클라이언트가 작업 슬롯을 쓰도록 한다.
+        """
+        candidates = [
+            entry for entry in self._queue
+            if self._running.get(entry['client_id'], 0) < self.client_llm_limit
+        ]
+        if not candidates:
+            return None
+        entry = min(candidates, key=self._order_key)
+        self._queue.remove(entry)
+        self._virtual_time[entry['lane']] = max(self._virtual_time[entry['lane']], entry['tag'])
+        return entry
+    
+    def _worker_loop(self):
+        """작업 스레드: 대기열에서 항목을 꺼내 실행"""
+        while True:
+            with self._cond:
+                entry = self._next_entry()
+                while entry is None:
+                    self._cond.wait()
+                    entry = self._next_entry()
+                client_id = entry['client_id']
+                self._running[client_id] = self._running.get(client_id, 0) + 1
+                self._running_total += 1
+            
+            started = time.monotonic()
+            try:
+                entry['func'](entry['job_id'], **entry['kwargs'])
+            except Exception:
+                # 작업 함수가 자체적으로 상태를 기록하므로 스레드만 보호
+                pass
+            finally:
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    self._running[client_id] -= 1
+                    if not self._running[client_id]:
+                        del self._running[client_id]
+                        self._forget_idle_client(client_id)
+                    self._running_total -= 1
+                    # 레인별 평균 소요 시간 (지수 이동 평균)
+                    lane = entry['lane']
+                    self._durations[lane] = 0.8 * self._durations[lane] + 0.2 * elapsed
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def llm_slot(self, client_id):
+        """
+        클라이언트별 동시 LLM 호출 상한을 적용하는 컨텍스트
+        
+        사용 중인 호출 수를 함께 세어, 작업이 끝난 뒤에도 중단 중인 호출이 쓰는 세마포어는 지우지 않는다.
+        """
+        with self._cond:
+            slot = self._client_slots.get(client_id)
+            if slot is None:
+                slot = [threading.BoundedSemaphore(self.client_llm_limit), 0]
+                self._client_slots[client_id] = slot
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._cond:
+                slot[1] -= 1
+                if slot[1] == 0 and self._client_slots.get(client_id) is slot:
+                    self._forget_idle_client(client_id)
+    
+    def get_position(self, job_id):
+        """
+        대기 중인 작업의 순번과 예상 대기 시간 반환
+        
+        Returns:
+            dict: {'queue_position', 'estimated_wait_seconds'} (대기 중이 아니면 None)
+        """
+        with self._cond:
+            ordered = sorted(self._queue, key=self._order_key)
+            for position, entry in enumerate(ordered):
+                if entry['job_id'] == job_id:
+                    break
+            else:
+                return None
+            
+            # 앞선 작업과 실행 중 작업이 작업 슬롯을 비울 때까지의 시간 추정
+            ahead = ordered[:position]
+            work = sum(self._durations[e['lane']] for e in ahead)
+            work += self._running_total * self._durations[entry['lane']] / 2
+            if self._running_total + position < self.worker_count:
+                wait = 0.0
+            else:
+                wait = work / self.worker_count
+        
+        return {
+            'queue_position': position + 1,
+            'estimated_wait_seconds': round(wait, 1)
+        }
+    
+    def get_stats(self):
+        """스케줄러 현황 반환"""
+        with self._cond:
+            lanes = {name: 0 for name in self.PRIORITIES}
+            names = {lane: name for name, lane in self.PRIORITIES.items()}
+            for entry in self._queue:
+                lanes[names[entry['lane']]] += 1
+            return {
+                'workers': self.worker_count,
+                'running': self._running_total,
+                'queued': len(self._queue),
+                'queued_by_priority': lanes,
+                'running_by_client': dict(self._running),
+                'avg_duration_seconds': {
+                    names[lane]: round(duration, 1) for lane, duration in self._durations.items()
+                }
+            }
+
+
+
+class AdmissionController:
+    """입력 유형별 대기 작업 수와 예상 토큰 적체량 기반 승인 제어"""
+    
+    def __init__(self, limits, default_throughput=2000.0, window=300.0):
+        """
+        승인 제어 초기화
+        
+        Args:
+            limits: 입력 유형별 상한 {input_type: {'max_jobs': int, 'max_tokens': int}}
+                    (값이 None이면 해당 상한 없음)
+            default_throughput: 처리 기록이 없을 때 사용할 처리량 추정치(토큰/초)
+            window: 처리량 계산에 사용할 최근 기간(초)
+        """
+        self.limits = limits
+        self.default_throughput = default_throughput
+        self.window = window
+        
+        self._lock = threading.Lock()
+        self._jobs = {}  # job_id -> (input_type, tokens)
+        self._completed = deque()  # (완료 시각, 토큰 수)
+        self.rejected = {}  # input_type -> 거절 횟수
+    
+    def _outstanding(self, input_type):
+        """입력 유형별 미완료 작업 토큰 목록 (잠금은 호출자가 보유, 승인 순)"""
+        return [tokens for kind, tokens in self._jobs.values() if kind == input_type]
+    
+    def throughput(self):
+        """최근 처리량(토큰/초)"""
+        now = time.monotonic()
+        with self._lock:
+            while self._completed and now - self._completed[0][0] > self.window:
+                self._completed.popleft()
+            if not self._completed:
+                return self.default_throughput
+            span = max(now - self._completed[0][0], 30.0)
+            total = sum(tokens for _, tokens in self._completed)
+        return max(total / span, 1.0)
+    
+    def try_admit(self, job_id, input_type, tokens):
+        """
+        작업 승인 시도
+        
+        Args:
+            job_id: 작업 ID
+            input_type: 입력 유형 ('text', 'url', 'pdf')
+            tokens: 작업의 예상 총 토큰 수
+        
+        Returns:
+            int: 승인되면 None, 거절되면 재시도까지 권장 대기 시간(초)
+        """
+        return self.try_admit_many([(job_id, input_type, tokens)])
+    
+    def admit(self, job_id, input_type, tokens):
+        """상한과 관계없이 적체량에 추가 (재시작 후 이어서 실행하는 작업처럼 이미 받은 작업용)"""
+        with self._lock:
+            self._jobs[job_id] = (input_type, tokens)
+    
+    def try_admit_many(self, entries):
+        """
+        여러 작업을 한 단위로 승인 시도 (전부 승인하거나 전부 거절)
+        
+        Args:
+            entries: [(job_id, input_type, tokens)] 목록
+        
+        Returns:
+            int: 승인되면 None, 거절되면 재시도까지 권장 대기 시간(초)
+        """
+        throughput = self.throughput()
+        new_by_type = {}
+        for _, input_type, tokens in entries:
+            new_by_type.setdefault(input_type, []).append(tokens)
+        
+        with self._lock:
+            drain = 0
+            for input_type, new_tokens in new_by_type.items():
+                outstanding = self._outstanding(input_type)
+                # 다른 작업이 없으면 상한보다 큰 요청도 승인 (영원히 거절되지 않도록)
+                if not outstanding:
+                    continue
+                limit = self.limits.get(input_type, {})
+                max_jobs = limit.get('max_jobs')
+                max_tokens = limit.get('max_tokens')
+                
+                if max_jobs is not None:
+                    over_jobs = len(outstanding) + len(new_tokens) - max_jobs
+                    if over_jobs > 0:
+                        # 오래된 작업이 끝나 자리가 날 때까지 처리해야 할 토큰
+                        drain = max(drain, sum(outstanding[:over_jobs]))
+                backlog = sum(outstanding) + sum(new_tokens)
+                if max_tokens is not None and backlog > max_tokens:
+                    drain = max(drain, backlog - max_tokens)
+            
+            if drain:
+                for input_type in new_by_type:
+                    self.rejected[input_type] = self.rejected.get(input_type, 0) + 1
+                return int(min(max(math.ceil(drain / throughput), 1), 600))
+            
+            for job_id, input_type, tokens in entries:
+                self._jobs[job_id] = (input_type, tokens)
+            return None
+    
+    def release(self, job_id, completed=True):
+        """
+        작업 종료 시 적체량에서 제외
+        
+        Args:
+            job_id: 작업 ID
+            completed: 실제로 처리된 작업이면 True (처리량 계산에 반영)
+        
+        Returns:
+            int: 적체량에서 제외한 예상 토큰 수 (이미 제외된 작업이면 0)
+        """
+        with self._lock:
+            entry = self._jobs.pop(job_id, None)
+            if entry is None:
+                return 0
+            if completed:
+                self._completed.append((time.monotonic(), entry[1]))
+            return entry[1]
+    
+    def get_stats(self):
+        """승인 제어 현황 반환"""
+        throughput = self.throughput()
+        with self._lock:
+            backlog = {}
+            for kind, tokens in self._jobs.values():
+                jobs, total = backlog.get(kind, (0, 0))
+                backlog[kind] = (jobs + 1, total + tokens)
+            return {
+                'throughput_tokens_per_second': round(throughput, 1),
+                'outstanding': {
+                    kind: {'jobs': jobs, 'tokens': total} for kind, (jobs, total) in backlog.items()
+                },
+                'limits': self.limits,
+                'rejected': dict(self.rejected)
+            }
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    scheduler = JobScheduler(worker_count=1, client_llm_limit=1)
+    order = []
+    gate = threading.Event()
+    
+    def job(job_id, name):
+        gate.wait()
+        order.append(name)
+    
+    # 한 클라이언트의 대량 PDF 작업 뒤에 다른 클라이언트들의 텍스트 작업 제출
+    scheduler.submit("blocker", job, client_id="bulk-user", priority="bulk", name="blocker")
+    time.sleep(0.1)
+    for i in range(3):
+        scheduler.submit(f"pdf-{i}", job, client_id="bulk-user", priority="bulk", name=f"pdf-{i}")
+    scheduler.submit("text-a1", job, client_id="alice", priority="interactive", name="text-a1")
+    scheduler.submit("text-a2", job, client_id="alice", priority="interactive", name="text-a2")
+    scheduler.submit("text-b1", job, client_id="bob", priority="interactive", name="text-b1")
+    
+    print("=== 작업 스케줄러 테스트 ===")
+    for job_id in ["text-a1", "text-b1", "text-a2", "pdf-0"]:
+        print(f"{job_id}: {scheduler.get_position(job_id)}")
+    
+    gate.set()
+    while scheduler.get_stats()['queued'] or scheduler.get_stats()['running']:
+        time.sleep(0.05)
+    print(f"실행 순서: {order}")
+    print(f"작업이 끝난 클라이언트 상태: 종료 태그 {len(scheduler._last_finish)}개, 호출 슬롯 {len(scheduler._client_slots)}개")
+    
+    admission = AdmissionController({'text': {'max_jobs': 2, 'max_tokens': 50000}}, default_throughput=1000)
+    print("=== 승인 제어 테스트 ===")
+    for idx, tokens in enumerate([20000, 20000, 20000]):
+        print(f"text-{idx} ({tokens} 토큰): Retry-After={admission.try_admit(f'text-{idx}', 'text', tokens)}")
+    admission.release('text-0')
+    print(f"text-0 완료 후 재시도: Retry-After={admission.try_admit('text-2', 'text', 20000)}")
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+메모리 추적 (Memory Tracking)
+작업 단계(입력 처리, 관점 분석, 종합 요약, 보고서 생성)별 최대 메모리 사용량을 기록하고,
+요청한 작업에 한해 tracemalloc으로 단계별 할당 상위 위치를 수집
+"""
+
+import os
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+
+class ResourceLimitExceeded(Exception):
+    """작업별 자원 한도(입력 크기, 추출 문자 수, 보고서 크기) 초과"""
+    
+    def __init__(self, limit_name, value, limit, message):
+        """
+        Args:
+            limit_name: 한도 종류 ('input_bytes', 'extracted_chars', 'report_bytes')
+            value: 측정값
+            limit: 한도
+            message: 사용자에게 보여줄 오류 메시지
+        """
+        super().__init__(message)
+        self.limit_name = limit_name
+        self.value = value
+        self.limit = limit
+
+
+def check_limit(limit_name, value, limit, message):
+    """
+    한도 확인 (limit이 None/0이면 확인하지 않음)
+    
+    Args:
+        message: 오류 메시지 또는 메시지를 만드는 함수 (페이지/조각마다 확인할 때 한도를 넘은 경우에만 만듦)
+    
+    Raises:
+        ResourceLimitExceeded: value가 limit을 넘은 경우
+    """
+    if limit and value > limit:
+        raise ResourceLimitExceeded(limit_name, value, limit, message() if callable(message) else message)
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss():
+    """현재 프로세스 상주 메모리(바이트, /proc을 읽을 수 없으면 지금까지의 최대값)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+
+def peak_rss():
+    """프로세스 시작 이후 최대 상주 메모리(바이트)"""
+    import resource
+    import sys
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def _traced_current():
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+class _Watch:
+    """측정 구간 1개의 최대값 (trace면 tracemalloc 추적량 최대값과 그 시점 스냅샷 포함)"""
+    
+    def __init__(self, rss, trace):
+        self.peak_rss = rss
+        self.trace = trace
+        self.traced_peak = _traced_current() if trace else 0
+        self.peak_snapshot = None
+        self.snapshot_at = self.traced_peak
+
+
+class RssSampler:
+    """
+    측정 중인 단계가 있는 동안만 상주 메모리를 주기적으로 읽어 단계별 최대값을 갱신하는 공용 샘플러
+    
+    상주 메모리와 tracemalloc 추적량은 프로세스 전체 값이므로 여러 작업이 동시에 실행되면
+    단계별 최대값에 다른 작업의 사용량도 포함된다. 추적 구간은 tracemalloc.reset_peak()(프로세스 공용)를
+    쓰지 않고 추적량을 샘플링해 구간별 최대값을 구하며, 최대값이 SNAPSHOT_GROWTH배 이상 늘 때마다
+    그 시점 스냅샷을 남긴다 (단계가 끝나면 해제되는 할당도 최대 시점 스냅샷에는 남음).
+    """
+    
+    SNAPSHOT_GROWTH = 1.1
+    SNAPSHOT_MIN_BYTES = 1024 * 1024
+    
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self._watchers = {}  # id -> _Watch
+        self._lock = threading.Lock()
+        self._thread = None
+        self._next_id = 0
+    
+    def watch(self, trace=False):
+        """측정 시작 (반환한 id로 stop 호출)"""
+        rss = current_rss()
+        with self._lock:
+            self._next_id += 1
+            watch_id = self._next_id
+            self._watchers[watch_id] = _Watch(rss, trace)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+                self._thread.start()
+        return watch_id, rss
+    
+    def stop(self, watch_id):
+        """
+        측정 종료
+        
+        Returns:
+            tuple: (구간 최대 RSS, 종료 시 RSS, 구간 최대 추적량, 최대 시점 스냅샷 또는 None)
+        """
+        rss = current_rss()
+        traced = _traced_current()
+        with self._lock:
+            watch = self._watchers.pop(watch_id)
+        return max(watch.peak_rss, rss), rss, max(watch.traced_peak, traced), watch.peak_snapshot
+    
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            rss = current_rss()
+            traced = _traced_current()
+            with self._lock:
+                if not self._watchers:
+                    self._thread = None
+                    return
+                grown = []
+                for watch in self._watchers.values():
+                    watch.peak_rss = max(watch.peak_rss, rss)
+                    if watch.trace and traced > watch.traced_peak:
+                        watch.traced_peak = traced
+                        if traced - watch.snapshot_at >= max(self.SNAPSHOT_MIN_BYTES,
+                                                             watch.snapshot_at * (self.SNAPSHOT_GROWTH - 1)):
+                            grown.append(watch)
+            if grown and tracemalloc.is_tracing():
+                # 스냅샷은 잠금 밖에서 (추적 항목 수에 비례해 오래 걸림)
+                snapshot = tracemalloc.take_snapshot()
+                with self._lock:
+                    for watch in grown:
+                        watch.peak_snapshot = snapshot
+                        watch.snapshot_at = traced
+
+
+class _TraceControl:
+    """추적을 요청한 작업이 있는 동안만 tracemalloc 실행 (추적 중에는 모든 할당이 느려짐)"""
+    
+    def __init__(self):
+        self._users = 0
+        self._lock = threading.Lock()
+        self._started_here = False
+    
+    def acquire(self, frames=1):
+        with self._lock:
+            self._users += 1
+            if self._users == 1 and not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._started_here = True
+    
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            if self._users == 0 and self._started_here:
+                tracemalloc.stop()
+                self._started_here = False
+
+
+_sampler = RssSampler()
+_trace_control = _TraceControl()
+
+# 프로세스 전체 단계별 최대값 (/api/metrics)
+_stage_stats = {}
+_stage_stats_lock = threading.Lock()
+
+_MB = 1024 * 1024
+
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+)
+
+
+def _snapshot_growth(snapshot, start, limit):
+    """단계 시작 스냅샷 대비 할당량이 늘어난 상위 위치"""
+    stats = snapshot.filter_traces(_SNAPSHOT_FILTERS).compare_to(start.filter_traces(_SNAPSHOT_FILTERS), 'lineno')
+    return [
+        {
+            'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_diff_kb': round(stat.size_diff / 1024, 1),
+            'count_diff': stat.count_diff
+        }
+        for stat in sorted(stats, key=lambda stat: stat.size_diff, reverse=True)[:limit]
+        if stat.size_diff > 0
+    ]
+
+
+class JobMemoryProfile:
+    """작업 하나의 단계별 메모리 사용 기록"""
+    
+    def __init__(self, trace=False, top=10):
+        """
+        Args:
+            trace: True면 tracemalloc으로 단계별 할당 상위 위치 수집
+            top: 단계별로 기록할 할당 위치 수
+        """
+        self.trace = trace
+        self.top = top
+        self.stages = {}
+        self.snapshots = {}
+        self._lock = threading.Lock()
+        if trace:
+            _trace_control.acquire()
+    
+    @contextmanager
+    def stage(self, name):
+        """
+        단계 실행 구간의 시작/최대/종료 상주 메모리 기록 (예외로 끝나도 기록)
+        
+        trace면 시작 스냅샷 대비 증가한 할당 위치를 최대 시점(at_peak)과 종료 시점(retained)으로 기록
+        """
+        tracing = self.trace and tracemalloc.is_tracing()
+        start_snapshot = tracemalloc.take_snapshot() if tracing else None
+        watch_id, start = _sampler.watch(trace=tracing)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            peak, end, traced_peak, peak_snapshot = _sampler.stop(watch_id)
+            record = {
+                'start_rss_mb': round(start / _MB, 1),
+                'peak_rss_mb': round(peak / _MB, 1),
+                'end_rss_mb': round(end / _MB, 1),
+                'peak_increase_mb': round((peak - start) / _MB, 1),
+                'seconds': round(time.monotonic() - started, 3)
+            }
+            if tracing and tracemalloc.is_tracing():
+                # 추적량도 프로세스 전체 값 (동시에 실행 중인 작업의 할당 포함)
+                record['process_traced_peak_mb'] = round(traced_peak / _MB, 1)
+                end_snapshot = tracemalloc.take_snapshot()
+                top = {
+                    'at_peak': _snapshot_growth(peak_snapshot or end_snapshot, start_snapshot, self.top),
+                    'retained': _snapshot_growth(end_snapshot, start_snapshot, self.top)
+                }
+                with self._lock:
+                    self.snapshots[name] = top
+            with self._lock:
+                self.stages[name] = record
+            _record_stage(name, record)
+    
+    def close(self):
+        """추적 종료 (작업이 끝나면 호출)"""
+        if self.trace:
+            self.trace = False
+            _trace_control.release()
+    
+    def summary(self):
+        """상태 응답용 기록"""
+        with self._lock:
+            result = {'stages': dict(self.stages)}
+            if self.snapshots:
+                result['tracemalloc'] = dict(self.snapshots)
+            return result
+
+
+def _record_stage(name, record):
+    with _stage_stats_lock:
+        stats = _stage_stats.setdefault(name, {'runs': 0, 'max_peak_rss_mb': 0.0, 'max_peak_increase_mb': 0.0})
+        stats['runs'] += 1
+        stats['max_peak_rss_mb'] = max(stats['max_peak_rss_mb'], record['peak_rss_mb'])
+        stats['max_peak_increase_mb'] = max(stats['max_peak_increase_mb'], record['peak_increase_mb'])
+
+
+def get_memory_stats():
+    """프로세스 메모리와 단계별 최대값"""
+    with _stage_stats_lock:
+        stages = {name: dict(stats) for name, stats in _stage_stats.items()}
+    return {
+        'rss_mb': round(current_rss() / _MB, 1),
+        'peak_rss_mb': round(peak_rss() / _MB, 1),
+        'tracing': tracemalloc.is_tracing(),
+        'stages': stages
+    }
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    profile = JobMemoryProfile(trace=True, top=3)
+    
+    with profile.stage("input"):
+        data = [bytearray(1024) for _ in range(50000)]  # 약 50MB
+        time.sleep(0.2)
+        del data
+    
+    with profile.stage("report"):
+        text = "보고서 " * 200000
+    
+    try:
+        check_limit("extracted_chars", len(text), 1000000,
+                    lambda: f"추출된 텍스트가 {len(text):,}자로 한도 1,000,000자를 넘습니다.")
+    except ResourceLimitExceeded as e:
+        print(f"한도 초과: {e} ({e.limit_name})")
+    profile.close()
+    
+    print("=== 단계별 메모리 ===")
+    for name, record in profile.summary()['stages'].items():
+        print(f"{name}: {record}")
+    for name, top in profile.summary()['tracemalloc'].items():
+        print(f"{name} 최대 시점 할당 상위: {top['at_peak'][:1]}, 종료 시 남은 할당: {top['retained'][:1]}")
+    print(f"프로세스: {get_memory_stats()}")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+관점 적합도 분류 (Perspective Relevance)
+입력의 단서 표현과 구조(목록 항목 수, 과거 서술, 질문, 목표 수치 등)로 관점별 적합도를 로컬에서 계산하여
+입력에 맞지 않는 관점은 LLM을 호출하지 않고 제외
+"""
+
+import re
+import math
+
+from analysis_engine import ThinkingPromptsEngine
+
+_BULLET = re.compile(r'^\s*(?:[-*•·]|\d{1,2}[.)]|[①-⑩])\s+\S', re.MULTILINE)
+_ENDING = re.compile(r'([가-힣])(다|습니다|어요|는데|지만|고)')
+_QUESTION = re.compile(r'\?|(까요|을까|ㄹ까|는가|나요)\s*[.?]?\s*$', re.MULTILINE)
+_TARGET = re.compile(r'\d+(?:\.\d+)?\s*(?:%|퍼센트|배|명|건|원|만|억|개월|년|주|일|분기|k|m)', re.IGNORECASE)
+
+# 관점별 기본 점수와 단서 표현 (소문자 부분 일치)
+# prior가 높은 관점은 대부분의 계획/상황 입력에 적용되는 범용 관점
+PERSPECTIVE_CUES = {
+    "challenge_thinking": {
+        'prior': 0.35,
+        'cues': ('계획', '가정', '전략', '예상', '판단', '근거', '논리', '확신', '생각', '할 것', '하려고',
+                 'plan', 'assume', 'strategy')
+    },
+    "reframe_lens": {
+        'prior': 0.15,
+        'cues': ('아이디어', '고객', '사용자', '타깃', '브랜드', '마케팅', '포지셔닝', '메시지', '콘셉트', '컨셉',
+                 '시장', '제품', '서비스', 'audience', 'brand', 'product')
+    },
+    "surface_question": {
+        'prior': 0.2,
+        'cues': ('고민', '문제', '어떻게', '왜', '무엇', '해야', '선택', '딜레마', '갈등', '막막',
+                 'problem', 'should', 'why')
+    },
+    "translate_gut_feeling": {
+        'prior': 0.05,
+        'cues': ('느낌', '찜찜', '불안', '애매', '걱정', '이상하', '어색', '불편', '께름칙', '확신이 없',
+                 '잘 모르겠', 'feel', 'uneasy')
+    },
+    "second_order_effects": {
+        'prior': 0.3,
+        'cues': ('결정', '도입', '변경', '전환', '정책', '출시', '시행', '확대', '폐지', '투자', '채용', '가격',
+                 '영향', 'launch', 'decide', 'policy')
+    },
+    "unseen_variable": {
+        'prior': 0.3,
+        'cues': ('계획', '변수', '리스크', '위험', '일정', '예산', '경쟁', '규제', '시장', '조건', '의존',
+                 'risk', 'budget', 'timeline')
+    },
+    "extract_principle": {
+        'prior': 0.0,
+        'cues': ('성공', '실패', '효과', '성과', '교훈', '결과', '잘 됐', '잘됐', '망했', '회고', '경험', '사례',
+                 'worked', 'failed', 'lesson')
+    },
+    "reverse_engineer_instinct": {
+        'prior': 0.05,
+        'cues': ('직감', '직관', '왠지', '확신', '느낌상', '것 같', '옳다고', '맞다고',
+                 'instinct', 'gut', 'intuition')
+    },
+    "hidden_pattern": {
+        'prior': 0.0,
+        'cues': ('사례', '예시', '경우', '패턴', '공통', '반복', '여러', '관찰', '매번', '항상',
+                 'example', 'pattern', 'case')
+    },
+    "think_in_reverse": {
+        'prior': 0.15,
+        'cues': ('목표', '달성', '목적', '까지', '이루', '도달', '성장', '확보', '늘리', 'kpi', 'goal', 'target')
+    }
+}
+
+# 단서 표현 하나의 가중치와 점수에 반영할 최대 단서 수
+CUE_WEIGHT = 0.12
+MAX_CUES = 5
+
+
+def _past_statements(content):
+    """과거 서술 수 (받침이 ㅆ인 음절 + 어미: 했다, 바꿨는데, 떨어졌고 등)"""
+    return sum(1 for syllable, _ in _ENDING.findall(content) if (ord(syllable) - 0xAC00) % 28 == 20)
+
+
+def _features(content):
+    """관점 판별에 쓰는 입력 구조 특징"""
+    return {
+        'list_items': len(_BULLET.findall(content)),
+        'past_statements': _past_statements(content),
+        'questions': len(_QUESTION.findall(content)),
+        'targets': len(_TARGET.findall(content))
+    }
+
+
+def _structure_bonus(key, features):
+    """관점이 전제하는 입력 구조가 있으면 가산점 (예: 숨겨진 패턴은 여러 사례, 핵심 원리는 지난 결과)"""
+    if key == "hidden_pattern":
+        return 0.35 if features['list_items'] >= 3 else 0.15 if features['list_items'] == 2 else 0.0
+    if key == "extract_principle":
+        return min(features['past_statements'], 4) * 0.08
+    if key == "think_in_reverse":
+        return 0.2 if features['targets'] else 0.0
+    if key == "surface_question":
+        return min(features['questions'], 3) * 0.1
+    if key == "unseen_variable":
+        return 0.1 if features['list_items'] >= 2 else 0.0
+    return 0.0
+
+
+def score_perspectives(content, keys=None):
+    """
+    관점별 적합도 점수 (LLM 호출 없음)
+    
+    점수 = 관점 기본 점수 + 단서 표현 수 x CUE_WEIGHT + 구조 가산점 (0~1로 포화)
+    
+    Args:
+        content: 분석할 내용
+        keys: 점수를 매길 관점 키 (None이면 전체)
+    
+    Returns:
+        list: [{'key', 'title', 'score', 'cues'}] (점수 내림차순, 같으면 PROMPTS 순서)
+    """
+    prompts = ThinkingPromptsEngine.PROMPTS
+    text = content.lower()
+    features = _features(content)
+    scored = []
+    for key in keys or prompts:
+        spec = PERSPECTIVE_CUES.get(key, {'prior': 0.5, 'cues': ()})
+        matched = [cue for cue in spec['cues'] if cue in text]
+        raw = spec['prior'] + CUE_WEIGHT * min(len(matched), MAX_CUES) + _structure_bonus(key, features)
+        scored.append({
+            'key': key,
+            'title': prompts[key]['title'],
+            'score': round(1 - math.exp(-2 * raw), 3),
+            'cues': matched[:3]
+        })
+    order = {key: index for index, key in enumerate(prompts)}
+    return sorted(scored, key=lambda item: (-item['score'], order.get(item['key'], len(order))))
+
+
+def select_perspectives(content, top_k=None, min_score=None, min_count=1, keys=None):
+    """
+    적합도 상위 관점만 선택
+    
+    Args:
+        content: 분석할 내용
+        top_k: 최대 관점 수 (None이면 제한 없음)
+        min_score: 최소 적합도 (None이면 제한 없음)
+        min_count: 기준과 관계없이 실행할 최소 관점 수
+        keys: 후보 관점 키 (None이면 전체)
+    
+    Returns:
+        tuple: (실행할 관점 키 목록 (PROMPTS 순서), 제외된 관점 [{'key', 'title', 'score', 'cues'}])
+    """
+    ranked = score_perspectives(content, keys)
+    selected = []
+    for rank, item in enumerate(ranked):
+        within_top = top_k is None or rank < top_k
+        above_min = min_score is None or item['score'] >= min_score
+        if rank < min_count or (within_top and above_min):
+            selected.append(item['key'])
+    
+    order = list(keys or ThinkingPromptsEngine.PROMPTS)
+    return (
+        [key for key in order if key in selected],
+        [item for item in ranked if item['key'] not in selected]
+    )
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    samples = {
+        "계획": "다음 분기에 구독 요금제를 도입하려고 합니다. 기존 무료 사용자 중 10%가 전환할 것으로 예상하고, "
+               "마케팅 예산은 월 500만원입니다. 경쟁사 가격보다 낮게 책정할 계획입니다.",
+        "회고": "지난해 오프라인 행사를 온라인으로 바꿨는데 참가자가 3배 늘었습니다. 하지만 후원사 만족도는 떨어졌고, "
+               "결국 올해는 하이브리드로 진행했습니다. 이 경험에서 어떤 교훈을 얻을 수 있을까요?",
+        "관찰": "최근 이런 사례들을 봤습니다.\n- 신규 입사자가 3개월 안에 퇴사하는 경우가 많음\n"
+               "- 온보딩 문서가 팀마다 다름\n- 멘토가 배정되지 않은 팀에서 반복됨\n- 퇴사 면담에서 공통으로 '소속감' 언급",
+        "고민": "팀 리더를 맡으라는 제안을 받았는데 왠지 찜찜한 느낌이 듭니다. 직감으로는 거절하는 게 맞는 것 같은데 "
+               "이유를 잘 모르겠습니다. 어떻게 판단해야 할까요?"
+    }
+    
+    print("=== 관점 적합도 분류 테스트 ===")
+    total, kept = 0, 0
+    for name, content in samples.items():
+        ranked = score_perspectives(content)
+        selected, skipped = select_perspectives(content, top_k=6, min_score=0.4, min_count=3)
+        total += len(ranked)
+        kept += len(selected)
+        print(f"\n[{name}] 실행 {len(selected)}개 / 제외 {len(skipped)}개")
+        for item in ranked:
+            mark = "✓" if item['key'] in selected else "·"
+            print(f"  {mark} {item['score']:.2f} {item['title']} {', '.join(item['cues'])}")
+    print(f"\nLLM 관점 호출: {total}회 -> {kept}회 ({1 - kept / total:.0%} 감소)")
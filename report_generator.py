@@ -6,14 +6,54 @@
 """
 
 import os
+import time
+import signal
+import tempfile
+import threading
 from datetime import datetime
-import markdown
+
+from analysis_engine import check_cancelled, JobCancelled
+from memory_tracking import check_limit, ResourceLimitExceeded
+
+
+REPORT_CSS = """
+@page { size: A4; margin: 2cm; }
+body { font-family: 'Noto Sans KR', 'Malgun Gothic', sans-serif; line-height: 1.6; color: #333; }
+h1 { color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 10px; }
+h2 { color: #34495e; border-bottom: 2px solid #95a5a6; padding-bottom: 8px; margin-top: 30px; }
+h3 { color: #7f8c8d; margin-top: 20px; }
+hr { border: none; border-top: 1px solid #bdc3c7; margin: 20px 0; }
+code { background-color: #f4f4f4; padding: 2px 6px; border-radius: 3px; }
+pre { background-color: #f4f4f4; padding: 15px; border-radius: 5px; overflow-x: auto; }
+blockquote { border-left: 4px solid #3498db; padding-left: 15px; color: #555; font-style: italic; }
+"""
+
+
+def markdown_to_html(md_content):
+    """마크다운 조각을 HTML로 변환"""
+    from markdown import markdown
+    return markdown(md_content, extensions=['extra', 'codehilite'])
+
+
+def html_document(html_content):
+    """보고서 스타일을 적용한 HTML 문서"""
+    return (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="UTF-8">\n'
+        f'<style>{REPORT_CSS}</style>\n</head>\n<body>\n{html_content}\n</body>\n</html>\n'
+    )
 
 
 class ReportGenerator:
     """분석 결과를 PDF 보고서로 생성하는 클래스"""
     
-    def __init__(self):
+    def __init__(self, output_dir=None, max_report_bytes=None):
+        """
+        Args:
+            output_dir: 보고서 파일을 생성할 디렉토리 (첫 생성 시 만듦, 기본값은 시스템 임시 디렉토리)
+            max_report_bytes: 보고서 파일 최대 크기 (None이면 제한 없음, 넘으면 파일을 지우고 ResourceLimitExceeded)
+        """
+        self.output_dir = output_dir or tempfile.gettempdir()
+        self.max_report_bytes = max_report_bytes
         self.report_template = """# {title}
 
 **분석 일시**: {timestamp}  
@@ -58,7 +98,8 @@ class ReportGenerator:
 *본 보고서는 AI 기반 다각도 사고 분석 시스템을 통해 자동 생성되었습니다.*
 """
     
-    def generate_report(self, input_data, analysis_results, synthesis, output_format='markdown'):
+    def generate_report(self, input_data, analysis_results, synthesis, output_format='markdown',
+                        cancel_event=None, output_dir=None, skipped_perspectives=None):
         """
         분석 결과를 보고서로 생성
         
@@ -67,14 +108,19 @@ class ReportGenerator:
             analysis_results: ThinkingPromptsEngine의 분석 결과 (dict)
             synthesis: 종합 요약 (str)
             output_format: 'markdown' 또는 'pdf'
+            cancel_event: 설정되면 PDF 변환을 중단하고 만든 파일을 지우는 threading.Event
+            output_dir: 이번 보고서만 생성할 디렉토리 (None이면 self.output_dir)
+            skipped_perspectives: 입력과 관련이 낮아 실행하지 않은 관점 [{'title', 'score', ...}]
         
         Returns:
             str: 생성된 보고서 파일 경로
+        
+        Raises:
+            JobCancelled: cancel_event로 취소된 경우
+            ResourceLimitExceeded: 보고서가 max_report_bytes를 넘은 경우
         """
         # 메타데이터 추출
-        metadata = input_data.get('metadata', {})
-        title = metadata.get('title', 'Untitled Analysis')
-        source = metadata.get('source', 'Unknown')
+        title, source = self._describe_input(input_data)
         input_type = input_data.get('type', 'text')
         original_content = input_data.get('content', '')
         
@@ -82,10 +128,10 @@ class ReportGenerator:
         timestamp = datetime.now().strftime('%Y년 %m월 %d일 %H:%M:%S')
         
         # 요약 생성 (첫 500자)
-        summary = self._generate_summary(original_content, analysis_results)
+        summary = self._generate_summary(original_content, analysis_results, skipped_perspectives)
         
         # 분석 결과 포맷팅
-        analyses = self._format_analyses(analysis_results)
+        analyses = self._format_analyses(analysis_results, skipped_perspectives)
         
         # 보고서 내용 생성
         report_content = self.report_template.format(
@@ -99,44 +145,95 @@ class ReportGenerator:
             synthesis=synthesis,
             report_timestamp=timestamp
         )
+        # 파일을 쓰기 전에 크기 확인 (PDF는 변환 후 다시 확인)
+        self._check_report_size(len(report_content.encode('utf-8')))
         
         # 파일명 생성
         safe_title = self._sanitize_filename(title)
         timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_dir = output_dir or self.output_dir
+        base_path = os.path.join(output_dir, f"report_{safe_title}_{timestamp_str}")
+        os.makedirs(output_dir, exist_ok=True)
         
         if output_format == 'markdown':
-            output_path = f"/home/ubuntu/report_{safe_title}_{timestamp_str}.md"
+            output_path = f"{base_path}.md"
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write(report_content)
             return output_path
         
         elif output_format == 'pdf':
             # 먼저 마크다운 파일 생성
-            md_path = f"/home/ubuntu/report_{safe_title}_{timestamp_str}.md"
+            md_path = f"{base_path}.md"
             with open(md_path, 'w', encoding='utf-8') as f:
                 f.write(report_content)
             
-            # PDF로 변환
-            pdf_path = f"/home/ubuntu/report_{safe_title}_{timestamp_str}.pdf"
-            self._convert_to_pdf(md_path, pdf_path)
+            # PDF로 변환 (취소되면 중간 파일 삭제)
+            pdf_path = f"{base_path}.pdf"
+            try:
+                self._convert_to_pdf(md_path, pdf_path, cancel_event)
+                if os.path.exists(pdf_path):
+                    self._check_report_size(os.path.getsize(pdf_path))
+            except (JobCancelled, ResourceLimitExceeded):
+                for path in (md_path, pdf_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                raise
             
             return pdf_path
         
         else:
             raise ValueError(f"지원하지 않는 출력 형식: {output_format}")
     
-    def _generate_summary(self, content, analysis_results):
+    def _check_report_size(self, size):
+        """보고서 크기 한도 확인"""
+        check_limit('report_bytes', size, self.max_report_bytes, lambda: (
+            f"보고서 크기 {size / (1024 * 1024):.1f}MB가 작업당 한도 "
+            f"{self.max_report_bytes / (1024 * 1024):.1f}MB를 넘습니다."
+        ))
+    
+    def _describe_input(self, input_data):
+        """보고서 머리말의 제목과 출처"""
+        metadata = input_data.get('metadata', {})
+        title = metadata.get('title', 'Untitled Analysis')
+        source = metadata.get('source', 'Unknown')
+        if metadata.get('truncated'):
+            source += f" (토큰 한도로 전체 {metadata['pages']}쪽 중 {metadata['extracted_pages']}쪽만 분석)"
+        return title, source
+    
+    def start_progressive(self, input_data, perspectives):
+        """
+        관점 결과가 도착할 때마다 채워지는 작성 중 보고서 생성
+        
+        Args:
+            input_data: InputProcessor의 출력 (dict)
+            perspectives: 보고서에 넣을 관점 {key: {'title', 'title_en', 'description'}} (표시 순서)
+        
+        Returns:
+            ProgressiveReport
+        """
+        return ProgressiveReport(self, input_data, perspectives)
+    
+    def _generate_summary(self, content, analysis_results, skipped_perspectives=None):
         """요약 생성"""
         # 원본 내용 요약
         content_summary = content[:300] + "..." if len(content) > 300 else content
         
         # 분석 개수
         total_analyses = len(analysis_results)
-        successful_analyses = sum(1 for r in analysis_results.values() if not r.get('error'))
+        successful_analyses = sum(
+            1 for r in analysis_results.values() if not r.get('error') and not r.get('cut')
+        )
+        cut_titles = [r.get('title', 'Unknown') for r in analysis_results.values() if r.get('cut')]
+        
+        cut_notice = ""
+        if cut_titles:
+            cut_notice = f"\n\n**시간 제한으로 누락된 관점**: {', '.join(cut_titles)}"
+        if skipped_perspectives:
+            cut_notice += f"\n\n**입력과 관련이 낮아 제외한 관점**: {', '.join(p['title'] for p in skipped_perspectives)}"
         
         summary = f"""본 보고서는 제공된 내용을 **10가지 사고 프롬프트**를 통해 다각도로 분석한 결과입니다.
 
-**분석 완료**: {successful_analyses}/{total_analyses}개 관점
+**분석 완료**: {successful_analyses}/{total_analyses}개 관점{cut_notice}
 
 **원본 내용 요약**:
 {content_summary}
@@ -145,17 +242,45 @@ class ReportGenerator:
         
         return summary
     
-    def _format_analyses(self, analysis_results):
-        """분석 결과 포맷팅"""
+    def _format_analyses(self, analysis_results, skipped_perspectives=None):
+        """분석 결과 포맷팅 (제외한 관점은 마지막에 적합도와 함께 나열)"""
         formatted = []
         
         for idx, (key, result) in enumerate(analysis_results.items(), 1):
-            title = result.get('title', 'Unknown')
-            title_en = result.get('title_en', '')
-            description = result.get('description', '')
-            analysis = result.get('result', '')
-            
-            section = f"""### {idx}. {title} ({title_en})
+            formatted.append(self._format_section(idx, result))
+        
+        if skipped_perspectives:
+            rows = "\n".join(
+                f"| {p['title']} | {p['score']:.2f} | {', '.join(p.get('cues', [])) or '-'} |"
+                for p in skipped_perspectives
+            )
+            formatted.append(f"""### 제외된 관점
+
+입력 내용과의 적합도가 낮아 분석하지 않은 관점입니다.
+
+| 관점 | 적합도 | 감지된 단서 |
+|------|--------|-------------|
+{rows}
+""")
+        
+        return "\n".join(formatted)
+    
+    def _format_section(self, idx, result, pending=False):
+        """관점 하나의 분석 결과 섹션 (pending이면 진행 중 표시)"""
+        title = result.get('title', 'Unknown')
+        title_en = result.get('title_en', '')
+        description = result.get('description', '')
+        analysis = result.get('result', '')
+        
+        if pending:
+            title = f"{title} ⏳ 분석 중"
+            analysis = "> 분석이 진행 중입니다. 완료되면 이 섹션이 채워집니다."
+        elif result.get('cut'):
+            # 마감 시간 내에 완료되지 않은 관점은 누락 표시
+            title = f"{title} ⏱ 미완료"
+            analysis = f"> {analysis}"
+        
+        return f"""### {idx}. {title} ({title_en})
 
 **분석 목적**: {description}
 
@@ -165,16 +290,14 @@ class ReportGenerator:
 
 ---
 """
-            formatted.append(section)
-        
-        return "\n".join(formatted)
     
     def _format_input_type(self, input_type):
         """입력 타입 한글 변환"""
         type_map = {
             'text': '텍스트 직접 입력',
             'url': '웹 페이지 (URL)',
-            'pdf': 'PDF 문서'
+            'pdf': 'PDF 문서',
+            'corpus': '문서 코퍼스'
         }
         return type_map.get(input_type, input_type)
     
@@ -193,103 +316,177 @@ class ReportGenerator:
         # 최대 50자로 제한
         return safe[:50]
     
-    def _convert_to_pdf(self, md_path, pdf_path):
-        """마크다운을 PDF로 변환"""
+    def _convert_to_pdf(self, md_path, pdf_path, cancel_event=None, timeout=60, poll_interval=0.2):
+        """마크다운을 PDF로 변환 (변환 중 취소되면 변환 프로세스 종료)"""
         import subprocess
         
         try:
             # manus-md-to-pdf 유틸리티 사용
-            result = subprocess.run(
+            process = subprocess.Popen(
                 ['manus-md-to-pdf', md_path, pdf_path],
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=60
+                start_new_session=True
             )
-            
-            if result.returncode != 0:
-                raise Exception(f"PDF 변환 실패: {result.stderr}")
-            
         except FileNotFoundError:
             # manus-md-to-pdf가 없는 경우 대체 방법 사용
+            check_cancelled(cancel_event)
             self._convert_to_pdf_alternative(md_path, pdf_path)
+            return
+        
+        end = time.monotonic() + timeout
+        while True:
+            try:
+                _, stderr = process.communicate(timeout=poll_interval)
+                break
+            except subprocess.TimeoutExpired:
+                cancelled = cancel_event is not None and cancel_event.is_set()
+                if cancelled or time.monotonic() >= end:
+                    # 변환기가 띄운 하위 프로세스까지 함께 종료
+                    os.killpg(process.pid, signal.SIGKILL)
+                    process.communicate()
+                    check_cancelled(cancel_event)
+                    raise Exception(f"PDF 변환 실패: {timeout}초 내에 완료되지 않음")
+        
+        if process.returncode != 0:
+            raise Exception(f"PDF 변환 실패: {stderr}")
     
     def _convert_to_pdf_alternative(self, md_path, pdf_path):
         """대체 PDF 변환 방법 (WeasyPrint 사용)"""
         from weasyprint import HTML, CSS
-        from markdown import markdown
         
         # 마크다운 읽기
         with open(md_path, 'r', encoding='utf-8') as f:
             md_content = f.read()
         
         # HTML로 변환
-        html_content = markdown(md_content, extensions=['extra', 'codehilite'])
+        html_content = markdown_to_html(md_content)
         
         # CSS 스타일 추가
-        styled_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                @page {{
-                    size: A4;
-                    margin: 2cm;
-                }}
-                body {{
-                    font-family: 'Noto Sans KR', 'Malgun Gothic', sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                }}
-                h1 {{
-                    color: #2c3e50;
-                    border-bottom: 3px solid #3498db;
-                    padding-bottom: 10px;
-                }}
-                h2 {{
-                    color: #34495e;
-                    border-bottom: 2px solid #95a5a6;
-                    padding-bottom: 8px;
-                    margin-top: 30px;
-                }}
-                h3 {{
-                    color: #7f8c8d;
-                    margin-top: 20px;
-                }}
-                hr {{
-                    border: none;
-                    border-top: 1px solid #bdc3c7;
-                    margin: 20px 0;
-                }}
-                code {{
-                    background-color: #f4f4f4;
-                    padding: 2px 6px;
-                    border-radius: 3px;
-                }}
-                pre {{
-                    background-color: #f4f4f4;
-                    padding: 15px;
-                    border-radius: 5px;
-                    overflow-x: auto;
-                }}
-                blockquote {{
-                    border-left: 4px solid #3498db;
-                    padding-left: 15px;
-                    color: #555;
-                    font-style: italic;
-                }}
-            </style>
-        </head>
-        <body>
-            {html_content}
-        </body>
-        </html>
-        """
+        styled_html = html_document(html_content)
         
         # PDF 생성
         HTML(string=styled_html).write_pdf(pdf_path)
 
 
+class ProgressiveReport:
+    """
+    작성 중 보고서 (partial 다운로드용)
+    
+    머리말/원본 내용은 한 번만, 관점 섹션은 결과가 바뀔 때만 형식별(markdown/html)로 렌더링해 캐시하고
+    요청 시에는 캐시된 조각만 이어 붙인다. 결과 기록(작업 스레드)과 렌더링(요청 스레드)은 잠금으로 보호한다.
+    """
+    
+    FORMATS = ('markdown', 'html')
+    
+    def __init__(self, generator, input_data, perspectives):
+        self.generator = generator
+        self.perspectives = dict(perspectives)
+        self._results = {}
+        self._synthesis = None
+        self._version = 0
+        self._section_cache = {}  # (key, format) -> 렌더링된 섹션
+        self._document_cache = {}  # format -> (version, 문서)
+        self._lock = threading.Lock()
+        self.section_renders = 0
+        
+        title, source = generator._describe_input(input_data)
+        self._head = f"""# {title}
+
+**분석 일시**: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M:%S')}  
+**출처**: {source}  
+**분석 유형**: {generator._format_input_type(input_data.get('type', 'text'))}  
+"""
+        self._body = f"""---
+
+## 📄 원본 내용 (Original Content)
+
+{generator._truncate_content(input_data.get('content', ''), 2000)}
+
+---
+
+## 🧠 관점별 분석
+"""
+    
+    def set_result(self, key, result):
+        """관점 결과 기록 (해당 섹션만 다시 렌더링 대상)"""
+        with self._lock:
+            self._results[key] = result
+            for fmt in self.FORMATS:
+                self._section_cache.pop((key, fmt), None)
+            self._version += 1
+    
+    def set_synthesis(self, synthesis):
+        """종합 요약 기록"""
+        with self._lock:
+            self._synthesis = synthesis
+            for fmt in self.FORMATS:
+                self._section_cache.pop(('__synthesis__', fmt), None)
+            self._version += 1
+    
+    def progress(self):
+        """
+        Returns:
+            tuple: (완료된 관점 수, 전체 관점 수)
+        """
+        with self._lock:
+            return sum(1 for key in self.perspectives if key in self._results), len(self.perspectives)
+    
+    def _cached(self, cache_key, fmt, build):
+        """조각 렌더링 결과 캐시 (없을 때만 build()로 마크다운 생성 후 형식 변환)"""
+        cached = self._section_cache.get((cache_key, fmt))
+        if cached is None:
+            md_content = build()
+            cached = md_content if fmt == 'markdown' else markdown_to_html(md_content)
+            self._section_cache[(cache_key, fmt)] = cached
+            self.section_renders += 1
+        return cached
+    
+    def render(self, fmt='markdown'):
+        """
+        현재까지의 보고서 (완료된 섹션은 결과, 나머지는 진행 중 표시)
+        
+        Args:
+            fmt: 'markdown' 또는 'html'
+        
+        Returns:
+            str: 보고서 문서
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError(f"지원하지 않는 형식: {fmt}")
+        
+        with self._lock:
+            cached = self._document_cache.get(fmt)
+            if cached and cached[0] == self._version:
+                return cached[1]
+            
+            completed = sum(1 for key in self.perspectives if key in self._results)
+            status = "종합 요약 작성 중" if completed == len(self.perspectives) else "관점 분석 중"
+            progress = f"**진행 상황**: {completed}/{len(self.perspectives)}개 관점 완료, {status} (작성 중인 보고서)\n"
+            
+            parts = [
+                self._cached('__head__', fmt, lambda: self._head),
+                progress if fmt == 'markdown' else markdown_to_html(progress),
+                self._cached('__body__', fmt, lambda: self._body)
+            ]
+            for idx, (key, info) in enumerate(self.perspectives.items(), 1):
+                result = self._results.get(key)
+                parts.append(self._cached(key, fmt, lambda: self.generator._format_section(
+                    idx, result or info, pending=result is None
+                )))
+            parts.append(self._cached('__synthesis__', fmt, lambda: "---\n\n## 🎯 종합 결론 (Synthesis)\n\n" + (
+                self._synthesis if self._synthesis is not None
+                else "> 모든 관점 분석이 끝나면 종합 요약이 작성됩니다."
+            )))
+            
+            document = "\n".join(parts)
+            if fmt == 'html':
+                document = html_document(document)
+            self._document_cache[fmt] = (self._version, document)
+            return document
+
+
 # 테스트 코드
 if __name__ == "__main__":
     # 테스트용 더미 데이터
@@ -339,4 +536,16 @@ if __name__ == "__main__":
         content = f.read()
         print("\n=== 보고서 내용 미리보기 ===")
         print(content[:500] + "...")
-
+    
+    
+    # 작성 중 보고서: 결과가 도착한 섹션만 다시 렌더링되는지 확인
+    print("\n=== 작성 중 보고서 테스트 ===")
+    from analysis_engine import ThinkingPromptsEngine
+    progressive = generator.start_progressive(test_input_data, ThinkingPromptsEngine.PROMPTS)
+    progressive.render('markdown')
+    first_renders = progressive.section_renders
+    progressive.set_result('challenge_thinking', test_analysis_results['challenge_thinking'])
+    partial = progressive.render('markdown')
+    progressive.render('markdown')
+    print(f"첫 렌더링 조각 수: {first_renders}, 결과 1개 도착 후 추가 렌더링: {progressive.section_renders - first_renders}")
+    print(f"진행 상황: {progressive.progress()}, 진행 중 섹션: {partial.count('⏳ 분석 중')}개")
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+유사 입력 인덱스 (Similarity Index)
+MinHash LSH로 이전 분석과 거의 같은 입력(공백/추적 파라미터 차이 등)을 찾는 로컬 인덱스
+"""
+
+import re
+import json
+import sqlite3
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+
+
+class SimilarityIndex:
+    """MinHash LSH 기반 유사 입력 인덱스 (SQLite에 영속화)"""
+    
+    # 해시 공간 (64비트)
+    _HASH_MAX = (1 << 64) - 1
+    
+    def __init__(self, path=None, num_perm=128, bands=32, shingle_size=5,
+                 max_entries=10000, max_chars=200000):
+        """
+        유사 입력 인덱스 초기화
+        
+        Args:
+            path: SQLite 파일 경로 (None이면 메모리에만 유지)
+            num_perm: MinHash 서명 길이
+            bands: LSH 밴드 수 (num_perm의 약수)
+            shingle_size: 문자 shingle 길이
+            max_entries: 인덱스에 유지할 최대 항목 수 (초과 시 오래된 항목부터 제거)
+            max_chars: 서명 계산에 사용할 최대 문자 수
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        
+        self._entries = OrderedDict()  # job_id -> (signature, info)
+        self._buckets = {}  # (band, band hash) -> set(job_id)
+        self._lock = threading.Lock()
+        
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "job_id TEXT UNIQUE, signature BLOB, info TEXT)"
+            )
+            self._db.commit()
+            self._load()
+    
+    def _load(self):
+        """저장된 항목을 읽어 인덱스 재구성"""
+        rows = self._db.execute("SELECT job_id, signature, info FROM entries ORDER BY seq").fetchall()
+        for job_id, blob, info in rows:
+            signature = array('Q')
+            signature.frombytes(blob)
+            self._insert(job_id, signature.tolist(), json.loads(info))
+        self._evict()
+    
+    def normalize(self, text):
+        """비교용 텍스트 정규화 (소문자, 공백 통합)"""
+        text = text[:self.max_chars].lower()
+        return re.sub(r'\s+', ' ', text).strip()
+    
+    def signature(self, text):
+        """
+        MinHash 서명 계산
+        
+        shingle마다 해시를 한 번만 계산하고 num_perm개 구간의 최솟값을 취하는
+        one-permutation 방식에 빈 구간 보정을 더해 긴 문서도 한 번의 순회로 처리
+        
+        Args:
+            text: 원본 텍스트
+        
+        Returns:
+            list: 길이 num_perm의 서명
+        """
+        normalized = self.normalize(text)
+        k = self.shingle_size
+        if len(normalized) <= k:
+            shingles = {normalized}
+        else:
+            shingles = {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+        
+        bins = [None] * self.num_perm
+        for shingle in shingles:
+            h = int.from_bytes(
+                hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big'
+            )
+            index, value = h % self.num_perm, h // self.num_perm
+            if bins[index] is None or value < bins[index]:
+                bins[index] = value
+        
+        # 빈 구간은 오른쪽의 가장 가까운 구간 값을 거리만큼 이동하여 채움
+        filled = [b for b in bins if b is not None]
+        if not filled:
+            return [self._HASH_MAX] * self.num_perm
+        signature = list(bins)
+        for i in range(self.num_perm):
+            if signature[i] is None:
+                distance = 1
+                while bins[(i + distance) % self.num_perm] is None:
+                    distance += 1
+                source = bins[(i + distance) % self.num_perm]
+                signature[i] = (source + distance * 0x9E3779B97F4A7C15) & self._HASH_MAX
+        return signature
+    
+    def similarity(self, sig_a, sig_b):
+        """두 서명의 추정 Jaccard 유사도"""
+        same = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+        return same / self.num_perm
+    
+    def _band_keys(self, signature):
+        """LSH 밴드별 버킷 키 생성"""
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            yield (band, hash(tuple(chunk)))
+    
+    def query(self, text, threshold=0.9, limit=5, signature=None, covers=None):
+        """
+        유사도가 threshold 이상인 이전 항목 검색
+        
+        Args:
+            text: 검색할 텍스트
+            threshold: 최소 추정 유사도 (0-1)
+            limit: 최대 결과 수
+            signature: 미리 계산한 서명 (있으면 재계산하지 않음)
+            covers: 지정하면 info['perspectives']가 이 관점 키를 모두 포함하는 항목만 반환
+                    (관점 기록이 없는 항목은 제외)
+        
+        Returns:
+            list: [{'job_id', 'similarity', **info}] (유사도 내림차순)
+        """
+        if signature is None:
+            signature = self.signature(text)
+        
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+            
+            matches = []
+            for job_id in candidates:
+                entry_sig, info = self._entries[job_id]
+                if covers is not None and not set(covers) <= set(info.get('perspectives') or ()):
+                    continue
+                score = self.similarity(signature, entry_sig)
+                if score >= threshold:
+                    matches.append({'job_id': job_id, 'similarity': round(score, 4), **info})
+        
+        matches.sort(key=lambda m: m['similarity'], reverse=True)
+        return matches[:limit]
+    
+    def get(self, job_id):
+        """저장된 항목 정보 반환 (없으면 None)"""
+        with self._lock:
+            entry = self._entries.get(job_id)
+        return dict(entry[1]) if entry else None
+    
+    def add(self, job_id, text, info, signature=None):
+        """
+        항목 추가
+        
+        Args:
+            job_id: 작업 ID
+            text: 정규화 전 입력 텍스트
+            info: 함께 저장할 정보 (보고서 경로 등, JSON 직렬화 가능해야 함)
+            signature: 미리 계산한 서명
+        """
+        if signature is None:
+            signature = self.signature(text)
+        
+        with self._lock:
+            self._insert(job_id, signature, info)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (job_id, signature, info) VALUES (?, ?, ?)",
+                    (job_id, array('Q', signature).tobytes(), json.dumps(info, ensure_ascii=False))
+                )
+            self._evict()
+            if self._db is not None:
+                self._db.commit()
+    
+    def remove(self, job_id):
+        """항목 제거"""
+        with self._lock:
+            self._remove(job_id)
+            if self._db is not None:
+                self._db.commit()
+    
+    def _insert(self, job_id, signature, info):
+        """메모리 인덱스에 항목 추가 (잠금은 호출자가 보유)"""
+        if job_id in self._entries:
+            self._remove(job_id, persist=False)
+        self._entries[job_id] = (signature, info)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(job_id)
+    
+    def _remove(self, job_id, persist=True):
+        """항목 제거 (잠금은 호출자가 보유)"""
+        entry = self._entries.pop(job_id, None)
+        if entry is not None:
+            for key in self._band_keys(entry[0]):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(job_id)
+                    if not bucket:
+                        del self._buckets[key]
+        if persist and self._db is not None:
+            self._db.execute("DELETE FROM entries WHERE job_id = ?", (job_id,))
+    
+    def _evict(self):
+        """최대 항목 수를 넘으면 오래된 항목부터 제거"""
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    index = SimilarityIndex(max_entries=2)
+    
+    article = """
+    AI 기반 교육 플랫폼 개발 계획
+    
+    우리는 개인화된 학습 경험을 제공하는 AI 교육 플랫폼을 개발하려고 합니다.
+    주요 기능으로는 학습자 수준 분석, 맞춤형 콘텐츠 추천, 실시간 피드백 제공이 있습니다.
+    """
+    index.add("job-1", article, {'title': 'AI 교육 플랫폼'})
+    index.add("job-2", "전혀 다른 주제의 문서입니다. 물류 자동화와 창고 관리.", {'title': '물류'})
+    
+    edited = article.replace("    ", "  ") + " "
+    print("=== 유사 입력 검색 테스트 ===")
+    print(f"공백만 다른 입력: {index.query(edited, threshold=0.8)}")
+    print(f"일부 수정된 입력: {index.query(article.replace('실시간', '즉각적인'), threshold=0.5)}")
+    
+    # 일부 관점만 실행한 작업은 더 많은 관점을 요청한 입력에 재사용되지 않음
+    subset = SimilarityIndex()
+    subset.add("job-a", article, {'title': '관점 1개', 'perspectives': ['challenge_thinking']})
+    subset.add("job-b", article, {'title': '관점 2개', 'perspectives': ['challenge_thinking', 'reframe_lens']})
+    subset.add("job-c", article, {'title': '관점 기록 없음'})
+    full = [m['job_id'] for m in subset.query(edited, threshold=0.8, covers=['challenge_thinking', 'reframe_lens'])]
+    single = sorted(m['job_id'] for m in subset.query(edited, threshold=0.8, covers=['challenge_thinking']))
+    assert full == ['job-b'], full
+    assert single == ['job-a', 'job-b'], single
+    print(f"관점 2개 요청: {full}, 관점 1개 요청: {single}")
+    
+    index.add("job-3", "세 번째 문서", {'title': '세 번째'})
+    print(f"최대 항목 수 초과 후 항목 수: {len(index)} (job-1 제거됨: {index.get('job-1') is None})")
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+파일 저장소 (Storage)
+업로드, 보고서, 배치 ZIP 등 작업 산출물을 로컬 디렉터리 또는 S3 호환 객체 저장소에 저장
+(S3 호환 저장소를 쓰면 여러 앱 서버가 같은 파일을 공유하고, 다운로드는 서명 URL로 넘겨 앱 서버가 중계하지 않음)
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+# boto3는 S3 저장소를 처음 사용할 때 불러옴
+
+
+class LocalStorage:
+    """로컬 디렉터리 저장소 (단일 인스턴스 또는 공유 볼륨용)"""
+    
+    def __init__(self, root):
+        """
+        Args:
+            root: 저장 디렉터리 (첫 쓰기 시 생성)
+        """
+        self.root = Path(root)
+    
+    def path(self, key):
+        """키의 로컬 경로 (이전 버전이 기록한 절대 경로도 그대로 사용)"""
+        return self.root / key
+    
+    @contextmanager
+    def open_write(self, key, content_type=None):
+        """
+        스트리밍 쓰기 (임시 파일에 쓴 뒤 완료 시 교체, 실패하면 아무것도 남기지 않음)
+        
+        Yields:
+            쓰기용 바이너리 파일 객체
+        """
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".part")
+        try:
+            with open(tmp_path, "wb") as file:
+                yield file
+            os.replace(tmp_path, path)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+    
+    def put_file(self, key, source_path, content_type=None):
+        """로컬 파일을 저장소로 복사"""
+        with open(source_path, "rb") as source, self.open_write(key, content_type) as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+    
+    def open_read(self, key):
+        """읽기용 바이너리 파일 객체"""
+        return open(self.path(key), "rb")
+    
+    @contextmanager
+    def local_copy(self, key):
+        """처리용 로컬 경로 (로컬 저장소는 복사하지 않음)"""
+        yield str(self.path(key))
+    
+    def exists(self, key):
+        return bool(key) and self.path(key).is_file()
+    
+    def size(self, key):
+        return self.path(key).stat().st_size
+    
+    def delete(self, key):
+        """파일 삭제 (없으면 무시)"""
+        path = self.path(key)
+        if path.is_file():
+            path.unlink()
+    
+    def download_url(self, key, filename, media_type):
+        """로컬 저장소는 앱 서버가 직접 전송하므로 None"""
+        return None
+
+
+class _MultipartWriter:
+    """part_size만큼 모일 때마다 멀티파트 업로드 파트를 전송하는 쓰기 객체"""
+    
+    def __init__(self, client, bucket, key, part_size, content_type=None):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.content_type = content_type or "application/octet-stream"
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+    
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+    
+    def _upload_part(self, data):
+        if self._upload_id is None:
+            self._upload_id = self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, ContentType=self.content_type
+            )['UploadId']
+        number = len(self._parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id, PartNumber=number, Body=data
+        )
+        self._parts.append({'PartNumber': number, 'ETag': response['ETag']})
+    
+    def close(self):
+        """남은 데이터 전송 후 업로드 완료 (파트 크기보다 작은 파일은 한 번에 저장)"""
+        if self._upload_id is None:
+            self.client.put_object(
+                Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer), ContentType=self.content_type
+            )
+            return
+        if self._buffer:
+            self._upload_part(bytes(self._buffer))
+            self._buffer.clear()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            MultipartUpload={'Parts': self._parts}
+        )
+    
+    def abort(self):
+        """업로드 취소 (전송한 파트 폐기)"""
+        if self._upload_id is not None:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+
+
+class S3Storage:
+    """S3 호환 객체 저장소 (AWS S3, MinIO 등, 인증 정보는 AWS_ACCESS_KEY_ID 등 표준 환경 변수 사용)"""
+    
+    def __init__(self, bucket, prefix="", endpoint_url=None, region=None,
+                 part_size=8 * 1024 * 1024, url_expires=3600):
+        """
+        Args:
+            bucket: 버킷 이름
+            prefix: 키 앞에 붙일 경로 (예: "reports/")
+            endpoint_url: S3 호환 서버 주소 (None이면 AWS, 지정하면 경로 방식 주소 사용)
+            region: 리전
+            part_size: 멀티파트 업로드 파트 크기 (바이트, 최소 5MB)
+            url_expires: 다운로드 서명 URL 유효 시간(초)
+        """
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.part_size = part_size
+        self.url_expires = url_expires
+        self._client = None
+        self._client_lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """boto3 S3 클라이언트 (첫 사용 시 생성)"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+                    from botocore.config import Config
+                    self._client = boto3.client(
+                        "s3",
+                        endpoint_url=self.endpoint_url,
+                        region_name=self.region,
+                        config=Config(
+                            signature_version="s3v4",
+                            s3={"addressing_style": "path" if self.endpoint_url else "auto"}
+                        )
+                    )
+        return self._client
+    
+    def _key(self, key):
+        return self.prefix + key
+    
+    @contextmanager
+    def open_write(self, key, content_type=None):
+        """
+        스트리밍 멀티파트 쓰기 (파일 전체를 메모리나 디스크에 모으지 않음, 실패하면 업로드 취소)
+        
+        Yields:
+            write(data)를 제공하는 쓰기 객체
+        """
+        writer = _MultipartWriter(self.client, self.bucket, self._key(key), self.part_size, content_type)
+        try:
+            yield writer
+            # 마지막 파트 전송이나 업로드 완료가 실패해도 멀티파트 업로드를 남기지 않음
+            writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+    
+    def put_file(self, key, source_path, content_type=None):
+        """로컬 파일을 멀티파트로 업로드"""
+        with open(source_path, "rb") as source, self.open_write(key, content_type) as target:
+            shutil.copyfileobj(source, target, self.part_size)
+    
+    def open_read(self, key):
+        """읽기용 스트림 (read(size) 제공)"""
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(key))['Body']
+    
+    @contextmanager
+    def local_copy(self, key):
+        """처리용 임시 로컬 파일로 내려받아 경로 제공 (컨텍스트 종료 시 삭제)"""
+        suffix = os.path.splitext(key)[1]
+        with tempfile.NamedTemporaryFile(suffix=suffix) as tmp:
+            body = self.open_read(key)
+            shutil.copyfileobj(body, tmp, 1024 * 1024)
+            body.close()
+            tmp.flush()
+            yield tmp.name
+    
+    def _head(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+    
+    def exists(self, key):
+        return bool(key) and self._head(key) is not None
+    
+    def size(self, key):
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(key)
+        return head['ContentLength']
+    
+    def delete(self, key):
+        """객체 삭제 (없으면 무시)"""
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+    
+    def download_url(self, key, filename, media_type):
+        """클라이언트가 저장소에서 직접 내려받을 서명 URL"""
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                'Bucket': self.bucket,
+                'Key': self._key(key),
+                'ResponseContentType': media_type,
+                'ResponseContentDisposition': f'attachment; filename="{filename}"'
+            },
+            ExpiresIn=self.url_expires
+        )
+
+
+class MockObjectStore:
+    """
+    MinIO 대용 로컬 S3 호환 서버 (테스트/개발용, 메모리 저장)
+    
+    객체 PUT/GET/HEAD/DELETE와 멀티파트 업로드만 지원하며 서명은 검사하지 않는다.
+    """
+    
+    def __init__(self, port=0):
+        import re
+        import uuid
+        from urllib.parse import urlsplit, parse_qs, unquote
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        self.objects = {}  # (bucket, key) -> (bytes, content_type)
+        self.uploads = {}  # upload_id -> {part_number: bytes}
+        self.requests = []  # (method, path, query)
+        self._lock = threading.Lock()
+        store = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def _target(self):
+                parts = urlsplit(self.path)
+                query = {name: values[0] for name, values in parse_qs(parts.query, keep_blank_values=True).items()}
+                bucket, _, key = unquote(parts.path).lstrip("/").partition("/")
+                with store._lock:
+                    store.requests.append((self.command, parts.path, query))
+                return bucket, key, query
+            
+            def _body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            
+            def _send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+            
+            def _xml(self, status, body):
+                self._send(status, f'<?xml version="1.0" encoding="UTF-8"?>{body}'.encode(),
+                           {"Content-Type": "application/xml"})
+            
+            def _not_found(self):
+                self._xml(404, "<Error><Code>NoSuchKey</Code><Message>Not Found</Message></Error>")
+            
+            def do_PUT(self):
+                bucket, key, query = self._target()
+                data = self._body()
+                if not key:
+                    self._send(200)  # 버킷 생성
+                    return
+                etag = f'"{uuid.uuid4().hex}"'
+                with store._lock:
+                    if "uploadId" in query:
+                        store.uploads[query["uploadId"]][int(query["partNumber"])] = data
+                    else:
+                        store.objects[(bucket, key)] = (data, self.headers.get("Content-Type"))
+                self._send(200, headers={"ETag": etag})
+            
+            def do_POST(self):
+                bucket, key, query = self._target()
+                body = self._body()
+                if "uploads" in query:
+                    upload_id = uuid.uuid4().hex
+                    with store._lock:
+                        store.uploads[upload_id] = {}
+                    self._xml(200, f"<InitiateMultipartUploadResult><Bucket>{bucket}</Bucket>"
+                                   f"<Key>{key}</Key><UploadId>{upload_id}</UploadId>"
+                                   f"</InitiateMultipartUploadResult>")
+                elif "uploadId" in query:
+                    numbers = [int(n) for n in re.findall(rb"<PartNumber>(\d+)</PartNumber>", body)]
+                    with store._lock:
+                        parts = store.uploads.pop(query["uploadId"])
+                        store.objects[(bucket, key)] = (b"".join(parts[n] for n in numbers), None)
+                    self._xml(200, f"<CompleteMultipartUploadResult><Bucket>{bucket}</Bucket>"
+                                   f"<Key>{key}</Key><ETag>\"{uuid.uuid4().hex}\"</ETag>"
+                                   f"</CompleteMultipartUploadResult>")
+                else:
+                    self._send(400)
+            
+            def do_GET(self):
+                bucket, key, query = self._target()
+                with store._lock:
+                    found = store.objects.get((bucket, key))
+                if found is None:
+                    self._not_found()
+                    return
+                data, content_type = found
+                headers = {
+                    "Content-Type": query.get("response-content-type") or content_type
+                    or "application/octet-stream",
+                    "ETag": '"mock"'
+                }
+                if "response-content-disposition" in query:
+                    headers["Content-Disposition"] = query["response-content-disposition"]
+                self._send(200, data, headers)
+            
+            def do_HEAD(self):
+                bucket, key, _ = self._target()
+                with store._lock:
+                    found = store.objects.get((bucket, key))
+                if found is None:
+                    self._send(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(found[0])))
+                self.send_header("ETag", '"mock"')
+                self.end_headers()
+            
+            def do_DELETE(self):
+                bucket, key, query = self._target()
+                with store._lock:
+                    if "uploadId" in query:
+                        store.uploads.pop(query["uploadId"], None)
+                    else:
+                        store.objects.pop((bucket, key), None)
+                self._send(204)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.endpoint_url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def shutdown(self):
+        self.server.shutdown()
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    import sys
+    import time
+    import urllib.request
+    
+    if len(sys.argv) == 3 and sys.argv[1] == "--serve":
+        # 로컬 개발용 객체 저장소: STORAGE_BACKEND=s3 S3_ENDPOINT_URL=http://127.0.0.1:<port>
+        mock = MockObjectStore(port=int(sys.argv[2]))
+        print(f"S3 호환 테스트 서버: {mock.endpoint_url} (Ctrl+C로 종료)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            mock.shutdown()
+        sys.exit(0)
+    
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+    mock = MockObjectStore()
+    storage = S3Storage("reports", prefix="demo/", endpoint_url=mock.endpoint_url,
+                        region="us-east-1", part_size=5 * 1024 * 1024)
+    
+    print("=== 저장소 테스트 ===")
+    data = os.urandom(12 * 1024 * 1024 + 123)
+    started = time.perf_counter()
+    with storage.open_write("big.bin") as out:
+        for offset in range(0, len(data), 1024 * 1024):
+            out.write(data[offset:offset + 1024 * 1024])
+    parts = sum(1 for method, _, query in mock.requests if method == "PUT" and "partNumber" in query)
+    print(f"스트리밍 멀티파트 쓰기: {len(data)} bytes, 파트 {parts}개, {time.perf_counter() - started:.2f}s")
+    
+    body = storage.open_read("big.bin")
+    assert body.read() == data
+    print(f"읽기 일치, 크기 {storage.size('big.bin')}, 존재 {storage.exists('big.bin')}, "
+          f"없는 키 {storage.exists('missing.bin')}")
+    
+    with storage.open_write("report.md", content_type="text/markdown") as out:
+        out.write("# 보고서\n".encode("utf-8"))
+    url = storage.download_url("report.md", "analysis_report.md", "text/markdown")
+    with urllib.request.urlopen(url) as response:
+        print(f"서명 URL 다운로드: {response.read().decode('utf-8').strip()} "
+              f"({response.headers['Content-Disposition']})")
+    
+    try:
+        with storage.open_write("failed.bin") as out:
+            out.write(os.urandom(6 * 1024 * 1024))
+            raise RuntimeError("쓰기 중 오류")
+    except RuntimeError:
+        pass
+    print(f"실패한 쓰기: 객체 {storage.exists('failed.bin')}, 남은 멀티파트 업로드 {len(mock.uploads)}개")
+    
+    # 업로드 완료 요청이 실패해도 멀티파트 업로드를 취소
+    complete = storage.client.complete_multipart_upload
+    def failing_complete(**kwargs):
+        raise RuntimeError("업로드 완료 실패")
+    storage.client.complete_multipart_upload = failing_complete
+    try:
+        with storage.open_write("failed-close.bin") as out:
+            out.write(os.urandom(6 * 1024 * 1024))
+    except RuntimeError:
+        pass
+    storage.client.complete_multipart_upload = complete
+    print(f"완료 실패: 객체 {storage.exists('failed-close.bin')}, 남은 멀티파트 업로드 {len(mock.uploads)}개")
+    assert not mock.uploads
+    
+    storage.delete("big.bin")
+    print(f"삭제 후 존재: {storage.exists('big.bin')}")
+    
+    local = LocalStorage(tempfile.mkdtemp())
+    with local.open_write("uploads/a.pdf") as out:
+        out.write(b"%PDF-1.4")
+    with local.local_copy("uploads/a.pdf") as path:
+        print(f"로컬 저장소: {path} ({local.size('uploads/a.pdf')} bytes)")
+    mock.shutdown()
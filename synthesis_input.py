@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+종합 요약 입력 압축 (Synthesis Input)
+관점별 분석 결과에서 제목, 목록 항목의 첫 문장, 점수가 높은 문장을 로컬에서 골라
+토큰 예산 안의 종합 요약 입력을 생성
+"""
+
+import re
+from collections import Counter
+
+from analysis_engine import estimate_tokens
+
+_HEADING = re.compile(r'^\s*(#{1,6}\s+.+|\*\*[^*]{2,80}\*\*:?)\s*$')
+_BULLET = re.compile(r'^\s*(?:[-*•·]|\d{1,2}[.)])\s+(.+)$')
+_SENTENCE_END = re.compile(r'(?<=[.!?。])\s+|(?<=다\.)\s*|(?<=요\.)\s*')
+_WORD = re.compile(r'[0-9A-Za-z가-힣]{2,}')
+
+# 결론/위험/제안을 담은 문장에 가산점을 주는 단서 표현
+CUE_WORDS = (
+    '핵심', '중요', '결론', '따라서', '요약', '위험', '리스크', '제안', '권장', '우선',
+    '반드시', '가장', '결국', 'key', 'risk', 'important', 'recommend', 'therefore'
+)
+
+
+def _split_sentences(text):
+    """문장 단위 분리"""
+    return [s.strip() for s in _SENTENCE_END.split(text) if s and s.strip()]
+
+
+def _first_sentence(text, max_chars=200):
+    """첫 문장 (너무 길면 잘라냄)"""
+    sentences = _split_sentences(text)
+    first = sentences[0] if sentences else text.strip()
+    return first if len(first) <= max_chars else first[:max_chars].rstrip() + "…"
+
+
+def extract_key_points(text, budget_tokens):
+    """
+    분석 결과 하나에서 핵심 항목 추출
+    
+    우선순위: 제목 -> 목록 항목의 첫 문장 -> 본문 문장(단어 빈도와 단서 표현 점수순)
+    고른 항목은 원문 순서대로 반환
+    
+    Args:
+        text: 관점별 분석 결과 (마크다운)
+        budget_tokens: 최대 토큰 수
+    
+    Returns:
+        str: 핵심 항목 목록 (줄 단위)
+    """
+    candidates = []  # (priority, score, position, text)
+    body = []
+    for position, line in enumerate(text.splitlines()):
+        if not line.strip():
+            continue
+        if _HEADING.match(line):
+            heading = line.strip().lstrip('#').strip().strip('*').rstrip(':').strip('*').strip()
+            candidates.append((0, 0.0, position, f"[{heading}]"))
+            continue
+        bullet = _BULLET.match(line)
+        if bullet:
+            candidates.append((1, 0.0, position, f"- {_first_sentence(bullet.group(1))}"))
+            continue
+        for offset, sentence in enumerate(_split_sentences(line)):
+            body.append((position + offset / 100, sentence))
+    
+    # 본문 문장 점수: 결과 전체의 단어 빈도 평균 + 단서 표현 가산점
+    frequency = Counter(word.lower() for word in _WORD.findall(text))
+    for position, sentence in body:
+        words = [word.lower() for word in _WORD.findall(sentence)]
+        if not words:
+            continue
+        score = sum(frequency[word] for word in words) / len(words)
+        score *= 1 + 0.5 * sum(1 for cue in CUE_WORDS if cue in sentence.lower())
+        candidates.append((2, score, position, sentence))
+    
+    selected = []
+    seen = set()
+    used = 0
+    for priority, score, position, item in sorted(candidates, key=lambda c: (c[0], -c[1], c[2])):
+        cost = estimate_tokens(item)
+        if item in seen or used + cost > budget_tokens:
+            continue
+        selected.append((position, item))
+        seen.add(item)
+        used += cost
+    
+    return "\n".join(item for _, item in sorted(selected))
+
+
+def build_synthesis_input(analysis_results, budget_tokens):
+    """
+    완료된 관점들의 핵심 항목을 예산 안에서 결합
+    
+    예산은 관점마다 같게 나누고, 짧은 결과가 남긴 예산은 뒤 관점에 넘김
+    
+    Args:
+        analysis_results: ThinkingPromptsEngine.analyze() 결과
+        budget_tokens: 전체 입력 토큰 예산
+    
+    Returns:
+        tuple: (결합된 텍스트, 완료된 관점 수)
+    """
+    completed = [
+        result for result in analysis_results.values()
+        if not result.get('error') and not result.get('cut')
+    ]
+    sections = []
+    remaining = budget_tokens
+    for index, result in enumerate(completed):
+        share = remaining // (len(completed) - index)
+        header = f"## {result['title']}"
+        if estimate_tokens(result['result']) <= share:
+            points = result['result']
+        else:
+            points = extract_key_points(result['result'], max(0, share - estimate_tokens(header)))
+        section = f"{header}\n{points}"
+        sections.append(section)
+        remaining -= estimate_tokens(section)
+    return "\n\n".join(sections), len(completed)
+
+
+def rouge_n(reference, candidate, n=1):
+    """
+    ROUGE-N F1 (단어 n-gram 겹침, 압축 요약과 전체 입력 요약의 유사도 측정용)
+    """
+    def ngrams(text):
+        words = [word.lower() for word in _WORD.findall(text)]
+        return Counter(tuple(words[i:i + n]) for i in range(len(words) - n + 1))
+    
+    ref, cand = ngrams(reference), ngrams(candidate)
+    overlap = sum((ref & cand).values())
+    if not ref or not cand or not overlap:
+        return 0.0
+    precision, recall = overlap / sum(cand.values()), overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    sample = """## 핵심 가정 검토
+
+이 계획은 학부모가 AI 진단 결과를 신뢰한다는 가정에 기반합니다. 그러나 초기에는 신뢰가 낮을 수 있습니다.
+가장 중요한 위험은 데이터 부족으로 진단 정확도가 떨어지는 것입니다.
+
+**반론**
+- 학습 데이터가 충분하지 않으면 추천 품질이 낮아집니다. 특히 초기 사용자에게 그렇습니다.
+- 6개월은 콘텐츠 제작까지 고려하면 짧은 기간입니다.
+
+따라서 파일럿 학교와 함께 소규모로 시작하는 것을 권장합니다. 부가적인 이야기로 디자인 색상은 파란색이 좋겠습니다.
+"""
+    results = {
+        f"perspective_{i}": {'title': f"관점 {i}", 'result': sample}
+        for i in range(10)
+    }
+    full = "\n\n".join(f"## {r['title']}\n{r['result']}" for r in results.values())
+    
+    print("=== 종합 요약 입력 압축 테스트 ===")
+    print(f"전체 결합: {estimate_tokens(full)} 토큰")
+    for budget in (2000, 1000, 500):
+        text, completed = build_synthesis_input(results, budget)
+        print(f"예산 {budget}: {estimate_tokens(text)} 토큰 (관점 {completed}개), "
+              f"ROUGE-1 대비 전체 {rouge_n(full, text):.2f}")
+    print("\n예산 1000일 때 관점 1개 발췌:")
+    print(build_synthesis_input(results, 1000)[0].split("\n\n")[0])
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+텍스트 정규화 (Text Normalizer)
+추출된 텍스트에서 페이지마다 반복되는 머리글/바닥글/쪽 번호를 제거하고
+문단 경계를 유지한 채 공백 정리와 줄 끝 하이픈 연결을 한 번의 순회로 처리
+"""
+
+import re
+from collections import Counter
+
+from analysis_engine import estimate_tokens
+
+
+class TextNormalizer:
+    """분석 전 텍스트 정규화 및 절감량 보고"""
+    
+    # 한 번의 치환으로 처리하는 규칙 (앞에서부터 우선)
+    #   hyphen: 줄 끝 하이픈으로 나뉜 단어 ("exam-\nple" -> "example")
+    #   paragraph: 빈 줄이 하나 이상 있는 줄바꿈 -> 문단 경계 하나
+    #   newline: 앞뒤 공백이 있는 줄바꿈 -> 줄바꿈
+    #   space: 연속된 가로 공백 -> 공백 하나
+    _PATTERN = re.compile(
+        r'(?P<hyphen>(?<=[^\W\d_])-[ \t]*\n[ \t]*(?=[a-z]))'
+        r'|(?P<paragraph>[^\S\n]*\n(?:[^\S\n]*\n)+[^\S\n]*)'
+        r'|(?P<newline>[^\S\n]*\n[^\S\n]*)'
+        r'|(?P<space>[^\S\n]+)'
+    )
+    
+    _REPLACEMENTS = {'hyphen': '', 'paragraph': '\n\n', 'newline': '\n', 'space': ' '}
+    
+    # 쪽 번호만 있는 줄 ("12", "- 12 -", "Page 3 of 10", "3 / 10", "12쪽")
+    _PAGE_NUMBER = re.compile(
+        r'^[\s\-–—|]*(?:(?:page|p\.)\s*)?\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?\s*(?:쪽|페이지)?[\s\-–—|]*$',
+        re.IGNORECASE
+    )
+    
+    def __init__(self, edge_lines=3, min_repeat_pages=3, repeat_ratio=0.5):
+        """
+        Args:
+            edge_lines: 머리글/바닥글 후보로 볼 페이지 위아래 줄 수
+            min_repeat_pages: 반복 줄로 판단할 최소 페이지 수
+            repeat_ratio: 반복 줄로 판단할 최소 페이지 비율
+        """
+        self.edge_lines = edge_lines
+        self.min_repeat_pages = min_repeat_pages
+        self.repeat_ratio = repeat_ratio
+    
+    def normalize(self, text):
+        """
+        공백 정리 (문단 경계 유지, 줄 끝 하이픈 연결)
+        
+        Returns:
+            str: 정규화된 텍스트
+        """
+        replacements = self._REPLACEMENTS
+        return self._PATTERN.sub(lambda m: replacements[m.lastgroup], text).strip()
+    
+    def _line_key(self, line):
+        """페이지 간 비교용 줄 키 (숫자는 같은 것으로 취급)"""
+        return re.sub(r'\d+', '#', ' '.join(line.split())).lower()
+    
+    def _edge_indices(self, lines):
+        """페이지 위아래 비어 있지 않은 줄 번호 (짧은 페이지는 본문을 건드리지 않도록 1/3까지)"""
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        count = min(self.edge_lines, max(1, len(filled) // 3))
+        return set(filled[:count] + filled[-count:])
+    
+    def strip_repeated_lines(self, pages):
+        """
+        페이지마다 반복되는 머리글/바닥글과 쪽 번호 줄 제거
+        
+        Args:
+            pages: 페이지별 텍스트 리스트
+        
+        Returns:
+            tuple: (정리된 페이지 리스트, 제거한 줄 수)
+        """
+        split_pages = [page.split('\n') for page in pages]
+        edges = [self._edge_indices(lines) for lines in split_pages]
+        
+        counts = Counter()
+        for lines, indices in zip(split_pages, edges):
+            counts.update({self._line_key(lines[i]) for i in indices})
+        
+        threshold = max(self.min_repeat_pages, self.repeat_ratio * len(pages))
+        repeated = {key for key, count in counts.items() if count >= threshold}
+        
+        removed = 0
+        cleaned = []
+        for lines, indices in zip(split_pages, edges):
+            kept = []
+            for i, line in enumerate(lines):
+                if i in indices and (self._line_key(line) in repeated or self._PAGE_NUMBER.match(line)):
+                    removed += 1
+                    continue
+                kept.append(line)
+            cleaned.append('\n'.join(kept))
+        return cleaned, removed
+    
+    def process(self, text=None, pages=None):
+        """
+        문서 정규화 및 절감량 계산
+        
+        Args:
+            text: 전체 텍스트 (pages가 없을 때)
+            pages: 페이지별 텍스트 리스트 (PDF, 반복 줄 제거 적용)
+        
+        Returns:
+            tuple: (정규화된 텍스트, {
+                'original_chars', 'normalized_chars', 'chars_saved',
+                'tokens_saved', 'repeated_lines_removed'
+            })
+        """
+        removed = 0
+        if pages is not None:
+            original = '\n\n'.join(pages)
+            if len(pages) >= self.min_repeat_pages:
+                pages, removed = self.strip_repeated_lines(pages)
+            text = '\n\n'.join(pages)
+        else:
+            original = text
+        
+        normalized = self.normalize(text)
+        return normalized, {
+            'original_chars': len(original),
+            'normalized_chars': len(normalized),
+            'chars_saved': len(original) - len(normalized),
+            'tokens_saved': max(0, estimate_tokens(original) - estimate_tokens(normalized)),
+            'repeated_lines_removed': removed
+        }
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    normalizer = TextNormalizer()
+    
+    topics = ['pricing', 'logistics', 'hiring', 'research', 'marketing']
+    pages = [
+        f"ACME Corp. Annual Report 2024\n\n"
+        f"   Section {n}    reviews  {topic} across the  inter-\nnational  market.\n"
+        f"It continues the {topic} paragraph   on a second line.\n\n\n"
+        f"A new paragraph about {topic}   starts here.\n"
+        f"Confidential - do not distribute\n"
+        f"- {n} -"
+        for n, topic in enumerate(topics, 1)
+    ]
+    text, stats = normalizer.process(pages=pages)
+    
+    print("=== 텍스트 정규화 테스트 ===")
+    print(text[:200])
+    print(f"문단 수: {len(text.split(chr(10) * 2))}")
+    print(f"절감: {stats}")
@@ -5,27 +5,54 @@ Thinking Prompts Analyzer - Web Application
 FastAPI 기반 웹 인터페이스
 """
 
-from fastapi import FastAPI, File, UploadFile, Form, BackgroundTasks, HTTPException
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, Query
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
 import os
+import json
+import asyncio
+import time
 import uuid
 import shutil
-from datetime import datetime
+import hashlib
+import zipfile
+import tempfile
+import logging
+import functools
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from pathlib import Path
-import asyncio
 
 from input_processor import InputProcessor
-from analysis_engine import ThinkingPromptsEngine
-from report_generator import ReportGenerator
+from analysis_engine import ThinkingPromptsEngine, HedgePolicy, estimate_tokens, check_cancelled, JobCancelled
+from report_generator import ReportGenerator, ProgressiveReport
+from similarity_index import SimilarityIndex
+from job_scheduler import JobScheduler, AdmissionController
+from webhooks import WebhookDispatcher, BlockedDestination, check_destination
+from job_archive import JobArchive
+from job_checkpoints import JobCheckpointStore
+from storage import LocalStorage, S3Storage
+from memory_tracking import JobMemoryProfile, ResourceLimitExceeded, check_limit, get_memory_stats
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app):
+    """앱 수명 주기 (시작 시 이전 프로세스에서 중단된 작업 재개)"""
+    resume_interrupted_jobs()
+    yield
+
 
 # FastAPI 앱 초기화
 app = FastAPI(
     title="Thinking Prompts Analyzer",
     description="10가지 사고 프롬프트를 활용한 AI 기반 다각도 분석 시스템",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -37,25 +64,333 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 작업 디렉토리 설정
-UPLOAD_DIR = Path("/home/ubuntu/uploads")
-REPORT_DIR = Path("/home/ubuntu/reports")
-UPLOAD_DIR.mkdir(exist_ok=True)
-REPORT_DIR.mkdir(exist_ok=True)
+
+
+def _env_float(name, default=None):
+    """환경 변수를 실수로 읽기 (미설정 시 기본값)"""
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+# 작업 디렉토리 설정 (처음 쓰는 시점에 생성)
+UPLOAD_DIR = Path(os.environ.get("UPLOAD_DIR", "/home/ubuntu/uploads"))
+REPORT_DIR = Path(os.environ.get("REPORT_DIR", "/home/ubuntu/reports"))
+STATIC_DIR = Path(os.environ.get("STATIC_DIR", "/home/ubuntu/static"))
+_created_dirs = set()
+
+
+def _ensure_dir(path):
+    """디렉토리가 없으면 생성하고 경로 반환"""
+    if path not in _created_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(path)
+    return path
+
+
+# 작업 시간 제한 설정 (초, 미설정 시 제한 없음)
+JOB_DEADLINE_SECONDS = _env_float("JOB_DEADLINE_SECONDS")
+LLM_CALL_TIMEOUT = _env_float("LLM_CALL_TIMEOUT")
+SYNTHESIS_TIMEOUT = _env_float("SYNTHESIS_TIMEOUT")
+
+# PDF에서 추출할 최대 토큰 수 (0이면 제한 없음, 넘으면 이후 페이지는 읽지 않음)
+INPUT_MAX_TOKENS = int(_env_float("INPUT_MAX_TOKENS", 100000))
+
+# URL로 받는 PDF 문서 최대 크기와 HTML/텍스트 최대 읽기 크기(MB)
+URL_MAX_DOWNLOAD_MB = _env_float("URL_MAX_DOWNLOAD_MB", 50)
+URL_MAX_HTML_MB = _env_float("URL_MAX_HTML_MB", 5)
+
+# 작업당 자원 한도 (0이면 제한 없음): 입력 크기(MB), 추출 문자 수, 보고서 크기(MB)
+# 넘으면 메모리를 더 쓰기 전에 작업을 실패 처리
+JOB_MAX_INPUT_MB = _env_float("JOB_MAX_INPUT_MB", 100)
+JOB_MAX_EXTRACTED_CHARS = int(_env_float("JOB_MAX_EXTRACTED_CHARS", 2000000))
+JOB_MAX_REPORT_MB = _env_float("JOB_MAX_REPORT_MB", 20)
+
+# 종합 요약 입력 방식 ("full", "compressed", "hierarchical")과 입력 토큰 예산
+SYNTHESIS_MODE = os.environ.get("SYNTHESIS_MODE", "compressed")
+SYNTHESIS_INPUT_TOKENS = int(_env_float("SYNTHESIS_INPUT_TOKENS", 3000))
+
+# 헤지 요청 설정 (백분위수 미설정 시 사용 안 함)
+LLM_HEDGE_PERCENTILE = _env_float("LLM_HEDGE_PERCENTILE")
+LLM_HEDGE_BUDGET = _env_float("LLM_HEDGE_BUDGET", 0.1)
+
+# 유사 입력 재사용 설정 ("off": 사용 안 함, "offer": 상태에 후보 제시, "auto": 자동 재사용)
+SIMILARITY_MODE = os.environ.get("SIMILARITY_MODE", "offer")
+SIMILARITY_THRESHOLD = _env_float("SIMILARITY_THRESHOLD", 0.9)
+SIMILARITY_INDEX_PATH = os.environ.get("SIMILARITY_INDEX_PATH", str(REPORT_DIR / "similarity_index.db"))
+SIMILARITY_INDEX_MAX_ENTRIES = int(_env_float("SIMILARITY_INDEX_MAX_ENTRIES", 10000))
+
+# 완료된 분석 보관소 (빈 값이면 사용 안 함)
+JOB_ARCHIVE_PATH = os.environ.get("JOB_ARCHIVE_PATH", str(REPORT_DIR / "job_archive.db"))
+
+# 실행 중인 작업의 관점별 체크포인트 (재시작 시 이어서 실행, 빈 값이면 사용 안 함)
+JOB_CHECKPOINT_PATH = os.environ.get("JOB_CHECKPOINT_PATH", str(REPORT_DIR / "job_checkpoints.db"))
+
+# 입력에 맞는 관점만 실행 (로컬 적합도 점수 상위 K개 또는 최소 점수 이상, 둘 다 미설정 시 전체 실행)
+PERSPECTIVE_TOP_K = int(_env_float("PERSPECTIVE_TOP_K", 0))
+PERSPECTIVE_MIN_SCORE = _env_float("PERSPECTIVE_MIN_SCORE")
+PERSPECTIVE_MIN_COUNT = int(_env_float("PERSPECTIVE_MIN_COUNT", 3))
+
+# 업로드/보고서 저장소 ("local": UPLOAD_DIR/REPORT_DIR, "s3": S3 호환 객체 저장소)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "local")
+S3_BUCKET = os.environ.get("S3_BUCKET")
+S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL")
+S3_REGION = os.environ.get("S3_REGION")
+S3_PREFIX = os.environ.get("S3_PREFIX", "")
+S3_URL_EXPIRES = int(_env_float("S3_URL_EXPIRES", 3600))
+S3_PART_SIZE_MB = _env_float("S3_PART_SIZE_MB", 8)
+
+# 작업 스케줄링 설정
+SCHEDULER_WORKERS = int(_env_float("SCHEDULER_WORKERS", 4))
+CLIENT_LLM_CONCURRENCY = int(_env_float("CLIENT_LLM_CONCURRENCY", 2))
+# 클라이언트 식별 헤더 (인증 프록시/API 게이트웨이가 설정하는 헤더만 지정, 미설정 시 접속 IP)
+CLIENT_ID_HEADER = os.environ.get("CLIENT_ID_HEADER")
+# 클라이언트별 가중치 ("client-a=2,client-b=0.5")
+CLIENT_WEIGHTS = {
+    name.strip(): float(weight)
+    for name, weight in (
+        item.split("=", 1) for item in os.environ.get("CLIENT_WEIGHTS", "").split(",") if "=" in item
+    )
+}
+
+# 배치 최대 항목 수
+BATCH_MAX_ITEMS = int(_env_float("BATCH_MAX_ITEMS", 100))
+
+# 상태 조회 long-poll 최대 대기 시간(초)
+STATUS_MAX_WAIT = _env_float("STATUS_MAX_WAIT", 60)
+
+# 완료 알림 웹훅 서명 키 (미설정 시 callback_url 사용 불가)
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET")
+WEBHOOK_MAX_ATTEMPTS = int(_env_float("WEBHOOK_MAX_ATTEMPTS", 5))
+# 웹훅을 보낼 수 있는 호스트 ("hooks.example.com,10.0.0.5", 미설정 시 공인 주소만 허용)
+WEBHOOK_ALLOWED_HOSTS = {
+    host.strip().lower() for host in os.environ.get("WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+}
+# 웹훅 report_url 등 외부에 알리는 링크의 기준 URL ("https://analyzer.example.com")
+PUBLIC_BASE_URL = os.environ.get("PUBLIC_BASE_URL", "").rstrip("/")
+
+# 입력 유형별 승인 상한 (대기 작업 수, 예상 토큰 적체량)
+ADMISSION_LIMITS = {
+    "text": {
+        "max_jobs": int(_env_float("ADMISSION_MAX_JOBS_TEXT", 100)),
+        "max_tokens": int(_env_float("ADMISSION_MAX_TOKENS_TEXT", 3000000))
+    },
+    "url": {
+        "max_jobs": int(_env_float("ADMISSION_MAX_JOBS_URL", 50)),
+        "max_tokens": int(_env_float("ADMISSION_MAX_TOKENS_URL", 2000000))
+    },
+    "pdf": {
+        "max_jobs": int(_env_float("ADMISSION_MAX_JOBS_PDF", 20)),
+        "max_tokens": int(_env_float("ADMISSION_MAX_TOKENS_PDF", 2000000))
+    },
+    "corpus": {
+        "max_jobs": int(_env_float("ADMISSION_MAX_JOBS_CORPUS", 5)),
+        "max_tokens": int(_env_float("ADMISSION_MAX_TOKENS_CORPUS", 1000000))
+    }
+}
+# 내용을 가져오기 전 입력 크기 추정치
+URL_ESTIMATED_CONTENT_TOKENS = int(_env_float("URL_ESTIMATED_CONTENT_TOKENS", 6000))
+PDF_BYTES_PER_TOKEN = _env_float("PDF_BYTES_PER_TOKEN", 20)
+
+# 입력 유형별 우선순위 레인 (짧은 텍스트 분석이 대용량 PDF보다 먼저 실행)
+INPUT_PRIORITIES = {
+    "text": "interactive",
+    "url": "standard",
+    "pdf": "bulk",
+    "corpus": "bulk"
+}
+
+# 코퍼스 분석: 사용할 관점, 최대 문서 수, 최대 군집 수, 대표 문서 발췌 길이
+CORPUS_PERSPECTIVES = [
+    key.strip() for key in os.getenv("CORPUS_PERSPECTIVES", "hidden_pattern,extract_principle").split(",")
+    if key.strip()
+]
+CORPUS_MAX_DOCUMENTS = int(_env_float("CORPUS_MAX_DOCUMENTS", 500))
+CORPUS_MAX_CLUSTERS = int(_env_float("CORPUS_MAX_CLUSTERS", 8))
+CORPUS_EXCERPT_CHARS = int(_env_float("CORPUS_EXCERPT_CHARS", 2000))
 
 # 분석 작업 상태 저장
 analysis_jobs = {}
 
-# 시스템 초기화
-input_processor = InputProcessor()
-analysis_engine = ThinkingPromptsEngine()
-report_generator = ReportGenerator()
+# 배치 작업 (batch_id -> 항목 목록)
+analysis_batches = {}
+
+# 진행 중인 동일 요청 판별용 (submission key -> 대표 job_id)
+inflight_jobs = {}
+inflight_lock = threading.Lock()
+
+# 상태 변경 대기 중인 long-poll 요청 (job_id -> [(이벤트 루프, asyncio.Event)])
+job_waiters = {}
+job_waiters_lock = threading.Lock()
+
+# 완료 알림 콜백 (대표 job_id -> [(job_id, callback_url)])
+job_callbacks = {}
+job_callbacks_lock = threading.Lock()
+
+# 실행 전/실행 중인 대표 작업의 취소 요청 (job_id -> threading.Event)
+job_cancel_events = {}
+
+# 실행 중인 작업의 작성 중 보고서 (job_id -> ProgressiveReport, partial 다운로드용)
+job_progress_reports = {}
+
+# 취소로 회수한 처리 용량
+cancellation_stats = {
+    "cancelled": 0,
+    "queued_removed": 0,
+    "running_interrupted": 0,
+    "followers_detached": 0,
+    "leaders_detached": 0,
+    "llm_calls_avoided": 0,
+    "estimated_tokens_reclaimed": 0
+}
+cancellation_lock = threading.Lock()
+
+# 완료된 작업의 실제 토큰 사용량 (용량 계획용, 입력 유형별)
+token_usage_stats = {}
+token_usage_lock = threading.Lock()
+
+# 시스템 초기화 (무거운 의존성과 OpenAI 클라이언트는 첫 사용 시 로드)
+input_processor = InputProcessor(
+    max_tokens=INPUT_MAX_TOKENS or None,
+    max_download_bytes=int(URL_MAX_DOWNLOAD_MB * 1024 * 1024),
+    max_html_bytes=int(URL_MAX_HTML_MB * 1024 * 1024),
+    max_input_bytes=int(JOB_MAX_INPUT_MB * 1024 * 1024) or None,
+    max_chars=JOB_MAX_EXTRACTED_CHARS or None
+)
+analysis_engine = ThinkingPromptsEngine(
+    hedge_policy=HedgePolicy(percentile=LLM_HEDGE_PERCENTILE, budget=LLM_HEDGE_BUDGET)
+    if LLM_HEDGE_PERCENTILE else None,
+    synthesis_mode=SYNTHESIS_MODE,
+    synthesis_budget=SYNTHESIS_INPUT_TOKENS
+)
+report_generator = ReportGenerator(max_report_bytes=int(JOB_MAX_REPORT_MB * 1024 * 1024) or None)
+
+
+def _create_storage(name, local_dir):
+    """업로드/보고서 저장소 생성 (S3는 같은 버킷에서 name/ 경로로 구분)"""
+    if STORAGE_BACKEND == "s3":
+        if not S3_BUCKET:
+            raise RuntimeError("STORAGE_BACKEND=s3에는 S3_BUCKET 설정이 필요합니다.")
+        return S3Storage(
+            S3_BUCKET,
+            prefix=f"{S3_PREFIX}{name}/",
+            endpoint_url=S3_ENDPOINT_URL,
+            region=S3_REGION,
+            part_size=int(S3_PART_SIZE_MB * 1024 * 1024),
+            url_expires=S3_URL_EXPIRES
+        )
+    return LocalStorage(local_dir)
+
+
+upload_storage = _create_storage("uploads", UPLOAD_DIR)
+report_storage = _create_storage("reports", REPORT_DIR)
+
+job_scheduler = JobScheduler(
+    worker_count=SCHEDULER_WORKERS,
+    client_llm_limit=CLIENT_LLM_CONCURRENCY,
+    client_weights=CLIENT_WEIGHTS
+)
+admission_controller = AdmissionController(ADMISSION_LIMITS)
+webhook_dispatcher = WebhookDispatcher(
+    WEBHOOK_SECRET, max_attempts=WEBHOOK_MAX_ATTEMPTS, allowed_hosts=WEBHOOK_ALLOWED_HOSTS
+) if WEBHOOK_SECRET else None
+_similarity_index = None
+_similarity_index_lock = threading.Lock()
+
+
+def _get_similarity_index():
+    """유사 입력 인덱스 (첫 사용 시 저장 파일에서 로드, 사용 안 함이면 None)"""
+    global _similarity_index
+    if SIMILARITY_MODE == "off":
+        return None
+    if _similarity_index is None:
+        with _similarity_index_lock:
+            if _similarity_index is None:
+                _ensure_dir(Path(SIMILARITY_INDEX_PATH).parent)
+                _similarity_index = SimilarityIndex(
+                    path=SIMILARITY_INDEX_PATH,
+                    max_entries=SIMILARITY_INDEX_MAX_ENTRIES
+                )
+    return _similarity_index
+
+
+_job_archive = None
+_job_archive_lock = threading.Lock()
+
+
+def _get_job_archive():
+    """분석 보관소 (첫 사용 시 열기, 사용 안 함이면 None)"""
+    global _job_archive
+    if not JOB_ARCHIVE_PATH:
+        return None
+    if _job_archive is None:
+        with _job_archive_lock:
+            if _job_archive is None:
+                _ensure_dir(Path(JOB_ARCHIVE_PATH).parent)
+                _job_archive = JobArchive(JOB_ARCHIVE_PATH)
+    return _job_archive
+
+
+_checkpoint_store = None
+_checkpoint_store_lock = threading.Lock()
+
+
+def _get_checkpoint_store():
+    """작업 체크포인트 저장소 (첫 사용 시 열기, 사용 안 함이면 None)"""
+    global _checkpoint_store
+    if not JOB_CHECKPOINT_PATH:
+        return None
+    if _checkpoint_store is None:
+        with _checkpoint_store_lock:
+            if _checkpoint_store is None:
+                _ensure_dir(Path(JOB_CHECKPOINT_PATH).parent)
+                _checkpoint_store = JobCheckpointStore(JOB_CHECKPOINT_PATH)
+    return _checkpoint_store
+
+
+def _save_checkpoint(save, job_id, *args):
+    """체크포인트 저장 (실패해도 작업은 계속 진행)"""
+    try:
+        save(job_id, *args)
+    except Exception:
+        logger.exception("체크포인트 저장 실패: %s", job_id)
+
+
+def resume_interrupted_jobs():
+    """
+    이전 프로세스에서 끝나지 못한 작업을 체크포인트로 복원해 다시 실행 (완료된 관점은 호출하지 않음)
+    
+    체크포인트 파일이 없으면 재개할 작업도 없으므로 저장소를 열지 않는다 (생성은 첫 작업 제출 시).
+    """
+    if not JOB_CHECKPOINT_PATH or not Path(JOB_CHECKPOINT_PATH).exists():
+        return
+    checkpoints = _get_checkpoint_store()
+    
+    for pending in checkpoints.pending():
+        job_id, task = pending["job_id"], pending["task"]
+        if job_id in analysis_jobs:
+            continue
+        with inflight_lock:
+            analysis_jobs[job_id] = {
+                **task["job"],
+                "status": "queued",
+                "progress": 0,
+                "message": f"재시작 후 분석 재개 대기 중... (완료된 관점 {pending['completed_perspectives']}개)",
+                "version": 0,
+                "estimated_tokens": task["estimated_tokens"],
+                "resumed": True
+            }
+            inflight_jobs[task["submission_key"]] = job_id
+            job_cancel_events[job_id] = threading.Event()
+            _register_callback(job_id, job_id, task["callback_url"])
+        # 이미 받은 작업이므로 승인 상한과 관계없이 적체량에만 반영
+        admission_controller.admit(job_id, task["kwargs"]["input_type"], task["estimated_tokens"])
+        _schedule_job(job_id, task)
 
 
 @app.get("/", response_class=HTMLResponse)
 async def root():
     """메인 페이지"""
-    return FileResponse("/home/ubuntu/static/index.html")
+    return FileResponse(STATIC_DIR / "index.html")
 
 
 @app.get("/api/health")
@@ -68,214 +403,1603 @@ async def health_check():
     }
 
 
+def _update_job(job_id, fields):
+    """작업 상태 갱신 후 상태 변경을 기다리는 long-poll 요청에 알림"""
+    job = analysis_jobs[job_id]
+    job.update(fields)
+    job["version"] = job.get("version", 0) + 1
+    
+    with job_waiters_lock:
+        waiters = job_waiters.pop(job_id, [])
+    for loop, event in waiters:
+        loop.call_soon_threadsafe(event.set)
+
+
+def _register_callback(leader_id, job_id, callback_url):
+    """작업 종료 시 호출할 콜백 URL 등록"""
+    if callback_url:
+        with job_callbacks_lock:
+            job_callbacks.setdefault(leader_id, []).append((job_id, callback_url))
+
+
+def _dispatch_callbacks(leader_id):
+    """작업 종료 알림 웹훅 전송 (연결된 작업의 콜백 포함)"""
+    with job_callbacks_lock:
+        callbacks = job_callbacks.pop(leader_id, [])
+    
+    job = analysis_jobs[leader_id]
+    for job_id, callback_url in callbacks:
+        payload = {
+            "event": f"job.{job['status']}",
+            "job_id": job_id,
+            "status": job["status"],
+            "message": job["message"],
+            "partial": job.get("partial", False),
+            "cut_perspectives": job.get("cut_perspectives", []),
+            "completed_at": job.get("completed_at"),
+            "error": job.get("error")
+        }
+        if job["status"] == "completed" and PUBLIC_BASE_URL:
+            # 수신 측은 서버 밖에 있으므로 PUBLIC_BASE_URL 기준 절대 URL로만 전달
+            payload["report_url"] = f"{PUBLIC_BASE_URL}/api/download/{job_id}"
+        webhook_dispatcher.dispatch(callback_url, payload)
+
+
+def _validate_callback_url(callback_url):
+    """
+    콜백 URL 검증 (웹훅 미설정, 잘못된 URL, 내부 주소면 400)
+    
+    DNS 조회는 전송 시 디스패처가 하므로 여기서는 IP 리터럴과 허용 목록만 검사한다.
+    """
+    if not callback_url:
+        return None
+    if webhook_dispatcher is None:
+        raise HTTPException(status_code=400, detail="웹훅이 설정되지 않아 callback_url을 사용할 수 없습니다.")
+    try:
+        check_destination(callback_url, WEBHOOK_ALLOWED_HOSTS, resolve=False)
+    except BlockedDestination as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return callback_url
+
+
+def _normalize_url(url):
+    """URL 정규화 (스킴/호스트 소문자, 프래그먼트 제거, 쿼리 정렬)"""
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def _submission_key(input_type, normalized_input, format, deadline, perspectives=None):
+    """
+    정규화된 입력과 옵션으로 동일 요청 판별 키 생성
+    
+    모든 진입점(단일/배치/코퍼스)이 같은 옵션 집합을 해시해야 같은 입력이 합쳐지므로
+    옵션은 키워드 인자로 고정한다 (perspectives=None은 자동 선택).
+    """
+    options = {"format": format, "deadline": deadline, "perspectives": perspectives}
+    payload = json.dumps([input_type, normalized_input, options], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _client_id(request):
+    """
+    요청 클라이언트 식별자 (CLIENT_ID_HEADER를 설정했으면 그 헤더, 아니면 접속 IP)
+    
+    클라이언트가 보낸 헤더를 그대로 쓰면 요청마다 새 식별자로 공정 큐잉 순서와 동시 호출 상한을
+    우회할 수 있으므로, 헤더는 앞단 프록시가 인증 후 덮어쓰는 경우에만 사용한다.
+    """
+    if CLIENT_ID_HEADER:
+        client_id = request.headers.get(CLIENT_ID_HEADER)
+        if client_id:
+            return client_id
+    return request.client.host if request.client else "anonymous"
+
+
+def _submit_job(job_id, submission_key, job_info, client_id, content_tokens, callback_url=None,
+                priority=None, admitted=False, **task_kwargs):
+    """
+    분석 작업 등록 (single-flight)
+    
+    같은 키의 작업이 이미 진행 중이면 새 분석을 시작하지 않고 해당 작업에 연결한다.
+    연결된 작업도 고유 job_id를 가지며 상태/보고서는 대표 작업을 따른다.
+    새 작업은 승인 제어를 거쳐 입력 유형별 우선순위 레인으로 스케줄러에 제출한다.
+    
+    Args:
+        priority: 우선순위 레인 (None이면 입력 유형별 기본값)
+        admitted: 호출자가 이미 승인 제어를 통과시킨 작업이면 True (배치 제출)
+    
+    Returns:
+        str: 연결된 대표 작업 ID (새 분석을 시작했으면 None)
+    
+    Raises:
+        HTTPException: 처리 용량 초과 시 429 (Retry-After 헤더 포함)
+    """
+    input_type = task_kwargs["input_type"]
+    estimated_tokens = analysis_engine.estimate_job_tokens(
+        content_tokens, task_kwargs.get("prompts_to_use")
+    )["total_tokens"]
+    estimated_duration = analysis_engine.estimate_job_duration(
+        content_tokens, task_kwargs.get("prompts_to_use")
+    )["total_seconds"]
+    
+    job = {
+        "status": "queued",
+        "progress": 0,
+        "message": "분석 대기 중...",
+        "created_at": datetime.now().isoformat(),
+        "version": 0,
+        "estimated_duration_seconds": estimated_duration,
+        **job_info
+    }
+    
+    with inflight_lock:
+        leader_id = inflight_jobs.get(submission_key)
+        if leader_id is not None:
+            job["coalesced_with"] = leader_id
+            analysis_jobs[job_id] = job
+            _register_callback(leader_id, job_id, callback_url)
+            if admitted:
+                # 실행하지 않으므로 미리 받은 승인 반납
+                admission_controller.release(job_id, completed=False)
+            return leader_id
+        
+        retry_after = None
+        if not admitted:
+            retry_after = admission_controller.try_admit(job_id, input_type, estimated_tokens)
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=429,
+                detail="요청이 많아 지금은 분석을 시작할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": str(retry_after)}
+            )
+        
+        job["estimated_tokens"] = estimated_tokens
+        inflight_jobs[submission_key] = job_id
+        analysis_jobs[job_id] = job
+        job_cancel_events[job_id] = threading.Event()
+        _register_callback(job_id, job_id, callback_url)
+    
+    # 재실행에 필요한 제출 정보 (프로세스가 중단되면 재시작 시 이어서 실행)
+    task = {
+        "kwargs": task_kwargs,
+        "client_id": client_id,
+        "priority": priority or INPUT_PRIORITIES.get(input_type, "standard"),
+        "estimated_tokens": estimated_tokens,
+        "submission_key": submission_key,
+        "callback_url": callback_url,
+        "job": job_info
+    }
+    checkpoints = _get_checkpoint_store()
+    if checkpoints is not None:
+        _save_checkpoint(checkpoints.start, job_id, task)
+    
+    _schedule_job(job_id, task)
+    return None
+
+
+def _schedule_job(job_id, task):
+    """스케줄러를 통해 분석 실행"""
+    job_scheduler.submit(
+        job_id,
+        functools.partial(run_analysis, client_id=task["client_id"]),
+        client_id=task["client_id"],
+        priority=task["priority"],
+        cost=task["estimated_tokens"],
+        submission_key=task["submission_key"],
+        **task["kwargs"]
+    )
+
+
+def _submit_response(job_id, leader_id, message):
+    """분석 요청 응답 생성"""
+    if leader_id is not None:
+        return {
+            "job_id": job_id,
+            "coalesced_with": leader_id,
+            "message": "동일한 분석이 진행 중이어서 해당 작업에 연결되었습니다."
+        }
+    return {
+        "job_id": job_id,
+        "message": message
+    }
+
+
+def _parse_perspectives(value):
+    """
+    요청의 관점 지정 파싱 (쉼표 구분 키)
+    
+    Returns:
+        list: 관점 키 목록 (미지정이면 None)
+    """
+    if not value or not value.strip():
+        return None
+    keys = list(dict.fromkeys(key.strip() for key in value.split(",") if key.strip()))
+    unknown = [key for key in keys if key not in analysis_engine.PROMPTS]
+    if unknown or not keys:
+        raise HTTPException(
+            status_code=400,
+            detail=f"알 수 없는 관점입니다: {', '.join(unknown)} (사용 가능: {', '.join(analysis_engine.PROMPTS)})"
+        )
+    return keys
+
+
+def _select_perspectives(content):
+    """
+    입력에 맞는 관점 선택 (PERSPECTIVE_TOP_K/PERSPECTIVE_MIN_SCORE 설정 시)
+    
+    Returns:
+        tuple: (실행할 관점 키 목록 (선택 안 함이면 None), 제외된 관점 목록)
+    """
+    if not PERSPECTIVE_TOP_K and PERSPECTIVE_MIN_SCORE is None:
+        return None, []
+    from perspective_relevance import select_perspectives
+    return select_perspectives(
+        content,
+        top_k=PERSPECTIVE_TOP_K or None,
+        min_score=PERSPECTIVE_MIN_SCORE,
+        min_count=PERSPECTIVE_MIN_COUNT
+    )
+
+
+def _check_input_size(size, label="입력"):
+    """작업당 입력 크기 한도 확인 (넘으면 413)"""
+    if JOB_MAX_INPUT_MB and size > JOB_MAX_INPUT_MB * 1024 * 1024:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{label} 크기가 작업당 한도 {JOB_MAX_INPUT_MB:g}MB를 넘습니다."
+        )
+
+
+def _save_upload(job_id, upload):
+    """
+    업로드 파일을 저장소에 스트리밍 저장 (저장하면서 내용 해시와 크기 계산, 크기 한도를 넘으면 중단)
+    
+    Returns:
+        tuple: (저장소 키, SHA-256 해시, 바이트 수)
+    """
+    file_key = f"{job_id}_{os.path.basename(upload.filename or 'upload.pdf')}"
+    digest = hashlib.sha256()
+    size = 0
+    upload.file.seek(0)  # 같은 업로드를 여러 항목이 참조할 수 있음
+    with upload_storage.open_write(file_key, content_type=upload.content_type) as buffer:
+        while chunk := upload.file.read(1024 * 1024):
+            size += len(chunk)
+            _check_input_size(size, upload.filename or "파일")
+            digest.update(chunk)
+            buffer.write(chunk)
+    return file_key, digest.hexdigest(), size
+
+
 @app.post("/api/analyze/text")
 async def analyze_text(
-    background_tasks: BackgroundTasks,
+    request: Request,
     text: str = Form(...),
-    format: str = Form("pdf")
+    format: str = Form("pdf"),
+    deadline: Optional[float] = Form(None),
+    callback_url: Optional[str] = Form(None),
+    perspectives: Optional[str] = Form(None, description="실행할 관점 키 (쉼표 구분, 지정하면 자동 선택 안 함)"),
+    trace_memory: bool = Form(False, description="단계별 메모리 할당 위치 기록 (tracemalloc, 작업이 느려짐)")
 ):
     """텍스트 직접 입력 분석"""
     job_id = str(uuid.uuid4())
+    prompts_to_use = _parse_perspectives(perspectives)
+    _check_input_size(len(text.encode("utf-8")), "텍스트")
     
-    # 작업 상태 초기화
-    analysis_jobs[job_id] = {
-        "status": "queued",
-        "progress": 0,
-        "message": "분석 대기 중...",
-        "created_at": datetime.now().isoformat()
-    }
+    # 공백 차이는 같은 입력으로 취급
+    submission_key = _submission_key("text", " ".join(text.split()), format=format, deadline=deadline,
+                                     perspectives=prompts_to_use)
     
-    # 백그라운드 작업으로 분석 실행
-    background_tasks.add_task(
-        run_analysis,
-        job_id=job_id,
+    leader_id = _submit_job(
+        job_id, submission_key, {}, _client_id(request), estimate_tokens(text),
+        callback_url=_validate_callback_url(callback_url),
         input_data=text,
         input_type="text",
-        output_format=format
+        output_format=format,
+        deadline_seconds=deadline,
+        prompts_to_use=prompts_to_use,
+        trace_memory=trace_memory
     )
     
-    return {
-        "job_id": job_id,
-        "message": "분석이 시작되었습니다."
-    }
+    return _submit_response(job_id, leader_id, "분석이 시작되었습니다.")
 
 
 @app.post("/api/analyze/url")
 async def analyze_url(
-    background_tasks: BackgroundTasks,
+    request: Request,
     url: str = Form(...),
-    format: str = Form("pdf")
+    format: str = Form("pdf"),
+    deadline: Optional[float] = Form(None),
+    callback_url: Optional[str] = Form(None),
+    perspectives: Optional[str] = Form(None, description="실행할 관점 키 (쉼표 구분, 지정하면 자동 선택 안 함)"),
+    trace_memory: bool = Form(False, description="단계별 메모리 할당 위치 기록 (tracemalloc, 작업이 느려짐)")
 ):
     """URL 분석"""
     job_id = str(uuid.uuid4())
+    prompts_to_use = _parse_perspectives(perspectives)
     
-    analysis_jobs[job_id] = {
-        "status": "queued",
-        "progress": 0,
-        "message": "분석 대기 중...",
-        "created_at": datetime.now().isoformat()
-    }
+    submission_key = _submission_key("url", _normalize_url(url), format=format, deadline=deadline,
+                                     perspectives=prompts_to_use)
     
-    background_tasks.add_task(
-        run_analysis,
-        job_id=job_id,
+    leader_id = _submit_job(
+        job_id, submission_key, {}, _client_id(request), URL_ESTIMATED_CONTENT_TOKENS,
+        callback_url=_validate_callback_url(callback_url),
         input_data=url,
         input_type="url",
-        output_format=format
+        output_format=format,
+        deadline_seconds=deadline,
+        prompts_to_use=prompts_to_use,
+        trace_memory=trace_memory
     )
     
-    return {
-        "job_id": job_id,
-        "message": "분석이 시작되었습니다."
-    }
+    return _submit_response(job_id, leader_id, "분석이 시작되었습니다.")
 
 
 @app.post("/api/analyze/file")
 async def analyze_file(
-    background_tasks: BackgroundTasks,
+    request: Request,
     file: UploadFile = File(...),
-    format: str = Form("pdf")
+    format: str = Form("pdf"),
+    deadline: Optional[float] = Form(None),
+    callback_url: Optional[str] = Form(None),
+    perspectives: Optional[str] = Form(None, description="실행할 관점 키 (쉼표 구분, 지정하면 자동 선택 안 함)"),
+    trace_memory: bool = Form(False, description="단계별 메모리 할당 위치 기록 (tracemalloc, 작업이 느려짐)")
 ):
     """파일 업로드 분석"""
     job_id = str(uuid.uuid4())
+    prompts_to_use = _parse_perspectives(perspectives)
+    if file.size is not None:
+        _check_input_size(file.size, file.filename or "파일")
     
-    # 파일 저장
-    file_path = UPLOAD_DIR / f"{job_id}_{file.filename}"
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    file_key, digest, size = _save_upload(job_id, file)
+    submission_key = _submission_key("pdf", digest, format=format, deadline=deadline,
+                                     perspectives=prompts_to_use)
     
-    analysis_jobs[job_id] = {
-        "status": "queued",
-        "progress": 0,
-        "message": "분석 대기 중...",
+    try:
+        leader_id = _submit_job(
+            job_id, submission_key, {"file_path": file_key}, _client_id(request),
+            int(size / PDF_BYTES_PER_TOKEN),
+            callback_url=_validate_callback_url(callback_url),
+            input_data=file_key,
+            input_type="pdf",
+            output_format=format,
+            deadline_seconds=deadline,
+            prompts_to_use=prompts_to_use,
+            trace_memory=trace_memory
+        )
+    except HTTPException:
+        # 승인되지 않은 업로드는 보관하지 않음
+        upload_storage.delete(file_key)
+        raise
+    
+    if leader_id is not None:
+        # 같은 파일을 분석 중인 작업이 있으므로 업로드 사본은 불필요
+        upload_storage.delete(file_key)
+        analysis_jobs[job_id].pop("file_path", None)
+    
+    return _submit_response(job_id, leader_id, "파일이 업로드되었습니다. 분석을 시작합니다.")
+
+
+def _parse_batch_items(items, files, max_items=None):
+    """
+    배치/코퍼스 항목 파싱 및 검증
+    
+    Returns:
+        list: [{'type', 'value' 또는 'upload'}]
+    """
+    try:
+        parsed = json.loads(items)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="items는 JSON 배열이어야 합니다.")
+    if not isinstance(parsed, list) or not parsed:
+        raise HTTPException(status_code=400, detail="items는 비어 있지 않은 JSON 배열이어야 합니다.")
+    max_items = max_items or BATCH_MAX_ITEMS
+    if len(parsed) > max_items:
+        raise HTTPException(status_code=400, detail=f"항목은 최대 {max_items}개까지 가능합니다.")
+    
+    uploads = {upload.filename: upload for upload in files or []}
+    result = []
+    for index, item in enumerate(parsed):
+        item_type = item.get("type") if isinstance(item, dict) else None
+        if item_type == "text" and item.get("text"):
+            _check_input_size(len(item["text"].encode("utf-8")), f"items[{index}] 텍스트")
+            result.append({"type": "text", "value": item["text"]})
+        elif item_type == "url" and item.get("url"):
+            result.append({"type": "url", "value": item["url"]})
+        elif item_type == "pdf" and item.get("file") in uploads:
+            # 저장 전에 확인해야 먼저 저장한 항목이 남지 않음
+            if uploads[item["file"]].size is not None:
+                _check_input_size(uploads[item["file"]].size, item["file"])
+            result.append({"type": "pdf", "upload": uploads[item["file"]]})
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"items[{index}]: type은 text/url/pdf이고 각각 text, url, 업로드한 file 이름이 필요합니다."
+            )
+    return result
+
+
+@app.post("/api/analyze/batch")
+async def analyze_batch(
+    request: Request,
+    items: str = Form(..., description='[{"type": "text", "text": ...}, {"type": "url", "url": ...}, {"type": "pdf", "file": "<업로드 파일명>"}]'),
+    files: Optional[List[UploadFile]] = File(None),
+    format: str = Form("pdf"),
+    deadline: Optional[float] = Form(None),
+    callback_url: Optional[str] = Form(None)
+):
+    """
+    여러 입력(텍스트, URL, PDF)을 한 번에 분석
+    
+    배치 항목은 하나의 스케줄링 단위로 처리된다: 모두 요청 클라이언트의 bulk 레인에서
+    같은 동시 실행 상한을 공유하고, 승인 제어는 배치 전체를 한 번에 판단하며,
+    배치 안의 중복 입력은 한 번만 분석한다.
+    """
+    batch_id = str(uuid.uuid4())
+    client_id = _client_id(request)
+    callback_url = _validate_callback_url(callback_url)
+    parsed = _parse_batch_items(items, files)
+    
+    # 항목별 작업 준비 (배치 내 중복 입력은 첫 항목에 연결)
+    entries = []
+    first_by_key = {}
+    saved_files = []
+    try:
+        for item in parsed:
+            job_id = str(uuid.uuid4())
+            entry = {"job_id": job_id, "type": item["type"], "job_info": {}}
+            if item["type"] == "pdf":
+                file_key, digest, size = _save_upload(job_id, item["upload"])
+                saved_files.append(file_key)
+                entry.update(value=file_key, source=item["upload"].filename,
+                             content_tokens=int(size / PDF_BYTES_PER_TOKEN),
+                             job_info={"file_path": file_key})
+                normalized = digest
+            elif item["type"] == "url":
+                entry.update(value=item["value"], source=item["value"],
+                             content_tokens=URL_ESTIMATED_CONTENT_TOKENS)
+                normalized = _normalize_url(item["value"])
+            else:
+                entry.update(value=item["value"], source=item["value"][:50],
+                             content_tokens=estimate_tokens(item["value"]))
+                normalized = " ".join(item["value"].split())
+            
+            entry["submission_key"] = _submission_key(item["type"], normalized, format=format, deadline=deadline,
+                                                      perspectives=None)
+            entry["duplicate_of"] = first_by_key.setdefault(entry["submission_key"], job_id)
+            entries.append(entry)
+    except Exception:
+        # 뒤 항목 저장이 실패하면 앞서 저장한 업로드도 남기지 않음
+        for file_key in saved_files:
+            upload_storage.delete(file_key)
+        raise
+    
+    unique = [entry for entry in entries if entry["duplicate_of"] == entry["job_id"]]
+    
+    # 배치 전체를 한 단위로 승인 제어
+    retry_after = admission_controller.try_admit_many([
+        (entry["job_id"], entry["type"],
+         analysis_engine.estimate_job_tokens(entry["content_tokens"])["total_tokens"])
+        for entry in unique
+    ])
+    if retry_after is not None:
+        for file_key in saved_files:
+            upload_storage.delete(file_key)
+        raise HTTPException(
+            status_code=429,
+            detail="요청이 많아 지금은 배치를 시작할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(retry_after)}
+        )
+    
+    for entry in unique:
+        leader_id = _submit_job(
+            entry["job_id"], entry["submission_key"], {**entry["job_info"], "batch_id": batch_id},
+            client_id, entry["content_tokens"],
+            callback_url=callback_url,
+            priority="bulk",
+            admitted=True,
+            input_data=entry["value"],
+            input_type=entry["type"],
+            output_format=format,
+            deadline_seconds=deadline
+        )
+        if leader_id is not None and entry["type"] == "pdf":
+            upload_storage.delete(entry["value"])
+            analysis_jobs[entry["job_id"]].pop("file_path", None)
+    
+    for entry in entries:
+        if entry["duplicate_of"] != entry["job_id"]:
+            # 배치 내 중복 항목은 첫 항목의 작업을 따름
+            if entry["type"] == "pdf":
+                upload_storage.delete(entry["value"])
+            analysis_jobs[entry["job_id"]] = {
+                "status": "queued",
+                "progress": 0,
+                "message": "분석 대기 중...",
+                "created_at": datetime.now().isoformat(),
+                "version": 0,
+                "batch_id": batch_id,
+                "coalesced_with": entry["duplicate_of"]
+            }
+            _register_callback(entry["duplicate_of"], entry["job_id"], callback_url)
+    
+    analysis_batches[batch_id] = {
+        "batch_id": batch_id,
         "created_at": datetime.now().isoformat(),
-        "file_path": str(file_path)
+        "items": [
+            {"index": index, "type": entry["type"], "source": entry["source"], "job_id": entry["job_id"]}
+            for index, entry in enumerate(entries)
+        ]
+    }
+    
+    return {
+        "batch_id": batch_id,
+        "job_ids": [entry["job_id"] for entry in entries],
+        "unique_jobs": len(unique),
+        "message": f"{len(entries)}개 항목의 배치 분석이 시작되었습니다."
     }
+
+
+@app.post("/api/analyze/corpus")
+async def analyze_corpus(
+    request: Request,
+    items: str = Form(..., description="/api/analyze/batch와 같은 형식의 문서 목록"),
+    files: Optional[List[UploadFile]] = File(None),
+    format: str = Form("pdf"),
+    deadline: Optional[float] = Form(None),
+    callback_url: Optional[str] = Form(None),
+    trace_memory: bool = Form(False, description="단계별 메모리 할당 위치 기록 (tracemalloc, 작업이 느려짐)")
+):
+    """
+    여러 문서를 하나의 코퍼스로 분석
     
-    background_tasks.add_task(
-        run_analysis,
-        job_id=job_id,
-        input_data=str(file_path),
-        input_type="pdf",
-        output_format=format
+    문서를 로컬에서 군집화하고 군집 통계와 대표 문서만 코퍼스용 관점
+    (숨겨진 패턴, 핵심 원리 등)에 전달하므로 문서 수가 늘어도 LLM 호출 수는 일정하다.
+    """
+    job_id = str(uuid.uuid4())
+    parsed = _parse_batch_items(items, files, max_items=CORPUS_MAX_DOCUMENTS)
+    
+    documents = []
+    normalized = []
+    saved_files = []
+    try:
+        for item in parsed:
+            if item["type"] == "pdf":
+                file_key, digest, _ = _save_upload(job_id, item["upload"])
+                saved_files.append(file_key)
+                documents.append({"type": "pdf", "value": file_key})
+                normalized.append(["pdf", digest])
+            elif item["type"] == "url":
+                documents.append({"type": "url", "value": item["value"]})
+                normalized.append(["url", _normalize_url(item["value"])])
+            else:
+                documents.append({"type": "text", "value": item["value"]})
+                normalized.append(["text", " ".join(item["value"].split())])
+    except Exception:
+        # 뒤 문서 저장이 실패하면 앞서 저장한 업로드도 남기지 않음
+        for file_key in set(saved_files):
+            upload_storage.delete(file_key)
+        raise
+    
+    submission_key = _submission_key(
+        "corpus", json.dumps(normalized, ensure_ascii=False),
+        format=format, deadline=deadline, perspectives=CORPUS_PERSPECTIVES
     )
     
+    try:
+        leader_id = _submit_job(
+            job_id, submission_key, {"file_paths": sorted(set(saved_files))}, _client_id(request),
+            # 분석 입력은 군집 수 x 대표 문서 발췌 길이로 제한됨
+            estimate_tokens("가" * CORPUS_MAX_CLUSTERS * 2 * CORPUS_EXCERPT_CHARS),
+            callback_url=_validate_callback_url(callback_url),
+            input_data=documents,
+            input_type="corpus",
+            output_format=format,
+            deadline_seconds=deadline,
+            prompts_to_use=CORPUS_PERSPECTIVES,
+            trace_memory=trace_memory
+        )
+    except HTTPException:
+        for file_key in set(saved_files):
+            upload_storage.delete(file_key)
+        raise
+    
+    if leader_id is not None:
+        for file_key in set(saved_files):
+            upload_storage.delete(file_key)
+        analysis_jobs[job_id].pop("file_paths", None)
+    
+    return _submit_response(job_id, leader_id, f"{len(documents)}개 문서의 코퍼스 분석을 시작합니다.")
+
+
+def _batch_status(batch_id):
+    """배치 집계 상태"""
+    batch = analysis_batches.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="배치를 찾을 수 없습니다.")
+    
+    items = []
+    counts = {}
+    for item in batch["items"]:
+        job = _resolve_job(item["job_id"]) or {"status": "failed", "progress": 0, "message": "작업 없음"}
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+        items.append({
+            **item,
+            "status": job["status"],
+            "progress": job["progress"] if job["status"] not in ("failed", "cancelled") else 100,
+            "message": job["message"]
+        })
+    
+    finished = counts.get("completed", 0) + counts.get("failed", 0) + counts.get("cancelled", 0)
     return {
-        "job_id": job_id,
-        "message": "파일이 업로드되었습니다. 분석을 시작합니다."
+        "batch_id": batch_id,
+        "status": "completed" if finished == len(items) else "processing",
+        "progress": round(sum(item["progress"] for item in items) / len(items)),
+        "total": len(items),
+        "counts": counts,
+        "created_at": batch["created_at"],
+        "items": items
+    }
+
+
+@app.post("/api/estimate")
+def estimate_job(
+    text: Optional[str] = Form(None),
+    url: Optional[str] = Form(None),
+    file: Optional[UploadFile] = File(None)
+):
+    """
+    제출 전 작업량 예측 (작업은 만들지 않음)
+    
+    URL은 내용을 가져오고 PDF는 토큰 한도까지 텍스트를 추출해 입력 토큰 수를 계산한 뒤,
+    예상 토큰 사용량과 최근 호출 지연 기록 기반 예상 소요 시간을 반환한다.
+    """
+    provided = [value for value in (text, url, file) if value]
+    if len(provided) != 1:
+        raise HTTPException(status_code=400, detail="text, url, file 중 하나만 지정해야 합니다.")
+    
+    if file is not None and file.size is not None:
+        _check_input_size(file.size, file.filename or "파일")
+    
+    try:
+        if file is not None:
+            with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+                shutil.copyfileobj(file.file, tmp)
+                tmp.flush()
+                processed = input_processor.process(tmp.name, "pdf")
+        elif url:
+            processed = input_processor.process(url, "url")
+        else:
+            processed = input_processor.process(text, "text")
+    except ResourceLimitExceeded as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    content_tokens = estimate_tokens(processed["content"])
+    prompts_to_use, skipped = _select_perspectives(processed["content"])
+    return {
+        "input_type": processed["type"],
+        "content_tokens": content_tokens,
+        "truncated": processed["metadata"].get("truncated", False),
+        "perspectives": prompts_to_use or list(analysis_engine.PROMPTS),
+        "skipped_perspectives": skipped,
+        "estimated_tokens": analysis_engine.estimate_job_tokens(content_tokens, prompts_to_use),
+        "estimated_duration_seconds": analysis_engine.estimate_job_duration(
+            content_tokens, prompts_to_use
+        )["total_seconds"],
+        "latency_model": analysis_engine.latency_model.get_stats()
+    }
+
+
+@app.get("/api/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """배치 진행 상황 조회 (항목별 상태와 전체 진행률)"""
+    return _batch_status(batch_id)
+
+
+@app.get("/api/batch/{batch_id}/download")
+def download_batch(batch_id: str):
+    """배치의 모든 보고서를 ZIP으로 다운로드 (배치 완료 후)"""
+    status = _batch_status(batch_id)
+    if status["status"] != "completed":
+        raise HTTPException(status_code=400, detail="배치 분석이 아직 완료되지 않았습니다.")
+    
+    archive_key = f"{batch_id}_reports.zip"
+    if not report_storage.exists(archive_key):
+        # 완료된 배치는 내용이 바뀌지 않으므로 한 번만 생성 (보고서는 저장소에서 스트리밍으로 읽음)
+        with tempfile.TemporaryFile() as tmp:
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for item in status["items"]:
+                    job = _resolve_job(item["job_id"])
+                    report_key = job.get("report_path") if job else None
+                    if item["status"] == "completed" and report_storage.exists(report_key):
+                        ext = os.path.splitext(report_key)[1]
+                        name = f"{item['index'] + 1:03d}_{item['job_id'][:8]}{ext}"
+                        with report_storage.open_read(report_key) as source, archive.open(name, "w") as target:
+                            shutil.copyfileobj(source, target, 1024 * 1024)
+                archive.writestr("manifest.json", json.dumps(status, ensure_ascii=False, indent=2))
+            tmp.seek(0)
+            with report_storage.open_write(archive_key, content_type="application/zip") as target:
+                shutil.copyfileobj(tmp, target, 1024 * 1024)
+    
+    return _report_response(archive_key, "application/zip", f"analysis_batch_{batch_id[:8]}.zip")
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """운영 지표 조회"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "hedging": analysis_engine.get_hedge_stats(),
+        "scheduler": job_scheduler.get_stats(),
+        "admission": admission_controller.get_stats(),
+        "cancellation": dict(cancellation_stats),
+        "token_usage": _token_usage_metrics(),
+        "latency_model": analysis_engine.latency_model.get_stats(),
+        "memory": get_memory_stats(),
+        "webhooks": webhook_dispatcher.get_stats() if webhook_dispatcher else {"enabled": False}
+    }
+
+
+def _resolve_job(job_id):
+    """
+    작업 상태 조회 (연결된 작업은 대표 작업의 상태를 반영)
+    
+    Returns:
+        dict: 작업 상태 (없으면 None)
+    """
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return _archived_job(job_id) or _indexed_job(job_id)
+    
+    if job.get("view_cancelled_at"):
+        # 연결된 작업을 위해 실행은 계속되지만 대표 작업 요청자는 취소한 경우
+        return {
+            **job,
+            "status": "cancelled",
+            "message": "작업이 취소되었습니다.",
+            "cancelled_at": job["view_cancelled_at"]
+        }
+    
+    leader_id = job.get("coalesced_with")
+    if leader_id is None or leader_id not in analysis_jobs or job["status"] == "cancelled":
+        return job
+    
+    view = dict(analysis_jobs[leader_id])
+    view.pop("file_path", None)
+    view.pop("view_cancelled_at", None)
+    view.update({
+        "created_at": job["created_at"],
+        "coalesced_with": leader_id
+    })
+    return view
+
+
+def _archived_job(job_id):
+    """재시작 등으로 작업 목록에 없는 이전 작업을 분석 보관소에서 조회"""
+    job_archive = _get_job_archive()
+    if job_archive is None:
+        return None
+    
+    archived = job_archive.get(job_id, include_results=False)
+    if archived is None:
+        return None
+    
+    return {
+        "status": "completed",
+        "progress": 100,
+        "message": "보관된 분석입니다.",
+        "partial": archived["partial"],
+        "report_path": archived["report_path"],
+        "created_at": archived["created_at"],
+        "completed_at": archived["completed_at"]
     }
 
 
+def _indexed_job(job_id):
+    """재시작 등으로 작업 목록에 없는 이전 작업을 유사 입력 인덱스에서 조회"""
+    similarity_index = _get_similarity_index()
+    if similarity_index is None:
+        return None
+    
+    info = similarity_index.get(job_id)
+    if info is None:
+        return None
+    
+    return {
+        "status": "completed",
+        "progress": 100,
+        "message": "이전에 완료된 분석입니다.",
+        "report_path": info["report_path"],
+        "completed_at": info.get("completed_at")
+    }
+
+
+def _find_similar_jobs(content, output_format, signature, perspectives):
+    """유사도 기준 이상인 이전 작업 중 perspectives를 모두 실행했고 보고서가 남아 있는 것 반환"""
+    matches = _get_similarity_index().query(
+        content, threshold=SIMILARITY_THRESHOLD, signature=signature, covers=perspectives
+    )
+    return [
+        {
+            "job_id": match["job_id"],
+            "similarity": match["similarity"],
+            "title": match.get("title"),
+            "report_url": f"/api/download/{match['job_id']}"
+        }
+        for match in matches
+        if match.get("output_format") == output_format and report_storage.exists(match["report_path"])
+    ]
+
+
+async def _wait_for_change(watch_id, since, timeout):
+    """작업 상태 버전이 since와 달라지거나 timeout이 지날 때까지 대기"""
+    loop = asyncio.get_running_loop()
+    event = asyncio.Event()
+    with job_waiters_lock:
+        job_waiters.setdefault(watch_id, []).append((loop, event))
+    
+    try:
+        # 등록 전에 이미 바뀌었으면 바로 반환
+        if analysis_jobs[watch_id].get("version", 0) != since:
+            return
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        with job_waiters_lock:
+            waiters = job_waiters.get(watch_id, [])
+            if (loop, event) in waiters:
+                waiters.remove((loop, event))
+            if not waiters:
+                job_waiters.pop(watch_id, None)
+
+
 @app.get("/api/status/{job_id}")
-async def get_status(job_id: str):
-    """분석 상태 조회"""
-    if job_id not in analysis_jobs:
+async def get_status(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="상태가 바뀔 때까지 기다릴 최대 시간(초)"),
+    since: Optional[int] = Query(None, description="마지막으로 받은 상태 version")
+):
+    """
+    분석 상태 조회
+    
+    wait를 지정하면 상태(version)가 since와 달라지거나 wait초가 지날 때까지 응답을 보류한다.
+    since를 생략하면 요청 시점 이후의 다음 변경을 기다린다.
+    """
+    job = _resolve_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
     
-    return analysis_jobs[job_id]
+    if wait > 0 and job["status"] not in ("completed", "failed", "cancelled"):
+        watch_id = job.get("coalesced_with", job_id)
+        if watch_id in analysis_jobs:
+            if since is None:
+                since = job.get("version", 0)
+            if job.get("version", 0) == since:
+                await _wait_for_change(watch_id, since, min(wait, STATUS_MAX_WAIT))
+                job = _resolve_job(job_id)
+    
+    if job["status"] == "queued":
+        # 대기 순번과 예상 대기 시간 추가
+        position = job_scheduler.get_position(job.get("coalesced_with", job_id))
+        if position:
+            job = {**job, **position}
+        if job.get("estimated_duration_seconds") is not None:
+            eta = job.get("estimated_wait_seconds", 0) + job["estimated_duration_seconds"]
+            job = {**job, "eta_seconds": round(eta, 1)}
+    elif job["status"] == "processing" and job.get("estimated_completion_at"):
+        # 최근 호출 지연 기록으로 예측한 완료 시각까지 남은 시간
+        remaining = (datetime.fromisoformat(job["estimated_completion_at"]) - datetime.now()).total_seconds()
+        job = {**job, "eta_seconds": round(max(0.0, remaining), 1)}
+    
+    return job
 
 
 @app.get("/api/download/{job_id}")
-async def download_report(job_id: str):
-    """보고서 다운로드"""
-    if job_id not in analysis_jobs:
-        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+async def download_report(
+    job_id: str,
+    partial: bool = Query(False, description="분석 중이면 완료된 섹션까지의 작성 중 보고서 반환"),
+    format: str = Query("markdown", description="작성 중 보고서 형식 (markdown 또는 html)")
+):
+    """
+    보고서 다운로드
     
-    job = analysis_jobs[job_id]
+    partial=true면 분석 중인 작업도 지금까지 완료된 관점 섹션과 진행 중 표시를 담은 보고서를 반환한다.
+    (완료된 작업은 최종 보고서를 반환)
+    """
+    job = _resolve_job(job_id)
+    if job is None:
+        # 다른 인스턴스에서 완료된 작업도 공유 저장소(S3)에 보고서가 있으면 내려받을 수 있음
+        report_key = _stored_report_key(job_id)
+        if report_key is None:
+            raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+        job = {"status": "completed", "report_path": report_key}
+    
+    if partial and job["status"] != "completed":
+        if format not in ProgressiveReport.FORMATS:
+            raise HTTPException(status_code=400, detail="format은 markdown 또는 html이어야 합니다.")
+        progressive = job_progress_reports.get(job.get("coalesced_with", job_id))
+        if progressive is None:
+            raise HTTPException(status_code=400, detail="작성 중인 보고서가 아직 없습니다. 입력 처리 후 다시 시도해주세요.")
+        completed, total = progressive.progress()
+        return Response(
+            progressive.render(format),
+            media_type="text/markdown" if format == "markdown" else "text/html",
+            headers={"X-Report-Progress": f"{completed}/{total}"}
+        )
     
     if job["status"] != "completed":
         raise HTTPException(status_code=400, detail="분석이 아직 완료되지 않았습니다.")
     
-    report_path = job.get("report_path")
-    if not report_path or not os.path.exists(report_path):
+    report_key = job.get("report_path")
+    if not report_storage.exists(report_key):
         raise HTTPException(status_code=404, detail="보고서 파일을 찾을 수 없습니다.")
     
     # 파일 확장자에 따라 미디어 타입 설정
-    if report_path.endswith(".pdf"):
+    if report_key.endswith(".pdf"):
         media_type = "application/pdf"
         filename = f"analysis_report_{job_id[:8]}.pdf"
     else:
         media_type = "text/markdown"
         filename = f"analysis_report_{job_id[:8]}.md"
     
-    return FileResponse(
-        report_path,
-        media_type=media_type,
-        filename=filename
-    )
+    return _report_response(report_key, media_type, filename)
 
 
-async def run_analysis(job_id: str, input_data: str, input_type: str, output_format: str):
-    """백그라운드 분석 작업"""
+def _stored_report_key(job_id):
+    """이 인스턴스가 모르는 작업의 보고서 키를 보고서 저장소에서 조회 (없으면 None)"""
     try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return None
+    for output_format in ("pdf", "markdown"):
+        report_key = f"{job_id}_report.{output_format}"
+        if report_storage.exists(report_key):
+            return report_key
+    return None
+
+
+def _report_response(report_key, media_type, filename):
+    """
+    저장소의 보고서 응답: 서명 URL을 주는 저장소(S3)는 307 리다이렉트로 클라이언트가 직접 내려받고,
+    로컬 저장소는 앱 서버가 파일을 전송
+    """
+    url = report_storage.download_url(report_key, filename, media_type)
+    if url is not None:
+        return RedirectResponse(url, status_code=307)
+    return FileResponse(report_storage.path(report_key), media_type=media_type, filename=filename)
+
+
+def _with_download(items):
+    """보고서 파일이 남아 있는 보관 항목에 다운로드 경로 추가"""
+    job_archive = _get_job_archive()
+    for item in items:
+        archived = job_archive.get(item["job_id"], include_results=False)
+        if archived and report_storage.exists(archived["report_path"]):
+            item["download_url"] = f"/api/download/{item['job_id']}"
+    return items
+
+
+def _require_job_archive():
+    """분석 보관소 (사용 안 함이면 404)"""
+    job_archive = _get_job_archive()
+    if job_archive is None:
+        raise HTTPException(status_code=404, detail="분석 보관소를 사용하지 않도록 설정되어 있습니다.")
+    return job_archive
+
+
+@app.get("/api/jobs")
+def list_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    input_type: Optional[str] = Query(None)
+):
+    """보관된 분석 목록 (최근 완료 순)"""
+    if cursor is not None and not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="잘못된 cursor입니다.")
+    page = _require_job_archive().list(limit=limit, cursor=cursor, input_type=input_type)
+    page["items"] = _with_download(page["items"])
+    return page
+
+
+@app.get("/api/jobs/search")
+def search_jobs(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    input_type: Optional[str] = Query(None)
+):
+    """보관된 분석 전문 검색 (제목, 출처, 관점별 결과, 종합 요약)"""
+    page = _require_job_archive().search(q, limit=limit, offset=offset, input_type=input_type)
+    page["items"] = _with_download(page["items"])
+    return page
+
+
+@app.get("/api/jobs/{job_id}")
+def get_archived_job(job_id: str):
+    """보관된 분석의 입력 정보, 관점별 결과, 종합 요약"""
+    archived = _require_job_archive().get(job_id)
+    if archived is None:
+        raise HTTPException(status_code=404, detail="보관된 분석을 찾을 수 없습니다.")
+    if report_storage.exists(archived.pop("report_path")):
+        archived["download_url"] = f"/api/download/{job_id}"
+    return archived
+
+
+def _planned_llm_calls(prompts_to_use=None):
+    """작업 하나가 수행할 LLM 호출 수 (관점별 분석 + 종합 요약)"""
+    return len(prompts_to_use or analysis_engine.PROMPTS) + 1
+
+
+def _finish_cancelled(job_id, stage, planned_calls, calls_avoided, extra_paths=()):
+    """
+    취소된 작업 정리: 업로드/보고서 파일 삭제, 승인 적체량 반납, 회수한 용량 기록
+    
+    Args:
+        stage: 'queued' (실행 전 대기열에서 제거) 또는 'running' (실행 중 중단)
+        planned_calls: 작업 전체의 LLM 호출 수
+        calls_avoided: 취소로 보내지 않게 된 LLM 호출 수
+        extra_paths: 함께 삭제할 보고서 저장소 키 (실행 중 만든 보고서 등)
+    """
+    job = analysis_jobs[job_id]
+    for file_key in [job.get("file_path"), *job.get("file_paths", [])]:
+        if file_key:
+            upload_storage.delete(file_key)
+    for report_key in [job.get("report_path"), *extra_paths]:
+        if report_key:
+            report_storage.delete(report_key)
+    
+    # 남은 호출 비율만큼의 예상 토큰을 회수한 것으로 집계
+    tokens = admission_controller.release(job_id, completed=False)
+    reclaimed = int(tokens * calls_avoided / planned_calls) if planned_calls else 0
+    with cancellation_lock:
+        cancellation_stats["cancelled"] += 1
+        cancellation_stats["queued_removed" if stage == "queued" else "running_interrupted"] += 1
+        cancellation_stats["llm_calls_avoided"] += calls_avoided
+        cancellation_stats["estimated_tokens_reclaimed"] += reclaimed
+    
+    job_cancel_events.pop(job_id, None)
+    checkpoints = _get_checkpoint_store()
+    if checkpoints is not None:
+        _save_checkpoint(checkpoints.finish, job_id)
+    _update_job(job_id, {
+        "status": "cancelled",
+        "message": "작업이 취소되었습니다.",
+        "cancelled_at": datetime.now().isoformat(),
+        "llm_calls_avoided": calls_avoided
+    })
+    for key in ("file_path", "file_paths", "report_path"):
+        job.pop(key, None)
+
+
+def _live_followers(leader_id):
+    """대표 작업의 결과를 기다리는 (취소하지 않은) 연결된 작업 목록 (inflight_lock 보유 상태에서 호출)"""
+    return [
+        other_id for other_id, other in list(analysis_jobs.items())
+        if other.get("coalesced_with") == leader_id and other["status"] != "cancelled"
+    ]
+
+
+def _remove_callback(leader_id, job_id):
+    """실행 종료 시 보낼 알림에서 해당 작업의 콜백 제거"""
+    with job_callbacks_lock:
+        callbacks = job_callbacks.get(leader_id, [])
+        job_callbacks[leader_id] = [entry for entry in callbacks if entry[0] != job_id]
+
+
+def _stop_run(run_id):
+    """
+    실행 취소 신호를 보내고 이후 동일 요청이 새 분석을 시작하도록 진행 중 목록에서 제거 (inflight_lock 보유 상태에서 호출)
+    
+    Returns:
+        bool: 이미 끝난 실행이면 False
+    """
+    event = job_cancel_events.get(run_id)
+    if event is None:
+        return False
+    event.set()
+    for key, leader in list(inflight_jobs.items()):
+        if leader == run_id:
+            del inflight_jobs[key]
+    return True
+
+
+def _cancel_run(run_id):
+    """취소 신호를 보낸 실행 정리 (대기 중이면 바로 제거, 실행 중이면 작업 스레드가 정리)"""
+    entry = job_scheduler.cancel(run_id)
+    if entry is None:
+        # 실행 중인 작업은 작업 스레드가 다음 확인 지점에서 정리
+        _update_job(run_id, {"cancel_requested": True, "message": "취소 중..."})
+        return {"job_id": run_id, "status": "cancelling", "message": "실행 중인 작업을 취소하는 중입니다."}
+    
+    planned = _planned_llm_calls(entry["kwargs"].get("prompts_to_use"))
+    _finish_cancelled(run_id, "queued", planned, planned)
+    if webhook_dispatcher is not None:
+        _dispatch_callbacks(run_id)
+    return {"job_id": run_id, "status": "cancelled", "message": "작업이 취소되었습니다."}
+
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """
+    분석 작업 취소
+    
+    대기 중인 작업은 대기열에서 바로 제거하고, 실행 중인 작업은 다음 확인 지점
+    (PDF 페이지, LLM 응답 대기, 보고서 변환)에서 중단한다.
+    동일 요청으로 연결된 작업이 있으면 취소한 작업의 상태와 알림만 분리하고 실행은 계속하며,
+    대표 작업과 연결된 작업이 모두 취소되면 실행도 중단한다.
+    """
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    if _resolve_job(job_id)["status"] in ("completed", "failed", "cancelled"):
+        raise HTTPException(status_code=409, detail="이미 종료된 작업입니다.")
+    
+    cancelled_at = datetime.now().isoformat()
+    leader_id = job.get("coalesced_with")
+    with inflight_lock:
+        if leader_id is not None:
+            # 대표 작업은 계속 실행하고 이 작업의 알림만 제거
+            _remove_callback(leader_id, job_id)
+            _update_job(job_id, {
+                "status": "cancelled",
+                "message": "작업이 취소되었습니다.",
+                "cancelled_at": cancelled_at
+            })
+            with cancellation_lock:
+                cancellation_stats["followers_detached"] += 1
+            # 대표 작업 요청자도 이미 취소했으면 마지막 구독자가 취소할 때 실행도 중단
+            run_id = None
+            if analysis_jobs[leader_id].get("view_cancelled_at") and not _live_followers(leader_id):
+                run_id = leader_id if _stop_run(leader_id) else None
+        elif _live_followers(job_id):
+            # 연결된 작업이 결과를 기다리므로 실행은 계속하고 이 작업의 상태만 취소로 표시
+            _remove_callback(job_id, job_id)
+            _update_job(job_id, {"view_cancelled_at": cancelled_at})
+            with cancellation_lock:
+                cancellation_stats["leaders_detached"] += 1
+            run_id = None
+        else:
+            if not _stop_run(job_id):
+                raise HTTPException(status_code=409, detail="이미 종료된 작업입니다.")
+            run_id = job_id
+    
+    if run_id == job_id:
+        return _cancel_run(job_id)
+    if run_id is not None:
+        _cancel_run(run_id)
+    return {"job_id": job_id, "status": "cancelled", "message": "작업이 취소되었습니다."}
+
+
+def _process_input(input_data, input_type, cancel_event=None):
+    """입력 처리 (업로드한 PDF는 저장소 키이므로 로컬 사본으로 추출)"""
+    if input_type == "pdf":
+        with upload_storage.local_copy(input_data) as path:
+            return input_processor.process(path, "pdf", cancel_event=cancel_event)
+    return input_processor.process(input_data, input_type, cancel_event=cancel_event)
+
+
+def _process_corpus(job_id, documents, cancel_event=None):
+    """
+    코퍼스 입력 처리: 문서별 텍스트 추출 후 군집화하여 분석용 요약 텍스트 생성 (문서마다 취소 확인)
+    
+    Returns:
+        dict: InputProcessor.process()와 같은 형식 (content는 군집 통계와 대표 문서 발췌)
+    """
+    from corpus_clustering import CorpusClusterer
+    
+    extracted = []
+    failed = []
+    total_chars = 0
+    normalization = {"chars_saved": 0, "tokens_saved": 0}
+    for index, document in enumerate(documents):
+        check_cancelled(cancel_event)
+        _update_job(job_id, {"message": f"[{index + 1}/{len(documents)}] 문서 텍스트 추출 중..."})
+        try:
+            processed = _process_input(document["value"], document["type"], cancel_event)
+        except (JobCancelled, ResourceLimitExceeded):
+            raise
+        except Exception as e:
+            failed.append({"index": index, "error": str(e)})
+            continue
+        for key in normalization:
+            normalization[key] += processed["metadata"].get("normalization", {}).get(key, 0)
+        # 문서별 한도와 별도로 코퍼스 전체 추출 문자 수도 제한 (군집화에 전체 텍스트가 필요)
+        total_chars += len(processed["content"])
+        check_limit(
+            "extracted_chars", total_chars, JOB_MAX_EXTRACTED_CHARS,
+            f"문서 {index + 1}개까지 추출한 텍스트가 작업당 한도 {JOB_MAX_EXTRACTED_CHARS:,}자를 넘습니다."
+        )
+        if processed["content"].strip():
+            extracted.append({
+                "index": index,
+                "title": processed["metadata"].get("title") or f"문서 {index + 1}",
+                "content": processed["content"]
+            })
+    
+    if not extracted:
+        raise Exception("텍스트를 추출할 수 있는 문서가 없습니다.")
+    
+    _update_job(job_id, {"message": f"문서 {len(extracted)}개 군집화 중..."})
+    clusterer = CorpusClusterer(max_clusters=CORPUS_MAX_CLUSTERS)
+    clusters = clusterer.cluster([document["content"] for document in extracted])
+    content = clusterer.build_digest(extracted, clusters, excerpt_chars=CORPUS_EXCERPT_CHARS)
+    
+    _update_job(job_id, {"corpus": {
+        "documents": len(extracted),
+        "failed": failed,
+        "clusters": [
+            {
+                "size": len(cluster["members"]),
+                "keywords": cluster["keywords"],
+                "cohesion": cluster["cohesion"],
+                "representatives": [extracted[i]["index"] for i in cluster["representatives"]]
+            }
+            for cluster in clusters
+        ]
+    }})
+    
+    return {
+        "content": content,
+        "metadata": {
+            "title": f"문서 코퍼스 분석 ({len(extracted)}개 문서)",
+            "source": f"문서 {len(extracted)}개, {len(clusters)}개 그룹",
+            "length": len(content),
+            "normalization": normalization
+        },
+        "type": "corpus"
+    }
+
+
+def _token_usage(perspective_usage, synthesis_stats=None):
+    """작업의 토큰 사용량 집계 (관점별 + 종합 요약)"""
+    usage = {
+        "perspectives": dict(perspective_usage),
+        "prompt_tokens": sum(u["prompt_tokens"] for u in perspective_usage.values()),
+        "completion_tokens": sum(u["completion_tokens"] for u in perspective_usage.values()),
+        "estimated": any(u.get("estimated") for u in perspective_usage.values())
+    }
+    if synthesis_stats is not None:
+        usage["synthesis"] = {
+            "prompt_tokens": synthesis_stats.get("prompt_tokens", 0),
+            "completion_tokens": synthesis_stats.get("completion_tokens", 0),
+            "calls": synthesis_stats.get("calls", 0)
+        }
+        usage["prompt_tokens"] += usage["synthesis"]["prompt_tokens"]
+        usage["completion_tokens"] += usage["synthesis"]["completion_tokens"]
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+    return usage
+
+
+def _record_token_usage(input_type, usage):
+    """완료된 작업의 토큰 사용량을 입력 유형별 누적치에 반영"""
+    with token_usage_lock:
+        totals = token_usage_stats.setdefault(
+            input_type, {"jobs": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        )
+        totals["jobs"] += 1
+        totals["prompt_tokens"] += usage["prompt_tokens"]
+        totals["completion_tokens"] += usage["completion_tokens"]
+
+
+def _token_usage_metrics():
+    """입력 유형별 누적 토큰 사용량과 작업당 평균"""
+    with token_usage_lock:
+        return {
+            input_type: {
+                **totals,
+                "avg_total_tokens_per_job": round(
+                    (totals["prompt_tokens"] + totals["completion_tokens"]) / totals["jobs"]
+                )
+            }
+            for input_type, totals in token_usage_stats.items()
+        }
+
+
+def run_analysis(job_id: str, input_data, input_type: str, output_format: str,
+                 deadline_seconds: Optional[float] = None, submission_key: Optional[str] = None,
+                 client_id: str = "anonymous", prompts_to_use: Optional[list] = None,
+                 trace_memory: bool = False):
+    """
+    백그라운드 분석 작업
+    
+    LLM 호출이 블로킹이므로 동기 함수로 정의하여 스케줄러 작업 스레드에서 실행
+    (이벤트 루프가 막히지 않아 작업 중에도 상태 조회가 가능)
+    
+    단계(input, analysis, synthesis, report)별 최대 메모리는 상태의 memory 항목에 기록
+    (trace_memory면 tracemalloc 할당 상위 위치 포함)
+    """
+    # 클라이언트별 동시 LLM 호출 상한
+    def call_gate():
+        return job_scheduler.llm_slot(client_id)
+    
+    # 작업 마감 시각 (요청값 우선, 없으면 환경 설정값)
+    if deadline_seconds is None:
+        deadline_seconds = JOB_DEADLINE_SECONDS
+    deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+    
+    # 취소 요청 (DELETE /api/jobs/{job_id})과 취소 시 회수할 호출 수 계산용 진행 상황
+    cancel_event = job_cancel_events.get(job_id)
+    llm_calls = {"planned": _planned_llm_calls(prompts_to_use), "started": 0}
+    report_key = None
+    
+    # 이전 실행에서 저장된 진행 상황 (재시작 후 재개된 작업)
+    checkpoints = _get_checkpoint_store()
+    checkpoint = None
+    
+    # 단계별 메모리 사용 기록
+    profile = JobMemoryProfile(trace=trace_memory)
+    
+    try:
+        check_cancelled(cancel_event)
+        if checkpoints is not None:
+            checkpoint = checkpoints.load(job_id)
+        
         # 1. 입력 처리
-        analysis_jobs[job_id].update({
+        _update_job(job_id, {
             "status": "processing",
             "progress": 10,
             "message": "입력 데이터 처리 중..."
         })
         
-        processed_input = input_processor.process(input_data, input_type)
+        if checkpoint and checkpoint["processed_input"]:
+            processed_input = checkpoint["processed_input"]
+        else:
+            with profile.stage("input"):
+                if input_type == "corpus":
+                    processed_input = _process_corpus(job_id, input_data, cancel_event)
+                else:
+                    processed_input = _process_input(input_data, input_type, cancel_event)
+            _update_job(job_id, {"memory": profile.summary()})
+            if checkpoints is not None:
+                _save_checkpoint(checkpoints.save_input, job_id, processed_input)
+        
+        # 정규화로 줄인 문자/토큰 수 (관점마다 반복 전송되므로 실제 절감은 호출 수만큼)
+        if processed_input['metadata'].get('normalization'):
+            _update_job(job_id, {"normalization": processed_input['metadata']['normalization']})
+        
+        # 토큰 예산으로 일부 페이지만 추출한 경우 기록
+        if processed_input['metadata'].get('truncated'):
+            _update_job(job_id, {"input_truncated": {
+                "pages": processed_input['metadata']['pages'],
+                "extracted_pages": processed_input['metadata']['extracted_pages'],
+                "max_tokens": processed_input['metadata']['max_tokens']
+            }})
+        
+        # 입력에 맞지 않는 관점 제외 (요청에서 관점을 지정했으면 그대로 사용)
+        skipped_perspectives = []
+        if prompts_to_use is None:
+            prompts_to_use, skipped_perspectives = _select_perspectives(processed_input['content'])
+            if skipped_perspectives:
+                llm_calls["planned"] = _planned_llm_calls(prompts_to_use)
+                _update_job(job_id, {"skipped_perspectives": skipped_perspectives})
+        
+        # 유사 입력 검색 (이전 분석 결과 제시 또는 재사용, 이번에 실행할 관점을 모두 실행한 작업만)
+        signature = None
+        similarity_index = _get_similarity_index()
+        if similarity_index is not None:
+            signature = similarity_index.signature(processed_input['content'])
+            similar_jobs = _find_similar_jobs(
+                processed_input['content'], output_format, signature,
+                prompts_to_use or list(analysis_engine.PROMPTS)
+            )
+            if similar_jobs:
+                _update_job(job_id, {"similar_jobs": similar_jobs})
+                if SIMILARITY_MODE == "auto":
+                    best = similar_jobs[0]
+                    _update_job(job_id, {
+                        "status": "completed",
+                        "progress": 100,
+                        "message": f"유사한 이전 분석 결과를 재사용했습니다. (유사도 {best['similarity']:.0%})",
+                        "reused_from": best["job_id"],
+                        "report_path": _indexed_job(best["job_id"])["report_path"],
+                        "completed_at": datetime.now().isoformat()
+                    })
+                    return
         
         # 2. 10가지 프롬프트 분석
-        analysis_jobs[job_id].update({
-            "progress": 20,
-            "message": "10가지 사고 프롬프트 분석 중..."
+        # 진행률과 완료 예상 시각은 최근 호출 지연 기록으로 예측한 관점별 소요 시간 기준
+        plan = analysis_engine.estimate_job_duration(estimate_tokens(processed_input['content']), prompts_to_use)
+        plan_keys = list(prompts_to_use or analysis_engine.PROMPTS)
+        resumed_keys = set(checkpoint["perspectives"]) if checkpoint else set()
+        analysis_seconds = sum(plan["perspectives"].values()) or 1.0
+        
+        def update_progress(next_index, message):
+            remaining = sum(
+                plan["perspectives"].get(key, 0.0) for key in plan_keys[next_index:] if key not in resumed_keys
+            )
+            _update_job(job_id, {
+                "progress": 20 + int(65 * (analysis_seconds - remaining) / analysis_seconds),
+                "message": message,
+                "estimated_completion_at": (
+                    datetime.now() + timedelta(seconds=remaining + plan["synthesis"])
+                ).isoformat()
+            })
+        
+        # 관점 결과가 도착할 때마다 채워지는 작성 중 보고서 (partial 다운로드)
+        progressive = report_generator.start_progressive(processed_input, {
+            key: analysis_engine.PROMPTS[key] for key in plan_keys if key in analysis_engine.PROMPTS
         })
+        for key, result in (checkpoint["perspectives"] if checkpoint else {}).items():
+            progressive.set_result(key, result)
+        job_progress_reports[job_id] = progressive
+        _update_job(job_id, {"partial_report_url": f"/api/download/{job_id}?partial=true"})
+        
+        update_progress(0, "10가지 사고 프롬프트 분석 중...")
         
         def progress_callback(current, total, title):
-            progress = 20 + int((current / total) * 60)
-            analysis_jobs[job_id].update({
-                "progress": progress,
-                "message": f"[{current}/{total}] {title} 분석 중..."
-            })
+            llm_calls["started"] = current
+            update_progress(current - 1, f"[{current}/{total}] {title} 분석 중...")
         
-        analysis_results = analysis_engine.analyze(
-            processed_input['content'],
-            progress_callback=progress_callback
-        )
+        # 관점별 실제 토큰 사용량 (이전 실행에서 완료된 관점 포함)
+        perspective_usage = {
+            key: result["usage"] for key, result in (checkpoint["perspectives"] if checkpoint else {}).items()
+            if result.get("usage")
+        }
+        
+        def on_result(key, result):
+            progressive.set_result(key, result)
+            perspective_usage[key] = result["usage"]
+            _update_job(job_id, {"token_usage": _token_usage(perspective_usage)})
+            if checkpoints is not None:
+                _save_checkpoint(checkpoints.save_perspective, job_id, key, result)
+        
+        with profile.stage("analysis"):
+            analysis_results = analysis_engine.analyze(
+                processed_input['content'],
+                prompts_to_use=prompts_to_use,
+                progress_callback=progress_callback,
+                deadline=deadline,
+                call_timeout=LLM_CALL_TIMEOUT,
+                call_gate=call_gate,
+                cancel_event=cancel_event,
+                completed=checkpoint["perspectives"] if checkpoint else None,
+                on_result=on_result
+            )
+        _update_job(job_id, {"memory": profile.summary()})
+        
+        # 마감 시간으로 누락된 관점 기록
+        cut_perspectives = analysis_engine.get_cut_perspectives(analysis_results)
+        for key, result in analysis_results.items():
+            if result.get('cut') or result.get('error'):
+                progressive.set_result(key, result)
         
-        # 3. 종합 요약 생성
-        analysis_jobs[job_id].update({
+        # 3. 종합 요약 생성 (마감 이후에도 완료된 관점으로 수행)
+        _update_job(job_id, {
             "progress": 85,
-            "message": "종합 요약 생성 중..."
+            "message": "종합 요약 생성 중...",
+            "cut_perspectives": cut_perspectives,
+            "estimated_completion_at": (datetime.now() + timedelta(seconds=plan["synthesis"])).isoformat()
         })
         
-        synthesis = analysis_engine.generate_summary(analysis_results)
+        llm_calls["started"] = llm_calls["planned"]
+        if checkpoint and checkpoint["synthesis"] is not None:
+            synthesis, synthesis_stats = checkpoint["synthesis"], checkpoint["synthesis_stats"]
+        else:
+            with profile.stage("synthesis"):
+                synthesis, synthesis_stats = analysis_engine.generate_summary(
+                    analysis_results,
+                    timeout=SYNTHESIS_TIMEOUT or LLM_CALL_TIMEOUT,
+                    call_gate=call_gate,
+                    return_stats=True,
+                    cancel_event=cancel_event
+                )
+            if checkpoints is not None and not synthesis_stats.get("error"):
+                _save_checkpoint(checkpoints.save_synthesis, job_id, synthesis, synthesis_stats)
+        progressive.set_synthesis(synthesis)
+        _update_job(job_id, {
+            "memory": profile.summary(),
+            "synthesis_stats": synthesis_stats,
+            "token_usage": _token_usage(perspective_usage, synthesis_stats)
+        })
         
         # 4. 보고서 생성
-        analysis_jobs[job_id].update({
+        _update_job(job_id, {
             "progress": 90,
             "message": "보고서 생성 중..."
         })
         
-        report_path = report_generator.generate_report(
-            processed_input,
-            analysis_results,
-            synthesis,
-            output_format=output_format
-        )
-        
-        # 보고서를 reports 디렉토리로 이동
-        final_report_path = REPORT_DIR / f"{job_id}_report.{output_format}"
-        shutil.move(report_path, final_report_path)
+        check_cancelled(cancel_event)
+        with profile.stage("report"), tempfile.TemporaryDirectory(prefix="report_") as render_dir:
+            # 작업별 임시 디렉토리에서 렌더링 후 보고서 저장소로 업로드 (중간 파일은 함께 삭제)
+            report_path = report_generator.generate_report(
+                processed_input,
+                analysis_results,
+                synthesis,
+                output_format=output_format,
+                cancel_event=cancel_event,
+                output_dir=render_dir,
+                skipped_perspectives=skipped_perspectives
+            )
+            report_key = f"{job_id}_report.{output_format}"
+            report_storage.put_file(
+                report_key, report_path,
+                content_type="application/pdf" if output_format == "pdf" else "text/markdown"
+            )
+        check_cancelled(cancel_event)
         
         # 완료
-        analysis_jobs[job_id].update({
+        _update_job(job_id, {
+            "memory": profile.summary(),
             "status": "completed",
             "progress": 100,
-            "message": "분석 완료!",
-            "report_path": str(final_report_path),
+            "message": "분석 완료!" if not cut_perspectives else
+                       f"분석 완료 (시간 제한으로 {len(cut_perspectives)}개 관점 누락)",
+            "partial": bool(cut_perspectives),
+            "report_path": report_key,
             "completed_at": datetime.now().isoformat()
         })
+        _record_token_usage(input_type, analysis_jobs[job_id]["token_usage"])
         
+        # 분석 보관소에 저장 (실패해도 완료된 작업에는 영향 없음)
+        job_archive = _get_job_archive()
+        if job_archive is not None:
+            try:
+                job_archive.add(job_id, processed_input, analysis_results, synthesis, {
+                    **analysis_jobs[job_id],
+                    "output_format": output_format
+                })
+            except Exception as e:
+                # 보고서는 그대로 제공하되 보관소 검색/재사용에서 빠진 이유를 남김
+                logger.exception("분석 보관소 저장 실패: %s", job_id)
+                _update_job(job_id, {"archive_error": str(e)})
+        
+        # 누락 없이 완료된 분석만 유사 입력 인덱스에 등록
+        if similarity_index is not None and not cut_perspectives:
+            similarity_index.add(job_id, processed_input['content'], {
+                "title": processed_input['metadata'].get('title'),
+                # 실제로 결과를 얻은 관점 (일부만 실행한 작업이 전체 분석 요청에 재사용되지 않도록)
+                "perspectives": [key for key, result in analysis_results.items() if not result.get('error')],
+                "output_format": output_format,
+                "report_path": report_key,
+                "completed_at": analysis_jobs[job_id]["completed_at"]
+            }, signature=signature)
+    
+    except JobCancelled:
+        planned = llm_calls["planned"]
+        _finish_cancelled(job_id, "running", planned, planned - llm_calls["started"],
+                          extra_paths=[report_key])
+    
+    except ResourceLimitExceeded as e:
+        # 작업당 한도 초과: 메모리를 더 쓰기 전에 중단한 단계 기록
+        _update_job(job_id, {
+            "status": "failed",
+            "progress": 0,
+            "message": f"작업 한도 초과: {str(e)}",
+            "error": str(e),
+            "limit": {"name": e.limit_name, "value": e.value, "limit": e.limit},
+            "memory": profile.summary()
+        })
+    
     except Exception as e:
-        analysis_jobs[job_id].update({
+        _update_job(job_id, {
             "status": "failed",
             "progress": 0,
             "message": f"오류 발생: {str(e)}",
             "error": str(e)
         })
+    
+    finally:
+        profile.close()
+        admission_controller.release(job_id)
+        job_cancel_events.pop(job_id, None)
+        job_progress_reports.pop(job_id, None)
+        
+        # 종료된 작업의 체크포인트 삭제 (완료된 결과는 분석 보관소에 남음)
+        if checkpoints is not None:
+            _save_checkpoint(checkpoints.finish, job_id)
+        
+        # 진행 중 작업 목록에서 제거 (이후 동일 요청은 새 분석 시작)
+        if submission_key is not None:
+            with inflight_lock:
+                if inflight_jobs.get(submission_key) == job_id:
+                    del inflight_jobs[submission_key]
+        
+        # 완료/실패 알림 웹훅
+        if webhook_dispatcher is not None:
+            _dispatch_callbacks(job_id)
 
 
 @app.get("/api/prompts")
@@ -296,10 +2020,12 @@ async def get_prompts():
 
 
 # 정적 파일 서빙 (HTML, CSS, JS)
-app.mount("/static", StaticFiles(directory="/home/ubuntu/static"), name="static")
+app.mount("/static", StaticFiles(directory=STATIC_DIR, check_dir=False), name="static")
 
 
 if __name__ == "__main__":
+    import uvicorn
+    
     uvicorn.run(
         "web_app:app",
         host="0.0.0.0",
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+완료 알림 웹훅 (Webhooks)
+작업 완료/실패 시 콜백 URL로 서명된 POST 요청을 재시도와 함께 전송
+"""
+
+import hmac
+import json
+import time
+import socket
+import hashlib
+import ipaddress
+import threading
+import http.client
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BlockedDestination(Exception):
+    """허용되지 않은 웹훅 대상 (루프백/사설/링크 로컬 주소 또는 허용 목록 밖의 호스트)"""
+    pass
+
+
+def sign_payload(secret, timestamp, body):
+    """
+    웹훅 서명 생성
+    
+    Args:
+        secret: 공유 비밀 키
+        timestamp: 전송 시각 (유닉스 초, 문자열)
+        body: 요청 본문 (bytes)
+    
+    Returns:
+        str: "sha256=<hex>" 형식의 HMAC-SHA256 서명
+    """
+    message = timestamp.encode('utf-8') + b'.' + body
+    digest = hmac.new(secret.encode('utf-8'), message, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(secret, timestamp, body, signature, tolerance=300):
+    """
+    수신 측 서명 검증
+    
+    Args:
+        secret: 공유 비밀 키
+        timestamp: X-Webhook-Timestamp 헤더 값
+        body: 요청 본문 (bytes)
+        signature: X-Webhook-Signature 헤더 값
+        tolerance: 허용하는 전송 시각 오차(초, 재전송 공격 방지)
+    
+    Returns:
+        bool: 서명이 유효하면 True
+    """
+    try:
+        if abs(time.time() - int(timestamp)) > tolerance:
+            return False
+    except (TypeError, ValueError):
+        return False
+    return hmac.compare_digest(sign_payload(secret, timestamp, body), signature or '')
+
+
+def _is_public_address(address):
+    """인터넷에서 라우팅되는 공인 주소인지 확인 (IPv4 매핑 IPv6 포함)"""
+    ip = ipaddress.ip_address(address.split('%')[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_destination(url, allowed_hosts=None, resolve=True):
+    """
+    웹훅 대상 URL 검증
+    
+    허용 목록이 있으면 목록의 호스트만 허용하고, 없으면 호스트가 가리키는 모든 주소가
+    공인 주소여야 한다.
+    
+    Args:
+        url: 콜백 URL
+        allowed_hosts: 허용할 호스트 이름 집합 (소문자, 비어 있으면 공인 주소 검사)
+        resolve: False면 DNS 조회 없이 IP 리터럴과 localhost만 검사 (요청 접수 시 빠른 검사용)
+    
+    Raises:
+        BlockedDestination: 허용되지 않은 대상일 때
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise BlockedDestination("callback_url은 http(s) URL이어야 합니다.")
+    try:
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+    except ValueError:
+        raise BlockedDestination("callback_url의 포트가 올바르지 않습니다.")
+    
+    host = parts.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise BlockedDestination(f"허용되지 않은 웹훅 호스트입니다: {host}")
+        return
+    
+    if host == 'localhost' or host.endswith('.localhost'):
+        raise BlockedDestination(f"내부 주소로는 웹훅을 보낼 수 없습니다: {host}")
+    try:
+        addresses = [str(ipaddress.ip_address(host))]
+    except ValueError:
+        if not resolve:
+            return
+        try:
+            addresses = [info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)]
+        except (socket.gaierror, UnicodeError):
+            raise BlockedDestination(f"웹훅 호스트를 찾을 수 없습니다: {host}")
+    for address in addresses:
+        if not _is_public_address(address):
+            raise BlockedDestination(f"내부 주소로는 웹훅을 보낼 수 없습니다: {host} ({address})")
+
+
+class _PeerCheckMixin:
+    """연결된 상대 주소가 공인 주소인지 확인 (검사 후 DNS 응답이 바뀌는 경우 차단)"""
+    
+    def connect(self):
+        super().connect()
+        address = self.sock.getpeername()[0]
+        if not _is_public_address(address):
+            self.sock.close()
+            raise BlockedDestination(f"내부 주소로는 웹훅을 보낼 수 없습니다: {self.host} ({address})")
+
+
+class _PublicHTTPConnection(_PeerCheckMixin, http.client.HTTPConnection):
+    pass
+
+
+class _PublicHTTPSConnection(_PeerCheckMixin, http.client.HTTPSConnection):
+    pass
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """리다이렉트로 검사하지 않은 대상에 전송되지 않도록 따라가지 않음"""
+    
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class WebhookDispatcher:
+    """서명된 웹훅을 백그라운드에서 재시도하며 전송하는 클래스"""
+    
+    def __init__(self, secret, max_attempts=5, backoff=2.0, timeout=10.0, max_workers=4, allowed_hosts=None):
+        """
+        Args:
+            secret: 서명에 사용할 공유 비밀 키
+            max_attempts: 최대 전송 시도 횟수
+            backoff: 첫 재시도 대기 시간(초, 시도마다 두 배)
+            timeout: 요청 1회 제한 시간(초)
+            max_workers: 동시에 전송할 웹훅 수
+            allowed_hosts: 전송을 허용할 호스트 이름 집합 (None이면 공인 주소만 허용)
+        """
+        self.secret = secret
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.allowed_hosts = {host.lower() for host in allowed_hosts or ()}
+        if self.allowed_hosts:
+            self._opener = urllib.request.build_opener(_NoRedirectHandler)
+        else:
+            # 공인 주소 검사는 실제 연결 상대를 확인하므로 프록시를 거치지 않음
+            self._opener = urllib.request.build_opener(
+                urllib.request.ProxyHandler({}), _PublicHTTPHandler, _PublicHTTPSHandler, _NoRedirectHandler
+            )
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="webhook")
+        self._lock = threading.Lock()
+        self.stats = {'delivered': 0, 'failed': 0, 'retries': 0}
+    
+    def dispatch(self, url, payload):
+        """
+        웹훅 전송 예약 (즉시 반환)
+        
+        Returns:
+            Future: 전송 결과 (성공 시 True)
+        """
+        return self._executor.submit(self._deliver, url, payload)
+    
+    def _deliver(self, url, payload):
+        """재시도를 포함한 웹훅 전송"""
+        try:
+            check_destination(url, self.allowed_hosts)
+        except BlockedDestination:
+            self._count('failed')
+            return False
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        
+        for attempt in range(1, self.max_attempts + 1):
+            # 재시도마다 새 시각으로 서명
+            timestamp = str(int(time.time()))
+            request = urllib.request.Request(url, data=body, method='POST', headers={
+                'Content-Type': 'application/json',
+                'User-Agent': 'ThinkingPromptsAnalyzer-Webhook/1.0',
+                'X-Webhook-Event': payload.get('event', ''),
+                'X-Webhook-Timestamp': timestamp,
+                'X-Webhook-Signature': sign_payload(self.secret, timestamp, body)
+            })
+            try:
+                with self._opener.open(request, timeout=self.timeout) as response:
+                    response.read()
+                self._count('delivered')
+                return True
+            except BlockedDestination:
+                break
+            except urllib.error.HTTPError as e:
+                # 3xx(리다이렉트 미지원)와 4xx(429 제외)는 수신 측 거부이므로 재시도하지 않음
+                if 300 <= e.code < 500 and e.code != 429:
+                    break
+            except (urllib.error.URLError, OSError):
+                pass
+            
+            if attempt < self.max_attempts:
+                self._count('retries')
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+        
+        self._count('failed')
+        return False
+    
+    def _count(self, key):
+        """통계 카운터 증가"""
+        with self._lock:
+            self.stats[key] += 1
+    
+    def get_stats(self):
+        """전송 통계 반환"""
+        with self._lock:
+            return dict(self.stats)
+
+
+# 테스트 코드
+if __name__ == "__main__":
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    
+    SECRET = "test-secret"
+    received = []
+    
+    class Receiver(BaseHTTPRequestHandler):
+        """첫 요청은 503으로 실패시키고 이후 요청을 검증하는 로컬 수신기"""
+        
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            valid = verify_signature(
+                SECRET, self.headers['X-Webhook-Timestamp'], body, self.headers['X-Webhook-Signature']
+            )
+            received.append((json.loads(body), valid))
+            self.send_response(503 if len(received) == 1 else 200)
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    server = HTTPServer(('127.0.0.1', 0), Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    # 로컬 수신기는 허용 목록으로만 받을 수 있음
+    dispatcher = WebhookDispatcher(SECRET, backoff=0.1, allowed_hosts={'127.0.0.1'})
+    future = dispatcher.dispatch(
+        f"http://127.0.0.1:{server.server_port}/hook",
+        {'event': 'job.completed', 'job_id': 'test-job', 'status': 'completed'}
+    )
+    
+    print("=== 웹훅 전송 테스트 ===")
+    print(f"전송 성공: {future.result(timeout=10)}")
+    for payload, valid in received:
+        print(f"수신: {payload} (서명 유효: {valid})")
+    print(f"통계: {dispatcher.get_stats()}")
+    
+    print("=== 대상 검사 테스트 ===")
+    for url in ["http://127.0.0.1/hook", "http://localhost:8000/hook", "http://10.0.0.5/hook",
+                "http://169.254.169.254/latest/meta-data", "http://[::ffff:192.168.0.1]/hook",
+                "ftp://example.com/hook", "https://8.8.8.8/hook"]:
+        try:
+            check_destination(url)
+            print(f"{url}: 허용")
+        except BlockedDestination as e:
+            print(f"{url}: 차단 ({e})")
+    
+    public_only = WebhookDispatcher(SECRET, backoff=0.1)
+    blocked = public_only.dispatch(f"http://127.0.0.1:{server.server_port}/hook", {'event': 'job.completed'})
+    print(f"허용 목록 없이 루프백 전송: {blocked.result(timeout=10)}, 수신 {len(received)}건 (변화 없음)")
+    server.shutdown()